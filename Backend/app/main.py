@@ -1,8 +1,12 @@
 # app/main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers.cronograma import router as cronograma_router
 from app.routers.auth import router as auth_router  # 👈 ADD
+from app.routers.admin import router as admin_router
+from app.serializacao import CompressaoMiddleware
+from concorrencia import encerrar_pools
 
 import os
 from dotenv import load_dotenv
@@ -10,7 +14,16 @@ load_dotenv()
 from sqlalchemy import create_engine, text
 engine = create_engine(os.getenv("DB_URL"))
 
-app = FastAPI(title="RadioClub Cronograma API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # processos dos pools de PDF/cenários não sobrevivem ao worker
+    encerrar_pools()
+
+app = FastAPI(title="RadioClub Cronograma API", version="1.0.0", lifespan=lifespan)
+
+# brotli/gzip conforme o Accept-Encoding (listagens grandes do painel)
+app.add_middleware(CompressaoMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -39,3 +52,6 @@ app.include_router(auth_router)
 
 # ✅ inclui cronograma
 app.include_router(cronograma_router)
+
+# ✅ rotas administrativas (profiler)
+app.include_router(admin_router)
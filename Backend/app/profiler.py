@@ -0,0 +1,163 @@
+# app/profiler.py
+import os
+import sys
+import time
+import random
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from fastapi import Request
+from fastapi.security.utils import get_authorization_scheme_param
+
+from app.security import decode_token
+
+# ===== CONFIG =====
+# Fração das requisições perfiladas (0.0 = desligado). Pode ser alterada em
+# tempo de execução pela rota /admin/profiler.
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "/tmp/cronograma_profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+# Número da linha em cada frame: separa as amostras de uma mesma função por
+# linha, o que fragmenta os totais do flamegraph; por isso vem desligado
+PROFILE_LINES = os.getenv("PROFILE_LINES", "0") == "1"
+
+# Header que força o perfilamento de uma requisição (só vale com token admin)
+PROFILE_HEADER = "X-Profile"
+
+_config = {
+    "sample_rate": PROFILE_SAMPLE_RATE,
+    "interval_ms": PROFILE_INTERVAL_MS,
+    "max_files": PROFILE_MAX_FILES,
+    "lines": PROFILE_LINES,
+}
+_config_lock = threading.Lock()
+_rotacao_lock = threading.Lock()
+
+
+def obter_config() -> Dict[str, Any]:
+    with _config_lock:
+        return dict(_config, dir=str(PROFILE_DIR))
+
+
+def atualizar_config(
+    sample_rate: Optional[float] = None,
+    interval_ms: Optional[float] = None,
+    max_files: Optional[int] = None,
+    lines: Optional[bool] = None,
+) -> Dict[str, Any]:
+    with _config_lock:
+        if sample_rate is not None:
+            _config["sample_rate"] = min(max(float(sample_rate), 0.0), 1.0)
+        if interval_ms is not None:
+            _config["interval_ms"] = max(float(interval_ms), 1.0)
+        if max_files is not None:
+            _config["max_files"] = max(int(max_files), 1)
+        if lines is not None:
+            _config["lines"] = bool(lines)
+    return obter_config()
+
+
+def listar_perfis():
+    if not PROFILE_DIR.exists():
+        return []
+    arquivos = sorted(PROFILE_DIR.glob("*.folded"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [{"arquivo": p.name, "bytes": p.stat().st_size} for p in arquivos]
+
+
+def _header_admin(request: Request) -> bool:
+    """O header X-Profile só é honrado se vier junto de um token admin válido."""
+    if request.headers.get(PROFILE_HEADER, "").lower() not in ("1", "true", "on"):
+        return False
+
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if scheme.lower() != "bearer" or not token:
+        return False
+
+    try:
+        return decode_token(token).get("role") == "admin"
+    except Exception:
+        return False
+
+
+def _deve_perfilar(request: Request) -> bool:
+    if _header_admin(request):
+        return True
+    rate = _config["sample_rate"]
+    return rate > 0 and random.random() < rate
+
+
+def _pilha_colapsada(frame, linhas: bool = False) -> str:
+    """Converte um frame no formato 'collapsed stack' (raiz;...;folha), com frames `modulo:funcao`."""
+    partes = []
+    while frame is not None:
+        code = frame.f_code
+        modulo = frame.f_globals.get("__name__") or Path(code.co_filename).stem
+        parte = f"{modulo}:{code.co_name}"
+        partes.append(f"{parte}:{frame.f_lineno}" if linhas else parte)
+        frame = frame.f_back
+    return ";".join(reversed(partes))
+
+
+def _amostrar(thread_id: int, intervalo: float, linhas: bool, parar: threading.Event, amostras: Counter):
+    while not parar.wait(intervalo):
+        frame = sys._current_frames().get(thread_id)
+        if frame is not None:
+            amostras[_pilha_colapsada(frame, linhas)] += 1
+
+
+def _rotacionar(max_files: int):
+    with _rotacao_lock:
+        arquivos = sorted(PROFILE_DIR.glob("*.folded"), key=lambda p: p.stat().st_mtime)
+        excedentes = len(arquivos) - max_files
+        for p in arquivos[:max(excedentes, 0)]:
+            try:
+                p.unlink()
+            except OSError:
+                pass
+
+
+def _salvar(rota: str, amostras: Counter, duracao_ms: float):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    nome = f"{time.strftime('%Y%m%d-%H%M%S')}_{rota}_{int(duracao_ms)}ms_{os.getpid()}_{threading.get_ident()}.folded"
+    tmp = PROFILE_DIR / (nome + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for pilha, n in amostras.most_common():
+            f.write(f"{pilha} {n}\n")
+    tmp.rename(PROFILE_DIR / nome)
+    _rotacionar(_config["max_files"])
+
+
+@contextmanager
+def perfilar(request: Request, rota: str):
+    """
+    Perfila por amostragem o bloco executado na thread atual.
+    Gera um arquivo .folded (compatível com flamegraph.pl / speedscope) em PROFILE_DIR.
+    """
+    if not _deve_perfilar(request):
+        yield
+        return
+
+    amostras: Counter = Counter()
+    parar = threading.Event()
+    sampler = threading.Thread(
+        target=_amostrar,
+        args=(threading.get_ident(), _config["interval_ms"] / 1000.0, _config["lines"], parar, amostras),
+        daemon=True,
+    )
+    inicio = time.perf_counter()
+    sampler.start()
+    try:
+        yield
+    finally:
+        parar.set()
+        sampler.join()
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        try:
+            if amostras:
+                _salvar(rota, amostras, duracao_ms)
+        except Exception as e:
+            print(f"⚠️ Falha ao salvar perfil de {rota}: {e}")
@@ -0,0 +1,36 @@
+# app/routers/admin.py
+from typing import Optional
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+
+from app import profiler
+from app.security import get_current_admin
+from llm_gateway import obter_gateway
+import pdf_cache
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+class ProfilerConfig(BaseModel):
+    sample_rate: Optional[float] = None
+    interval_ms: Optional[float] = None
+    max_files: Optional[int] = None
+    lines: Optional[bool] = None
+
+
+# 🔒 PROTEGIDA (admin)
+@router.get("/profiler")
+def ver_profiler(user=Depends(get_current_admin)):
+    return {"config": profiler.obter_config(), "perfis": profiler.listar_perfis()}
+
+
+# 🔒 PROTEGIDA (admin)
+@router.post("/profiler")
+def configurar_profiler(config: ProfilerConfig, user=Depends(get_current_admin)):
+    return {"config": profiler.atualizar_config(**config.model_dump())}
+
+
+# 🔒 PROTEGIDA (admin)
+@router.get("/metricas")
+def ver_metricas(user=Depends(get_current_admin)):
+    return {"llm": obter_gateway().metricas(), "pdf": pdf_cache.metricas()}
@@ -1,18 +1,30 @@
 # app/routers/cronograma.py
 import traceback
-from fastapi import APIRouter, HTTPException, Depends, Body
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, Query
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
-from typing import Dict, Any, Optional
-from core import run_cronograma, run_pdf
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, ValidationError
+from typing import Dict, Any, Optional, List, Literal, Union
+from core import run_cronograma, run_cenarios, replanejar
+import io
+from io import BytesIO
 import os
 import json
+import orjson
 from core import send_email_with_pdf
+from pdf_cache import agendar_pdf, obter_pdf
+from armazenamento import carregar_json, expandir_cronograma, serializar_cronograma, chave_idempotencia, catalogo_por_id
+from concorrencia import SingleFlight
+from ingestao import ler_registros, ingerir
+from edicoes import aplicar_operacoes, recalcular_resumo
+from modelos import Cronograma, validar_cronograma_json
 from dotenv import load_dotenv
 load_dotenv()
 from sqlalchemy import create_engine, text
 
-from app.security import get_current_user  # 👈 ADICIONA
+from app.security import get_current_user, get_current_admin  # 👈 ADICIONA
+from app.profiler import perfilar
+from app.serializacao import ORJSONResponse, json_bruto
 
 engine = create_engine(
     os.getenv("DB_URL"),
@@ -23,34 +35,140 @@ engine = create_engine(
 
 router = APIRouter(prefix="/cronograma", tags=["cronograma"])
 
+# Corpo máximo de /pdf e /update (um cronograma completo expandido tem ~60 KB)
+CRONOGRAMA_MAX_BYTES = int(os.getenv("CRONOGRAMA_MAX_BYTES", str(2 * 1024 * 1024)))
+
+# Envios repetidos do mesmo formulário em andamento esperam um único cálculo
+_envios = SingleFlight()
+
+def _modifier(user) -> Optional[str]:
+    """Tenta extrair um identificador do usuário (claims do token: email/sub)."""
+    try:
+        if isinstance(user, dict):
+            return user.get("email") or user.get("username") or user.get("name") or user.get("sub")
+        return getattr(user, "email", None) or getattr(user, "username", None) or getattr(user, "name", None)
+    except Exception:
+        return None
+
+
+def _pre_renderizar_pdf(cronograma_json: Dict[str, Any], expandir: bool = False) -> None:
+    """
+    Agenda o PDF de um cronograma já gravado. Roda depois do commit: uma falha
+    aqui (aula incompleta, pool fora) só deixa o PDF para ser gerado sob
+    demanda, não transforma a escrita salva numa resposta de erro.
+    """
+    try:
+        agendar_pdf(expandir_cronograma(cronograma_json) if expandir else cronograma_json)
+    except Exception as e:
+        print(f"⚠️ Pré-render do PDF não agendado: {type(e).__name__}: {e}")
+
+
 class FormularioAluno(BaseModel):
+    respondent_id: Optional[str] = None
     name: Optional[str] = None
     nivel: str
     email: str
     submitted_at: Optional[str] = None
     respostas: Dict[str, Any]
 
+class Cenario(BaseModel):
+    carga: Optional[str] = None
+    numero_semanas: Optional[int] = Field(None, ge=1, le=104)
+
+class FormularioCenarios(FormularioAluno):
+    cenarios: List[Cenario] = Field(..., min_length=1, max_length=24)
+
+class Replanejamento(BaseModel):
+    numero_semanas: Optional[int] = Field(None, ge=1, le=104)
+    carga: Optional[str] = None
+    a_partir_da_semana: Optional[int] = Field(None, ge=1)
+    versao: Optional[int] = None
+
+async def ler_cronograma(request: Request) -> Cronograma:
+    """
+    Corpo de /pdf e /update: recusado pelo Content-Length antes de ser lido, e
+    validado direto dos bytes numa passada só (modelos.validar_cronograma_json).
+    """
+    tamanho = request.headers.get("content-length")
+    if tamanho and tamanho.isdigit() and int(tamanho) > CRONOGRAMA_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Cronograma maior que {CRONOGRAMA_MAX_BYTES} bytes.")
+    corpo = await request.body()
+    if len(corpo) > CRONOGRAMA_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Cronograma maior que {CRONOGRAMA_MAX_BYTES} bytes.")
+    try:
+        return validar_cronograma_json(corpo)
+    except ValidationError as e:
+        # sem ecoar a entrada: num payload grande, o erro seria do tamanho dele
+        erros = e.errors(include_url=False, include_input=False, include_context=False)
+        raise RequestValidationError([{**erro, "loc": ("body", *erro["loc"])} for erro in erros])
+
+class OperacaoAula(BaseModel):
+    op: Literal["move", "add", "remove", "reorder"]
+    week: Optional[Union[int, str]] = None
+    index: Optional[int] = None
+    from_week: Optional[Union[int, str]] = None
+    from_index: Optional[int] = None
+    to_week: Optional[Union[int, str]] = None
+    to_index: Optional[int] = None
+    order: Optional[List[int]] = None
+    lesson: Optional[Dict[str, Any]] = None
+
+class PatchCronograma(BaseModel):
+    versao: int
+    ops: List[OperacaoAula] = Field(..., min_length=1, max_length=200)
+
 # ✅ PÚBLICA (sem token)
 @router.post("")
-def gerar(form: FormularioAluno):
+def gerar(
+    form: FormularioAluno,
+    request: Request,
+    response: Response,
+    restantes: Optional[int] = Query(None, ge=0, description="Máximo de aulas em 'remaining' (0 = não gera; vazio = todas)"),
+    modo: Optional[Literal["guloso", "otimo"]] = Query(None, description="Montagem das semanas (padrão: SOLVER_MODO)"),
+):
     try:
-        resultado = run_cronograma(form.model_dump())
-
-        dados = {
-            "name": form.name,
-            "email": form.email,
-            "nivel": form.nivel,
-            "respostas": json.dumps(form.respostas),
-            "cronograma": json.dumps(resultado),
-        }
-
-        with engine.connect() as conn:
-            query = text("""
-                INSERT INTO cronogramas (name,email, nivel, respostas, cronograma)
-                VALUES (:name, :email, :nivel, :respostas, :cronograma)
-            """)
-            conn.execute(query, dados)
-            conn.commit()
+        chave = chave_idempotencia(form.model_dump())
+
+        def processar() -> bool:
+            """Calcula e grava; False se esse envio já estava salvo."""
+            with engine.connect() as conn:
+                existente = conn.execute(
+                    text("SELECT 1 FROM cronogramas WHERE chave_idempotencia = :chave"),
+                    {"chave": chave},
+                ).scalar()
+            if existente:
+                return False
+
+            with perfilar(request, "cronograma"):
+                resultado = run_cronograma(form.model_dump(), limite_restantes=restantes, modo=modo)
+
+            dados = {
+                "name": form.name,
+                "email": form.email,
+                "nivel": form.nivel,
+                "respostas": json.dumps(form.respostas, ensure_ascii=False),
+                "cronograma": serializar_cronograma(resultado),
+                "chave": chave,
+            }
+
+            # ON CONFLICT cobre envios simultâneos em outros workers/processos
+            with engine.connect() as conn:
+                query = text("""
+                    INSERT INTO cronogramas (name,email, nivel, respostas, cronograma, chave_idempotencia)
+                    VALUES (:name, :email, :nivel, CAST(:respostas AS jsonb), CAST(:cronograma AS jsonb), :chave)
+                    ON CONFLICT (chave_idempotencia) DO NOTHING
+                """)
+                r = conn.execute(query, dados)
+                conn.commit()
+            if r.rowcount == 1:
+                # PDF já fica pronto para quando o admin baixar/enviar
+                _pre_renderizar_pdf(resultado)
+                return True
+            return False
+
+        criado, coalescido = _envios.fazer(chave, processar)
+        if coalescido or not criado:
+            response.headers["Idempotent-Replay"] = "true"
 
         return {"message": "SHOW!! agora nosso time de especialistas vai criar o seu cronograma e em breve te enviaremos por email 😁"}
 
@@ -62,15 +180,62 @@ def gerar(form: FormularioAluno):
             detail=f"Erro interno: {str(e)}\n\nTraceback:\n{tb_str}"
         )
 
+# ✅ PÚBLICA (sem token): compara variações de carga/semanas, sem salvar
+@router.post("/cenarios")
+def gerar_cenarios(
+    form: FormularioCenarios,
+    restantes: Optional[int] = Query(0, ge=0, description="Máximo de aulas em 'remaining' por cenário"),
+    modo: Optional[Literal["guloso", "otimo"]] = Query(None),
+):
+    try:
+        dados = form.model_dump(exclude={"cenarios"})
+        cenarios = [c.model_dump() for c in form.cenarios]
+        return {"cenarios": run_cenarios(dados, cenarios, limite_restantes=restantes, modo=modo)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# 🔒 PROTEGIDA (admin): importa uma exportação inteira do formulário
+@router.post("/ingestao")
+async def ingestao(
+    request: Request,
+    formato: Optional[Literal["csv", "ndjson"]] = Query(None, description="Padrão: pelo Content-Type (text/csv ou NDJSON)"),
+    workers: int = Query(8, ge=1, le=32),
+    lote: int = Query(100, ge=1, le=1000),
+    modo: Optional[Literal["guloso", "otimo"]] = Query(None),
+    user=Depends(get_current_admin),
+):
+    """
+    Corpo: o arquivo exportado (CSV do Tally ou NDJSON no formato do POST /cronograma).
+    Resposta em NDJSON: um status por linha e, por último, o resumo.
+    """
+    if formato is None:
+        formato = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    corpo = (await request.body()).decode("utf-8-sig")
+
+    def relatorio():
+        resumo = {"total": 0, "criado": 0, "duplicado": 0, "erro": 0}
+        for s in ingerir(engine, ler_registros(io.StringIO(corpo, newline=""), formato), workers, lote, modo):
+            resumo["total"] += 1
+            resumo[s["status"]] += 1
+            yield json.dumps(s, ensure_ascii=False) + "\n"
+        yield json.dumps({"resumo": resumo}) + "\n"
+
+    return StreamingResponse(relatorio(), media_type="application/x-ndjson")
+
 # 🔒 PROTEGIDA (com token)
 @router.post("/pdf")
-def gerar_pdf(cronograma_json: Dict[str, Any], user=Depends(get_current_user)):
+def gerar_pdf(
+    request: Request,
+    user=Depends(get_current_user),
+    cronograma: Cronograma = Depends(ler_cronograma),
+):
     try:
-        pdf_io = run_pdf(cronograma_json)
+        with perfilar(request, "cronograma_pdf"):
+            pdf_io = BytesIO(obter_pdf(cronograma))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    filename = f"cronograma_{cronograma_json.get('email', 'arquivo')}.pdf"
+    filename = f"cronograma_{cronograma.get('email', 'arquivo')}.pdf"
     filename = filename.replace("\n", "_").replace("\r", "_")
     return StreamingResponse(
         pdf_io,
@@ -80,7 +245,7 @@ def gerar_pdf(cronograma_json: Dict[str, Any], user=Depends(get_current_user)):
 
 # 🔒 PROTEGIDA
 @router.post("/email")
-def sendEmail(id: str, user=Depends(get_current_user)):
+def sendEmail(id: str, request: Request, user=Depends(get_current_user)):
     with engine.connect() as conn:
         query = text("""
             SELECT cronograma, email
@@ -94,14 +259,12 @@ def sendEmail(id: str, user=Depends(get_current_user)):
 
     cronograma_raw, email = result
 
-    cronograma_json = (
-        cronograma_raw if isinstance(cronograma_raw, dict)
-        else json.loads(cronograma_raw)
-    )
+    cronograma_json = expandir_cronograma(carregar_json(cronograma_raw))
 
     try:
-        pdf_io = run_pdf(cronograma_json)
-        send_email_with_pdf(email, pdf_io)
+        with perfilar(request, "cronograma_email"):
+            pdf_io = BytesIO(obter_pdf(cronograma_json))
+            send_email_with_pdf(email, pdf_io)
         with engine.begin() as conn:
             update_query = text("""
                 UPDATE cronogramas
@@ -120,17 +283,20 @@ def sendEmail(id: str, user=Depends(get_current_user)):
 # 🔒 PROTEGIDA
 @router.post("/getall")
 def getall(user=Depends(get_current_user)):
+    # JSONB lido como texto: `respostas` vai para a resposta sem decode/re-encode;
+    # `cronograma` só é decodificado para expandir as referências ao catálogo
     with engine.connect() as conn:
         query = text("""
             SELECT 
                 id,
                 email,
                 nivel,
-                respostas,
-                cronograma,
+                respostas::text AS respostas,
+                cronograma::text AS cronograma,
                 status,
                 name,
-                modifier
+                modifier,
+                versao
             FROM cronogramas
             ORDER BY name ASC
         """)
@@ -145,47 +311,142 @@ def getall(user=Depends(get_current_user)):
             "id": str(row["id"]),
             "email": row["email"],
             "nivel": row["nivel"],
-            "respostas": row["respostas"],
-            "cronograma": row["cronograma"],
+            "respostas": json_bruto(row["respostas"]),
+            "cronograma": expandir_cronograma(orjson.loads(row["cronograma"]) if row["cronograma"] else {}),
             "status": row["status"],
             "name": row["name"],
-            "modifier": row["modifier"]
+            "modifier": row["modifier"],
+            "versao": row["versao"]
         })
 
-    return {"status": "success", "count": len(cronogramas), "data": cronogramas}
+    return ORJSONResponse({"status": "success", "count": len(cronogramas), "data": cronogramas})
+
+
+def _agregar(linhas) -> Dict[str, Any]:
+    total = sum(r["total"] for r in linhas)
+    enviados = sum(r["total"] for r in linhas if r["status"])
+    semanas = sum(r["semanas"] for r in linhas)
+    return {
+        "total": total,
+        "enviados": enviados,
+        "pendentes": total - enviados,
+        "editados": sum(r["editados"] for r in linhas),
+        "media_minutos_semana": round(sum(r["minutos"] for r in linhas) / semanas, 1) if semanas else None,
+    }
+
+
+# 🔒 PROTEGIDA
+@router.get("/estatisticas")
+def estatisticas(user=Depends(get_current_user)):
+    """
+    Números do painel (por nível, enviados x pendentes, minutos por semana) sem
+    baixar nenhum cronograma: lê `resumo_cronogramas`, mantido por triggers
+    (migração 005), com no máximo duas linhas por nível.
+    """
+    with engine.connect() as conn:
+        linhas = conn.execute(text("""
+            SELECT nivel, status, total, editados, semanas, minutos
+            FROM resumo_cronogramas
+            WHERE total > 0
+        """)).mappings().fetchall()
+
+    por_nivel: Dict[str, list] = {}
+    for r in linhas:
+        por_nivel.setdefault(r["nivel"], []).append(r)
+
+    return {
+        **_agregar(linhas),
+        "por_nivel": [{"nivel": nivel, **_agregar(por_nivel[nivel])} for nivel in sorted(por_nivel)],
+    }
+
+
+# 🔒 PROTEGIDA
+@router.get("/cobertura")
+def cobertura(nivel: Optional[str] = None, user=Depends(get_current_user)):
+    """
+    Cobertura do catálogo nos cronogramas gravados: aulas que nunca aparecem,
+    aulas que só caem na "remaining" e quantas vezes cada módulo aparece por
+    semana e por nível. Lê `cobertura_aulas` (migração 006), mantida por
+    triggers; o cruzamento com o catálogo é feito aqui.
+    """
+    filtro = "AND nivel = :nivel" if nivel else ""
+    with engine.connect() as conn:
+        por_semana = conn.execute(text(f"""
+            SELECT aula_id, semana, sum(vezes)::bigint AS vezes
+            FROM cobertura_aulas WHERE vezes > 0 {filtro}
+            GROUP BY aula_id, semana
+        """), {"nivel": nivel}).fetchall()
+        por_nivel = conn.execute(text(f"""
+            SELECT nivel, aula_id, sum(vezes)::bigint AS vezes
+            FROM cobertura_aulas WHERE vezes > 0 AND semana > 0 {filtro}
+            GROUP BY nivel, aula_id
+        """), {"nivel": nivel}).fetchall()
+        total = conn.execute(text(f"""
+            SELECT coalesce(sum(total), 0)::bigint FROM resumo_cronogramas WHERE total > 0 {filtro}
+        """), {"nivel": nivel}).scalar()
+
+    catalogo = catalogo_por_id()
+    agendada: Dict[str, int] = {}
+    remaining: Dict[str, int] = {}
+    modulos: Dict[str, Dict[str, Any]] = {}
+    for a in catalogo.values():
+        m = modulos.setdefault(a["module_name"], {
+            "module_name": a["module_name"], "aulas": 0, "vezes": 0, "por_semana": {}, "por_nivel": {},
+        })
+        m["aulas"] += 1
+
+    for aula_id, semana, vezes in por_semana:
+        if semana == 0:
+            remaining[aula_id] = vezes
+            continue
+        agendada[aula_id] = agendada.get(aula_id, 0) + vezes
+        ref = catalogo.get(aula_id)
+        if ref is not None:
+            m = modulos[ref["module_name"]]
+            m["vezes"] += vezes
+            m["por_semana"][semana] = m["por_semana"].get(semana, 0) + vezes
+    for n, aula_id, vezes in por_nivel:
+        ref = catalogo.get(aula_id)
+        if ref is not None:
+            m = modulos[ref["module_name"]]
+            m["por_nivel"][n] = m["por_nivel"].get(n, 0) + vezes
+
+    def _aula(a, **extra):
+        return {"id": a["id"], "module_name": a["module_name"], "lesson_theme": a["lesson_theme"], **extra}
+
+    for m in modulos.values():
+        m["por_semana"] = {str(s): m["por_semana"][s] for s in sorted(m["por_semana"])}
+        m["por_nivel"] = dict(sorted(m["por_nivel"].items()))
+
+    return {
+        "nivel": nivel,
+        "cronogramas": total,
+        "nunca_agendadas": [
+            _aula(a) for i, a in catalogo.items() if i not in agendada and i not in remaining
+        ],
+        "sempre_remaining": [
+            _aula(a, vezes=remaining[i]) for i, a in catalogo.items() if i not in agendada and i in remaining
+        ],
+        "modulos": sorted(modulos.values(), key=lambda m: m["module_name"]),
+    }
 
 
 @router.post("/update")
 def update_cronograma(
     id: str,
-    cronograma_json: Dict[str, Any] = Body(...),
     user=Depends(get_current_user),
+    cronograma: Cronograma = Depends(ler_cronograma),
 ):
     try:
-        # validação mínima (pra evitar salvar lixo)
-        if not isinstance(cronograma_json, dict) or "weeks" not in cronograma_json:
-            raise HTTPException(status_code=400, detail="Payload inválido: esperado um objeto com 'weeks'.")
-
-        # opcional: garantir que weeks é lista
-        if not isinstance(cronograma_json.get("weeks"), list):
-            raise HTTPException(status_code=400, detail="Payload inválido: 'weeks' precisa ser uma lista.")
-
-        cronograma_str = json.dumps(cronograma_json, ensure_ascii=False)
-
-        # tenta extrair um identificador do usuário (depende do seu get_current_user)
-        modifier = None
-        try:
-            if isinstance(user, dict):
-                modifier = user.get("email") or user.get("username") or user.get("name")
-            else:
-                modifier = getattr(user, "email", None) or getattr(user, "username", None) or getattr(user, "name", None)
-        except Exception:
-            modifier = None
+        cronograma_str = serializar_cronograma(cronograma)
+
+        modifier = _modifier(user)
 
         with engine.begin() as conn:
             query = text("""
                 UPDATE cronogramas
-                SET cronograma = :cronograma
+                SET cronograma = CAST(:cronograma AS jsonb),
+                    versao = versao + 1
                 {modifier_clause}
                 WHERE id = :id
             """.format(
@@ -201,6 +462,7 @@ def update_cronograma(
             if result.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Cronograma não encontrado para atualizar.")
 
+        _pre_renderizar_pdf(cronograma)
         return {"status": "success", "message": "Cronograma atualizado com sucesso."}
 
     except HTTPException:
@@ -208,6 +470,136 @@ def update_cronograma(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 # 🔒 PROTEGIDA
+@router.post("/patch")
+def patch_cronograma(id: str, patch: PatchCronograma, user=Depends(get_current_user)):
+    """
+    Edição parcial: aplica operações de aula (move/add/remove/reorder) no servidor,
+    com controle otimista por `versao`, e regrava só as semanas afetadas.
+    """
+    try:
+        with engine.begin() as conn:
+            row = conn.execute(text("""
+                SELECT cronograma, versao
+                FROM cronogramas
+                WHERE id = :id
+                FOR UPDATE
+            """), {"id": id}).fetchone()
+
+            if not row:
+                raise HTTPException(status_code=404, detail="Cronograma não encontrado para atualizar.")
+
+            cronograma_raw, versao_atual = row
+            if versao_atual != patch.versao:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Cronograma foi alterado por outra edição (versão atual {versao_atual}). Recarregue e tente de novo.",
+                )
+
+            cronograma_json = carregar_json(cronograma_raw)
+            if not isinstance(cronograma_json.get("weeks"), list):
+                raise HTTPException(status_code=400, detail="Cronograma salvo sem 'weeks'.")
+
+            try:
+                afetadas = aplicar_operacoes(
+                    cronograma_json, [o.model_dump(exclude_none=True) for o in patch.ops]
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            resumo = recalcular_resumo(cronograma_json, afetadas)
+
+            # jsonb_set só nas semanas alteradas + summary
+            expr = "cronograma"
+            params: Dict[str, Any] = {"id": id, "resumo": json.dumps(resumo)}
+            for n, idx in enumerate(sorted(afetadas)):
+                expr = f"jsonb_set({expr}, ARRAY['weeks', '{idx}'], CAST(:semana_{n} AS jsonb))"
+                params[f"semana_{n}"] = json.dumps(cronograma_json["weeks"][idx], ensure_ascii=False)
+            expr = f"jsonb_set({expr}, ARRAY['summary'], CAST(:resumo AS jsonb))"
+
+            modifier = _modifier(user)
+            if modifier:
+                params["modifier"] = modifier
+
+            conn.execute(text(f"""
+                UPDATE cronogramas
+                SET cronograma = {expr},
+                    versao = versao + 1
+                    {", modifier = :modifier" if modifier else ""}
+                WHERE id = :id
+            """), params)
+
+        _pre_renderizar_pdf(cronograma_json, expandir=True)
+        return {
+            "status": "success",
+            "versao": versao_atual + 1,
+            "summary": resumo,
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# 🔒 PROTEGIDA
+@router.post("/replanejar")
+def replanejar_cronograma(
+    id: str,
+    pedido: Replanejamento,
+    modo: Optional[Literal["guloso", "otimo"]] = Query(None),
+    user=Depends(get_current_user),
+):
+    """Muda número de semanas e/ou carga de um cronograma salvo, recalculando só as semanas afetadas."""
+    try:
+        with engine.begin() as conn:
+            row = conn.execute(text("""
+                SELECT cronograma, versao
+                FROM cronogramas
+                WHERE id = :id
+                FOR UPDATE
+            """), {"id": id}).fetchone()
+
+            if not row:
+                raise HTTPException(status_code=404, detail="Cronograma não encontrado para atualizar.")
+
+            cronograma_raw, versao_atual = row
+            if pedido.versao is not None and pedido.versao != versao_atual:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Cronograma foi alterado por outra edição (versão atual {versao_atual}). Recarregue e tente de novo.",
+                )
+
+            try:
+                novo = replanejar(
+                    expandir_cronograma(carregar_json(cronograma_raw)),
+                    numero_semanas=pedido.numero_semanas,
+                    carga=pedido.carga,
+                    a_partir_da_semana=pedido.a_partir_da_semana,
+                    modo=modo,
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+            params = {"id": id, "cronograma": serializar_cronograma(novo)}
+            modifier = _modifier(user)
+            if modifier:
+                params["modifier"] = modifier
+
+            conn.execute(text(f"""
+                UPDATE cronogramas
+                SET cronograma = CAST(:cronograma AS jsonb),
+                    versao = versao + 1
+                    {", modifier = :modifier" if modifier else ""}
+                WHERE id = :id
+            """), params)
+
+        _pre_renderizar_pdf(novo)
+        return {"status": "success", "versao": versao_atual + 1, "cronograma": novo}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# 🔒 PROTEGIDA
 @router.post("/remove")
 def remove_cronograma(id: str, user=Depends(get_current_user)):
     try:
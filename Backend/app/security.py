@@ -1,5 +1,9 @@
 # app/security.py
 import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
 
@@ -12,6 +16,8 @@ from passlib.context import CryptContext
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY") 
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+# Quantos tokens já verificados manter em memória (0 desliga o cache)
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "1024"))
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -46,15 +52,57 @@ def create_access_token(subject: str, extra_claims: Optional[Dict[str, Any]] = N
     return jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
 
 
+# ===== CACHE DE TOKENS VERIFICADOS =====
+# O painel admin dispara rajadas de chamadas com o mesmo token; guardamos os
+# claims já verificados (chave = sha256 do token) até o "exp" do próprio token.
+_token_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def clear_token_cache() -> None:
+    with _token_cache_lock:
+        _token_cache.clear()
+
+
+def _token_invalido() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token inválido ou expirado",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 def decode_token(token: str) -> Dict[str, Any]:
+    digest = _token_digest(token)
+
+    if JWT_CACHE_SIZE > 0:
+        with _token_cache_lock:
+            hit = _token_cache.get(digest)
+            if hit is not None:
+                payload, exp = hit
+                if exp is None or time.time() < exp:
+                    _token_cache.move_to_end(digest)
+                    return dict(payload)
+                del _token_cache[digest]
+                raise _token_invalido()
+
     try:
-        return jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
     except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token inválido ou expirado",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _token_invalido()
+
+    if JWT_CACHE_SIZE > 0:
+        with _token_cache_lock:
+            _token_cache[digest] = (payload, payload.get("exp"))
+            _token_cache.move_to_end(digest)
+            while len(_token_cache) > JWT_CACHE_SIZE:
+                _token_cache.popitem(last=False)
+
+    return dict(payload)
 
 
 def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
@@ -72,3 +120,13 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
             headers={"WWW-Authenticate": "Bearer"},
         )
     return payload
+
+
+def get_current_admin(user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
+    """Mesma validação do get_current_user, exigindo role=admin."""
+    if user.get("role") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso restrito a administradores",
+        )
+    return user
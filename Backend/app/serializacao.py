@@ -0,0 +1,120 @@
+# app/serializacao.py
+"""
+Resposta JSON com orjson e compressão negociada (brotli/gzip) para as
+listagens grandes do painel (/cronograma/getall).
+
+`json_bruto()` marca um JSON já serializado (ex.: coluna JSONB lida como texto)
+para ser embutido na resposta como está, sem decode/re-encode.
+"""
+import gzip
+from typing import Any, Optional
+
+import anyio
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+try:  # brotli é opcional: sem ele, só gzip
+    import brotli
+except ImportError:
+    brotli = None
+
+# Abaixo disso não compensa comprimir
+COMPRESSAO_MIN_BYTES = 1024
+GZIP_NIVEL = 6
+BROTLI_QUALIDADE = 4  # qualidades altas do brotli custam caro para respostas dinâmicas
+
+_COMPRIMIVEIS = ("application/json", "application/x-ndjson", "text/")
+
+
+class ORJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_bruto(texto: Optional[str]):
+    """JSON já serializado, embutido como está pelo ORJSONResponse (None vira null)."""
+    return None if texto is None else orjson.Fragment(texto)
+
+
+def _escolher_codificacao(accept_encoding: str) -> Optional[str]:
+    """A suportada de maior q no Accept-Encoding (`*` vale para as não citadas); no empate, br."""
+    aceitas = {}
+    for parte in accept_encoding.lower().split(","):
+        nome, _, params = parte.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        aceitas[nome.strip()] = q
+    suportadas = ("br", "gzip") if brotli is not None else ("gzip",)
+    coringa = aceitas.get("*", 0.0)
+    qs = {c: aceitas.get(c, coringa) for c in suportadas}
+    melhor = max(qs.values())
+    if melhor <= 0:
+        return None
+    return next(c for c in suportadas if qs[c] == melhor)
+
+
+def comprimir(corpo: bytes, codificacao: str) -> bytes:
+    if codificacao == "br":
+        return brotli.compress(corpo, quality=BROTLI_QUALIDADE)
+    return gzip.compress(corpo, compresslevel=GZIP_NIVEL)
+
+
+class CompressaoMiddleware:
+    """
+    Comprime com brotli ou gzip (conforme o Accept-Encoding) respostas de corpo
+    único, JSON/texto e acima de COMPRESSAO_MIN_BYTES. Respostas em streaming
+    (PDF, NDJSON da ingestão) passam sem alteração.
+    """
+
+    def __init__(self, app, minimo_bytes: int = COMPRESSAO_MIN_BYTES):
+        self.app = app
+        self.minimo_bytes = minimo_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codificacao = _escolher_codificacao(Headers(scope=scope).get("accept-encoding", ""))
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio_resposta = None
+
+        async def enviar(message):
+            nonlocal inicio_resposta
+            if message["type"] == "http.response.start":
+                inicio_resposta = message
+                return
+            if message["type"] != "http.response.body" or inicio_resposta is None:
+                await send(message)
+                return
+
+            inicio, inicio_resposta = inicio_resposta, None
+            headers = MutableHeaders(raw=inicio["headers"])
+            corpo = message.get("body", b"")
+            comprimivel = (
+                not message.get("more_body", False)
+                and len(corpo) >= self.minimo_bytes
+                and "content-encoding" not in headers
+                and headers.get("content-type", "").startswith(_COMPRIMIVEIS)
+            )
+            if comprimivel:
+                # fora do event loop: listagens grandes levam dezenas de ms para comprimir
+                corpo = await anyio.to_thread.run_sync(comprimir, corpo, codificacao)
+                headers["content-encoding"] = codificacao
+                headers["content-length"] = str(len(corpo))
+                headers.add_vary_header("Accept-Encoding")
+                message = {**message, "body": corpo}
+            await send(inicio)
+            await send(message)
+
+        await self.app(scope, receive, enviar)
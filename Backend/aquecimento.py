@@ -0,0 +1,45 @@
+# aquecimento.py
+"""
+Monta de uma vez o estado somente-leitura do processo: catálogo compilado
+(mmap) e as bases por nível, catálogo por id, índice de temas (indice_temas),
+fontes e artes do PDF (capa e contracapa otimizadas, slogan, células das aulas).
+
+Chamado no master do gunicorn (gunicorn.conf.py, com preload_app) antes do
+fork: os workers já nascem com tudo pronto e compartilham essas páginas
+copy-on-write em vez de cada um montar a sua cópia.
+"""
+import time
+from typing import Callable, Dict
+
+from armazenamento import catalogo_por_id
+from indice_catalogo import aquecer_baselines, obter_catalogo_compilado
+from indice_temas import obter_indice_temas
+from lib import gerar_pdf_bytes
+
+# Aulas por semana no render de aquecimento
+_AULAS_POR_SEMANA = 20
+
+
+def _pdf():
+    # um render com todas as aulas do catálogo: preenche o cache de células,
+    # carrega o slogan e otimiza capa/contracapa
+    aulas = list(obter_catalogo_compilado()["aulas"])
+    gerar_pdf_bytes([aulas[i:i + _AULAS_POR_SEMANA] for i in range(0, len(aulas), _AULAS_POR_SEMANA)])
+
+
+ETAPAS: Dict[str, Callable[[], object]] = {
+    "catalogo": lambda: aquecer_baselines(obter_catalogo_compilado()),
+    "catalogo_por_id": catalogo_por_id,
+    "temas": obter_indice_temas,
+    "pdf": _pdf,
+}
+
+
+def aquecer() -> Dict[str, float]:
+    """Roda todas as etapas; devolve o tempo de cada uma em ms."""
+    tempos = {}
+    for nome, etapa in ETAPAS.items():
+        inicio = time.perf_counter()
+        etapa()
+        tempos[nome] = round((time.perf_counter() - inicio) * 1000, 1)
+    return tempos
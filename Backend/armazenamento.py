@@ -0,0 +1,107 @@
+# armazenamento.py
+"""
+Formato de armazenamento dos cronogramas na coluna JSONB `cronogramas.cronograma`.
+
+As aulas que vêm do catálogo são gravadas só como referência ({"id", "peso"});
+nome do módulo, tema e duração são lidos do catalogo.json na expansão.
+Aulas criadas/editadas à mão no painel (sem id, ou com campos diferentes do
+catálogo) continuam gravadas por completo.
+
+Os ids do catálogo (AUL-XXXX) são permanentes: não reaproveite nem apague ids
+ao editar o catalogo.json, apenas acrescente novos.
+"""
+import json
+import hashlib
+from functools import lru_cache
+from typing import Dict, Any
+
+from lib import carregar_catalogo
+
+# Campos que vêm do catálogo e não precisam ser repetidos em cada cronograma
+CAMPOS_CATALOGO = ("module_name", "lesson_theme", "duration_min")
+
+
+@lru_cache(maxsize=1)
+def catalogo_por_id() -> Dict[str, Dict[str, Any]]:
+    return {aula["id"]: aula for aula in carregar_catalogo()}
+
+
+def carregar_json(valor) -> Dict[str, Any]:
+    """Colunas JSONB chegam como dict; colunas texto antigas chegam como str."""
+    if valor is None:
+        return {}
+    return valor if isinstance(valor, dict) else json.loads(valor)
+
+
+def compactar_aula(aula: Dict[str, Any]) -> Dict[str, Any]:
+    ref = catalogo_por_id().get(aula.get("id"))
+    if ref is None or any(aula.get(k) != ref[k] for k in CAMPOS_CATALOGO):
+        return dict(aula)
+    return {k: v for k, v in aula.items() if k not in CAMPOS_CATALOGO}
+
+
+def expandir_aula(aula: Dict[str, Any]) -> Dict[str, Any]:
+    if "module_name" in aula:
+        return aula
+    ref = catalogo_por_id().get(aula.get("id"))
+    if ref is None:
+        print(f"⚠️ Aula {aula.get('id')} não existe mais no catálogo")
+        return {"module_name": str(aula.get("id")), "lesson_theme": "", "duration_min": 0, **aula}
+    return {
+        "module_name": ref["module_name"],
+        "lesson_theme": ref["lesson_theme"],
+        "duration_min": ref["duration_min"],
+        **aula,
+    }
+
+
+def _mapear_aulas(cronograma: Dict[str, Any], fn) -> Dict[str, Any]:
+    if not isinstance(cronograma, dict) or not isinstance(cronograma.get("weeks"), list):
+        return cronograma
+    return {
+        **cronograma,
+        "weeks": [
+            {**w, "lessons": [fn(a) for a in w.get("lessons", [])]}
+            for w in cronograma["weeks"]
+        ],
+    }
+
+
+def compactar_cronograma(cronograma: Dict[str, Any]) -> Dict[str, Any]:
+    return _mapear_aulas(cronograma, compactar_aula)
+
+
+def expandir_cronograma(cronograma: Dict[str, Any]) -> Dict[str, Any]:
+    return _mapear_aulas(cronograma, expandir_aula)
+
+
+def serializar_cronograma(cronograma: Dict[str, Any]) -> str:
+    """JSON pronto para `CAST(:cronograma AS jsonb)`."""
+    return json.dumps(compactar_cronograma(cronograma), ensure_ascii=False)
+
+
+def _normalizar(valor):
+    if isinstance(valor, str):
+        return " ".join(valor.split())
+    if isinstance(valor, list):
+        return [_normalizar(v) for v in valor]
+    if isinstance(valor, dict):
+        return {k: _normalizar(v) for k, v in valor.items()}
+    return valor
+
+
+def chave_idempotencia(form: Dict[str, Any]) -> str:
+    """
+    Identifica um envio do formulário (coluna `cronogramas.chave_idempotencia`):
+    o `respondent_id` do Tally quando vier; senão um hash de email, nível e respostas.
+    """
+    respondent_id = form.get("respondent_id")
+    if respondent_id:
+        return f"rid:{respondent_id}"
+    conteudo = json.dumps(
+        [str(form.get("email", "")).strip().lower(), form.get("nivel"), _normalizar(form.get("respostas") or {})],
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return "sha256:" + hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
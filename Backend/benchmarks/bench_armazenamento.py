@@ -0,0 +1,67 @@
+# benchmarks/bench_armazenamento.py
+"""
+Compara o formato antigo (aulas completas) com o compacto (referências ao catálogo)
+no caminho de leitura: bytes por cronograma e tempo de decode (+ expansão).
+
+Não precisa de banco: gera alguns cronogramas reais com run_cronograma e percorre
+N linhas sintéticas em ciclo (padrão 100k), sem manter todas em memória.
+
+Uso (a partir de Backend/):
+    python -m benchmarks.bench_armazenamento [n_cronogramas]
+"""
+import os
+import sys
+import json
+import time
+import random
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from core import run_cronograma  # noqa: E402
+from armazenamento import compactar_cronograma, expandir_cronograma  # noqa: E402
+
+CARGAS = ["Até 1h", "Entre 1h e 2h", "Entre 2h e 3h", "Entre 3h e 4h", "Mais de 4h"]
+NIVEIS = ["R1", "R2", "R3", "R4 / medico radiologista"]
+
+
+def _amostras(qtd: int = 200):
+    rnd = random.Random(42)
+    for i in range(qtd):
+        yield run_cronograma({
+            "nivel": rnd.choice(NIVEIS),
+            "email": f"aluno{i}@radioclub.com",
+            "respostas": {
+                "Quanto tempo, por semana, você consegue dedicar aos estudos com o RadioClub?": rnd.choice(CARGAS),
+                "numero_semanas": rnd.choice([4, 8, 12, 24]),
+            },
+        })
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    docs = list(_amostras())
+    completos = [json.dumps(d, ensure_ascii=False) for d in docs]
+    compactos = [json.dumps(compactar_cronograma(d), ensure_ascii=False) for d in docs]
+
+    def medir(blobs, expandir):
+        total_bytes = 0
+        inicio = time.perf_counter()
+        for i in range(n):
+            blob = blobs[i % len(blobs)]
+            total_bytes += len(blob.encode("utf-8"))
+            doc = json.loads(blob)
+            if expandir:
+                expandir_cronograma(doc)
+        return total_bytes, time.perf_counter() - inicio
+
+    b_old, t_old = medir(completos, False)
+    b_new, t_new = medir(compactos, True)
+
+    print(f"cronogramas: {n}")
+    print(f"formato completo : {b_old / n / 1024:7.1f} KiB/linha  {b_old / 2**20:9.1f} MiB  leitura {t_old:6.2f}s")
+    print(f"formato compacto : {b_new / n / 1024:7.1f} KiB/linha  {b_new / 2**20:9.1f} MiB  leitura {t_new:6.2f}s (decode + expansão)")
+    print(f"redução de bytes : {b_old / b_new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# benchmarks/bench_auth.py
+"""
+Microbenchmark do custo de autenticação por requisição (get_current_user).
+
+Uso (a partir de Backend/):
+    python -m benchmarks.bench_auth [n_chamadas]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+
+from app import security  # noqa: E402
+
+
+def medir(n: int, cache_size: int) -> float:
+    security.JWT_CACHE_SIZE = cache_size
+    security.clear_token_cache()
+    token = security.create_access_token("admin@radioclub.com", extra_claims={"role": "admin"})
+
+    inicio = time.perf_counter()
+    for _ in range(n):
+        security.get_current_user(token)
+    return (time.perf_counter() - inicio) / n * 1e6
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    sem_cache = medir(n, 0)
+    com_cache = medir(n, 1024)
+    print(f"chamadas: {n}")
+    print(f"jwt.decode a cada chamada: {sem_cache:8.2f} µs/req")
+    print(f"cache de token verificado: {com_cache:8.2f} µs/req")
+    print(f"ganho: {sem_cache / com_cache:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_classificacao.py
+"""
+Classificação das respostas abertas contra o servidor falso da OpenAI
+(loadtest/fake_openai.py), com N formulários sintéticos (loadtest/formularios.py):
+
+  individual: uma chamada por pergunta aberta, com as 37 categorias no prompt
+  lote      : uma chamada por formulário, saída estruturada (JSON schema)
+  pré-lote  : como nos jobs em lote (ingestao, regenerar): o bloco inteiro
+              em chamadas de até LLM_LOTE_MAX respostas antes do pipeline
+
+Mostra requisições ao provedor, tokens de entrada (estimados pelo servidor
+falso, ~4 caracteres por token) e tempo, e confere que as métricas saem iguais.
+Roda duas vezes: respostas com a repetição dos envios reais (parte vem do
+cache) e respostas todas diferentes (cada formulário paga suas perguntas).
+
+Uso (a partir de Backend/):
+    python -m benchmarks.bench_classificacao [formularios] [threads]
+"""
+import os
+import sys
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("FAKE_PORTA", "8908")
+os.environ.setdefault("FAKE_RPS_LIMITE", "0")
+
+from benchmarks.bench_llm_gateway import _subir_fake  # noqa: E402
+from loadtest import fake_openai  # noqa: E402
+from loadtest.formularios import gerar_formulario  # noqa: E402
+from llm_gateway import LLMGateway  # noqa: E402
+import llm_utils  # noqa: E402
+from core import _perguntas_abertas, calcular_pesos_formulario, preclassificar_formularios  # noqa: E402
+
+
+def _rodar(nome, modo, forms, threads, preclassificar=False):
+    gateway = LLMGateway(rps=1e6, burst=1e6, max_concorrencia=threads)
+    llm_utils.obter_gateway = lambda: gateway
+    llm_utils.LLM_CLASSIFICACAO = modo
+    llm_utils.limpar_cache()
+    fake_openai._stats.clear()
+
+    inicio = time.perf_counter()
+    if preclassificar:
+        preclassificar_formularios(forms, paralelo=threads)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        metricas = list(pool.map(lambda f: calcular_pesos_formulario(f)[1], forms))
+    total = time.perf_counter() - inicio
+
+    stats = fake_openai._stats
+    print(
+        f"{nome:<11} {stats['requisicoes']:>6} req  {stats['prompt_tokens']:>9} tokens "
+        f"({stats['prompt_tokens'] / len(forms):6.0f}/formulário)  {total:6.2f}s"
+    )
+    return metricas
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    rnd = random.Random(7)
+    forms = [gerar_formulario(rnd, i) for i in range(n)]
+    abertas = sum(len(llm_utils.pares_abertos(f["respostas"], _perguntas(f))) for f in forms)
+
+    # mesmas respostas com um sufixo por formulário: nada repete, nada vem do cache
+    unicas = [
+        {**f, "respostas": {
+            k: (f"{v} ({i})" if any(p == k for p, _ in _campos(f)) and isinstance(v, str) and v.strip() else v)
+            for k, v in f["respostas"].items()
+        }}
+        for i, f in enumerate(forms)
+    ]
+
+    servidor = _subir_fake()
+    print(f"{n} formulários, {abertas} respostas abertas, {threads} threads, LLM_LOTE_MAX={llm_utils.LLM_LOTE_MAX}")
+    iguais = True
+    for titulo, amostra in (("respostas repetidas (como nos envios reais)", forms), ("respostas únicas", unicas)):
+        print(f"\n== {titulo}")
+        individual = _rodar("individual", "individual", amostra, threads)
+        lote = _rodar("lote", "lote", amostra, threads)
+        pre = _rodar("pré-lote", "lote", amostra, threads, preclassificar=True)
+        iguais = iguais and individual == lote == pre
+    servidor.should_exit = True
+
+    print("\nmétricas iguais nos três modos" if iguais else "\n⚠️ métricas diferentes entre os modos")
+
+
+def _perguntas(form):
+    return _perguntas_abertas(form.get("nivel"))
+
+
+def _campos(form):
+    return [(p, p) if isinstance(p, str) else p for p in _perguntas(form)]
+
+
+if __name__ == "__main__":
+    main()
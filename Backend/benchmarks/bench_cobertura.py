@@ -0,0 +1,179 @@
+# benchmarks/bench_cobertura.py
+"""
+Cobertura do catálogo (aulas nunca agendadas, só na "remaining", módulos por
+semana e por nível), caminho antigo x novo, com N cronogramas no banco:
+
+  antigo: a consulta do /getall + orjson.loads de cada cronograma + contagem
+          aula por aula em Python
+  novo  : /cronograma/cobertura, que lê `cobertura_aulas` (migração 006)
+
+Confere que os dois dão o mesmo resultado e mede quanto os triggers da
+cobertura custam em cada escrita: INSERT de um cronograma, /patch (uma aula
+muda de semana) e /email (só o status), com e sem os triggers.
+
+Precisa de um Postgres descartável (o do loadtest/docker-compose.yml): insere
+linhas `@bench.radioclub.com` e apaga no fim.
+
+Uso (a partir de Backend/):
+    python -m benchmarks.bench_cobertura [linhas...]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+import orjson  # noqa: E402
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from armazenamento import catalogo_por_id, serializar_cronograma  # noqa: E402
+from benchmarks.bench_armazenamento import _amostras  # noqa: E402
+from benchmarks.bench_estatisticas import DOMINIO, _inserir, _tempo  # noqa: E402
+from loadtest.rodar import DB_URL_PADRAO, _banco_local  # noqa: E402
+from migrar import migrar  # noqa: E402
+
+TRIGGERS = ("cobertura_aulas_ins", "cobertura_aulas_upd", "cobertura_aulas_del")
+
+
+def antigo(engine):
+    with engine.connect() as conn:
+        linhas = conn.execute(text("""
+            SELECT id, email, nivel, respostas::text AS respostas, cronograma::text AS cronograma,
+                   status, name, modifier, versao
+            FROM cronogramas ORDER BY name ASC
+        """)).mappings().fetchall()
+    catalogo = catalogo_por_id()
+    agendada, remaining, por_semana, por_nivel = {}, {}, {}, {}
+    for r in linhas:
+        c = orjson.loads(r["cronograma"]) if r["cronograma"] else {}
+        for w in c.get("weeks", []):
+            for a in w.get("lessons", []):
+                i = a.get("id")
+                if i is None:
+                    continue
+                if w.get("week") == "remaining":
+                    remaining[i] = remaining.get(i, 0) + 1
+                    continue
+                agendada[i] = agendada.get(i, 0) + 1
+                if i in catalogo:
+                    m = catalogo[i]["module_name"]
+                    chave = (m, str(w["week"]))
+                    por_semana[chave] = por_semana.get(chave, 0) + 1
+                    chave = (m, r["nivel"])
+                    por_nivel[chave] = por_nivel.get(chave, 0) + 1
+    return {
+        "nunca_agendadas": sorted(i for i in catalogo if i not in agendada and i not in remaining),
+        "sempre_remaining": sorted((i, remaining[i]) for i in catalogo if i not in agendada and i in remaining),
+        "por_semana": por_semana,
+        "por_nivel": por_nivel,
+    }
+
+
+def novo(engine):
+    from app.routers.cronograma import cobertura
+    return cobertura(nivel=None, user={"sub": "bench"})
+
+
+def _comparavel(resposta):
+    return {
+        "nunca_agendadas": sorted(a["id"] for a in resposta["nunca_agendadas"]),
+        "sempre_remaining": sorted((a["id"], a["vezes"]) for a in resposta["sempre_remaining"]),
+        "por_semana": {(m["module_name"], s): v for m in resposta["modulos"] for s, v in m["por_semana"].items()},
+        "por_nivel": {(m["module_name"], n): v for m in resposta["modulos"] for n, v in m["por_nivel"].items()},
+    }
+
+
+def _triggers(engine, acao):
+    with engine.begin() as conn:
+        for t in TRIGGERS:
+            conn.execute(text(f"ALTER TABLE cronogramas {acao} TRIGGER {t}"))
+
+
+def _escritas(engine, doc, movido, n, inicio):
+    """ms por INSERT, por UPDATE do cronograma (uma aula trocada de semana) e por UPDATE do status."""
+    ids, tempos = [], [0.0, 0.0, 0.0]
+    t = time.perf_counter()
+    for i in range(inicio, inicio + n):
+        with engine.begin() as conn:
+            ids.append(conn.execute(text("""
+                INSERT INTO cronogramas (name, email, nivel, cronograma)
+                VALUES ('Bench', :email, 'R1', CAST(:c AS jsonb)) RETURNING id
+            """), {"email": f"unitario{i}@{DOMINIO}", "c": doc}).scalar())
+    tempos[0] = time.perf_counter() - t
+    t = time.perf_counter()
+    for id_ in ids:
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE cronogramas SET cronograma = CAST(:c AS jsonb), versao = versao + 1 WHERE id = :id"),
+                         {"id": id_, "c": movido})
+    tempos[1] = time.perf_counter() - t
+    t = time.perf_counter()
+    for id_ in ids:
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE cronogramas SET status = true WHERE id = :id"), {"id": id_})
+    tempos[2] = time.perf_counter() - t
+    return [x * 1000 / n for x in tempos]
+
+
+def main():
+    tamanhos = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 50_000]
+    db_url = os.getenv("LOADTEST_DB_URL", DB_URL_PADRAO)
+    if not _banco_local(db_url):
+        sys.exit("LOADTEST_DB_URL não é local; este benchmark grava e apaga linhas")
+    os.environ["DB_URL"] = db_url
+    engine = create_engine(db_url)
+    migrar(engine)
+    amostras = list(_amostras(200))
+    docs = [serializar_cronograma(d) for d in amostras]
+
+    # o /patch de sempre: a primeira aula da semana 1 vai para o fim da semana 2
+    alterado = orjson.loads(docs[0])
+    alterado["weeks"][1]["lessons"].append(alterado["weeks"][0]["lessons"].pop(0))
+    movido = orjson.dumps(alterado).decode()
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM cronogramas WHERE email LIKE :d"), {"d": f"%@{DOMINIO}"})
+    try:
+        inseridas = 0
+        print("linhas     antigo (getall + Python)   novo (cobertura)")
+        for n in tamanhos:
+            with engine.begin() as conn:
+                _inserir(conn, docs, n - inseridas, inseridas)
+            inseridas = n
+            ta, tn = _tempo(antigo, engine), _tempo(novo, engine, repeticoes=20)
+            print(f"{n:>7}   {ta:12.1f} ms              {tn:8.2f} ms")
+
+        # o endpoint bate com a contagem feita do zero
+        iguais = _comparavel(novo(engine)) == antigo(engine)
+        print("cobertura confere com o getall" if iguais else "⚠️ cobertura diverge do getall")
+
+        _escritas(engine, docs[0], movido, 20, 0)  # aquece conexões
+        com = _escritas(engine, docs[0], movido, 300, 100)
+        _triggers(engine, "DISABLE")
+        try:
+            sem = _escritas(engine, docs[0], movido, 300, 1000)
+            # apagadas ainda sem trigger: nunca entraram na cobertura
+            with engine.begin() as conn:
+                conn.execute(text("DELETE FROM cronogramas WHERE email LIKE :d"), {"d": f"unitario1___@{DOMINIO}"})
+        finally:
+            _triggers(engine, "ENABLE")
+        print("ms por escrita       sem triggers   com triggers")
+        for nome, s, c in zip(("INSERT", "UPDATE (patch)", "UPDATE (status)"), sem, com):
+            print(f"{nome:<18} {s:10.2f}   {c:12.2f}")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM cronogramas WHERE email LIKE :d"), {"d": f"%@{DOMINIO}"})
+
+    # a tabela continua batendo com os cronogramas
+    with engine.connect() as conn:
+        diferenca = conn.execute(text("""
+            SELECT count(*) FROM (
+                SELECT c.nivel, a.aula_id, a.semana, count(*) AS vezes
+                FROM cronogramas c, cronograma_aulas(c.cronograma) a GROUP BY 1, 2, 3
+            ) t FULL JOIN (SELECT * FROM cobertura_aulas WHERE vezes <> 0) r USING (nivel, aula_id, semana)
+            WHERE t.vezes IS DISTINCT FROM r.vezes
+        """)).scalar()
+    print("cobertura confere com a tabela" if diferenca == 0 else f"⚠️ cobertura diverge em {diferenca} linha(s)")
+
+
+if __name__ == "__main__":
+    main()
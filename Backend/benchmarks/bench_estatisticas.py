@@ -0,0 +1,148 @@
+# benchmarks/bench_estatisticas.py
+"""
+Números do painel (contagem por nível, enviados x pendentes, minutos por
+semana), caminho antigo x novo, com N cronogramas no banco:
+
+  antigo: a consulta do /getall + orjson.loads de cada cronograma + contagem em
+          Python (o que o painel fazia depois de baixar tudo)
+  novo  : /cronograma/estatisticas, que lê `resumo_cronogramas` (migração 005)
+
+Também mede quanto os triggers custam na escrita: INSERTs de uma linha, com e
+sem os triggers do resumo.
+
+Precisa de um Postgres descartável (o do loadtest/docker-compose.yml): insere
+linhas `@bench.radioclub.com` e apaga no fim.
+
+Uso (a partir de Backend/):
+    python -m benchmarks.bench_estatisticas [linhas...]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+import orjson  # noqa: E402
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from armazenamento import serializar_cronograma  # noqa: E402
+from benchmarks.bench_armazenamento import _amostras  # noqa: E402
+from loadtest.rodar import DB_URL_PADRAO, _banco_local  # noqa: E402
+from migrar import migrar  # noqa: E402
+
+DOMINIO = "bench.radioclub.com"
+NIVEIS = ["R1", "R2", "R3", "R4 / medico radiologista"]
+TRIGGERS = ("resumo_cronogramas_ins", "resumo_cronogramas_upd", "resumo_cronogramas_del")
+
+
+def _inserir(conn, docs, n, inicio=0):
+    conn.execute(text("""
+        INSERT INTO cronogramas (name, email, nivel, cronograma, status, modifier)
+        SELECT 'Bench ' || i, 'aluno' || i || '@' || :dominio, (:niveis)[1 + i % 4],
+               (:docs)[1 + i % cardinality(:docs)]::jsonb, i % 3 = 0,
+               CASE WHEN i % 10 = 0 THEN 'bench' END
+        FROM generate_series(:inicio, :fim - 1) AS i
+    """), {"dominio": DOMINIO, "niveis": NIVEIS, "docs": docs, "inicio": inicio, "fim": inicio + n})
+
+
+def antigo(engine):
+    with engine.connect() as conn:
+        linhas = conn.execute(text("""
+            SELECT id, email, nivel, respostas::text AS respostas, cronograma::text AS cronograma,
+                   status, name, modifier, versao
+            FROM cronogramas ORDER BY name ASC
+        """)).mappings().fetchall()
+    por_nivel = {}
+    for r in linhas:
+        c = orjson.loads(r["cronograma"]) if r["cronograma"] else {}
+        semanas = [w for w in c.get("weeks", []) if w.get("week") != "remaining"]
+        n = por_nivel.setdefault((r["nivel"], r["status"]), [0, 0, 0])
+        n[0] += 1
+        n[1] += len(semanas)
+        n[2] += c.get("summary", {}).get("total_minutes", 0)
+    return por_nivel
+
+
+def novo(engine):
+    from app.routers.cronograma import estatisticas
+    return estatisticas(user={"sub": "bench"})
+
+
+def _tempo(fn, *args, repeticoes=3):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        fn(*args)
+        melhor = min(melhor, (time.perf_counter() - inicio) * 1000)
+    return melhor
+
+
+def _triggers(engine, acao):
+    with engine.begin() as conn:
+        for t in TRIGGERS:
+            conn.execute(text(f"ALTER TABLE cronogramas {acao} TRIGGER {t}"))
+
+
+def _insert_unitario(engine, doc, n, inicio):
+    inicio_t = time.perf_counter()
+    for i in range(inicio, inicio + n):
+        with engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO cronogramas (name, email, nivel, cronograma)
+                VALUES ('Bench', :email, 'R1', CAST(:c AS jsonb))
+            """), {"email": f"unitario{i}@{DOMINIO}", "c": doc})
+    return (time.perf_counter() - inicio_t) * 1000 / n
+
+
+def main():
+    tamanhos = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 50_000]
+    db_url = os.getenv("LOADTEST_DB_URL", DB_URL_PADRAO)
+    if not _banco_local(db_url):
+        sys.exit("LOADTEST_DB_URL não é local; este benchmark grava e apaga linhas")
+    os.environ["DB_URL"] = db_url
+    engine = create_engine(db_url)
+    migrar(engine)
+    docs = [serializar_cronograma(d) for d in _amostras(200)]
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM cronogramas WHERE email LIKE :d"), {"d": f"%@{DOMINIO}"})
+    try:
+        inseridas = 0
+        print("linhas     antigo (getall + Python)   novo (resumo)")
+        for n in tamanhos:
+            with engine.begin() as conn:
+                _inserir(conn, docs, n - inseridas, inseridas)
+            inseridas = n
+            ta, tn = _tempo(antigo, engine), _tempo(novo, engine, repeticoes=20)
+            print(f"{n:>7}   {ta:12.1f} ms              {tn:8.2f} ms")
+
+        # custo dos triggers por INSERT de uma linha
+        _insert_unitario(engine, docs[0], 20, 0)  # aquece conexões
+        com = _insert_unitario(engine, docs[0], 300, 100)
+        _triggers(engine, "DISABLE")
+        try:
+            sem = _insert_unitario(engine, docs[0], 300, 1000)
+            # apagadas ainda sem trigger: nunca entraram no resumo
+            with engine.begin() as conn:
+                conn.execute(text("DELETE FROM cronogramas WHERE email LIKE :d"), {"d": f"unitario1___@{DOMINIO}"})
+        finally:
+            _triggers(engine, "ENABLE")
+        print(f"INSERT de uma linha: {sem:.2f} ms sem triggers, {com:.2f} ms com triggers")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM cronogramas WHERE email LIKE :d"), {"d": f"%@{DOMINIO}"})
+
+    # o resumo continua batendo com a tabela
+    with engine.connect() as conn:
+        diferenca = conn.execute(text("""
+            SELECT count(*) FROM (
+                SELECT nivel, status, count(*) AS total, sum(cronograma_minutos(cronograma)) AS minutos
+                FROM cronogramas GROUP BY 1, 2
+            ) t FULL JOIN (SELECT * FROM resumo_cronogramas WHERE total <> 0) r USING (nivel, status)
+            WHERE t.total IS DISTINCT FROM r.total OR t.minutos IS DISTINCT FROM r.minutos
+        """)).scalar()
+    print("resumo confere com a tabela" if diferenca == 0 else f"⚠️ resumo diverge em {diferenca} grupo(s)")
+
+
+if __name__ == "__main__":
+    main()
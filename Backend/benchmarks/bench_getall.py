@@ -0,0 +1,117 @@
+# benchmarks/bench_getall.py
+"""
+Listagem do painel (/cronograma/getall) com N linhas (padrão 10k): tempo de
+montagem + encode e bytes na rede, caminho antigo x novo.
+
+  antigo: JSONB decodificado pelo driver (json.loads) -> expansão ->
+          jsonable_encoder + JSONResponse (json.dumps)
+  novo  : JSONB como texto -> `respostas` embutido como está (orjson.Fragment),
+          `cronograma` via orjson.loads -> expansão -> ORJSONResponse
+
+Não precisa de banco: as linhas são montadas a partir de cronogramas reais.
+
+Uso (a partir de Backend/):
+    python -m benchmarks.bench_getall [linhas]
+"""
+import os
+import sys
+import json
+import time
+import random
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+import orjson  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+
+from armazenamento import expandir_cronograma, serializar_cronograma  # noqa: E402
+from app.serializacao import ORJSONResponse, comprimir, json_bruto, brotli  # noqa: E402
+from benchmarks.bench_armazenamento import _amostras  # noqa: E402
+
+RESPOSTAS = {
+    "Quais seus objetivos com o Curso Radioclub?": [
+        "Melhorar interpretação de exames no dia a dia",
+        "Complementar minha formação como residente de radiologia",
+    ],
+    "Em qual hospital você faz/fez a residência?": "Hospital de exemplo",
+    "Quais exames de imagem você já tem contato na prática ou vai ter nesse início de R1?": ["RX", "USG", "TC"],
+    "Quanto tempo, por semana, você consegue dedicar aos estudos com o RadioClub?": "Entre 2h e 3h",
+}
+
+
+BLOCO = 1000
+
+
+def _linhas(n):
+    # cronogramas distintos o bastante para não inflar a compressão com repetição entre linhas
+    docs = [serializar_cronograma(d) for d in _amostras(400)]
+    rnd = random.Random(1)
+    respostas = json.dumps(RESPOSTAS, ensure_ascii=False)
+    return [
+        {
+            "id": f"00000000-0000-0000-0000-{i:012d}", "email": f"aluno{i}@radioclub.com", "nivel": "R1",
+            "respostas": respostas, "cronograma": rnd.choice(docs),
+            "status": False, "name": f"Aluno {i}", "modifier": None, "versao": 0,
+        }
+        for i in range(n)
+    ]
+
+
+def antigo(linhas):
+    data = [{
+        **{k: r[k] for k in ("id", "email", "nivel", "status", "name", "modifier", "versao")},
+        "respostas": json.loads(r["respostas"]),
+        "cronograma": expandir_cronograma(json.loads(r["cronograma"])),
+    } for r in linhas]
+    conteudo = jsonable_encoder({"status": "success", "count": len(data), "data": data})
+    return JSONResponse(conteudo).body
+
+
+def novo(linhas):
+    data = [{
+        **{k: r[k] for k in ("id", "email", "nivel", "status", "name", "modifier", "versao")},
+        "respostas": json_bruto(r["respostas"]),
+        "cronograma": expandir_cronograma(orjson.loads(r["cronograma"])),
+    } for r in linhas]
+    return ORJSONResponse({"status": "success", "count": len(data), "data": data}).body
+
+
+def _tempo(fn, *args):
+    inicio = time.perf_counter()
+    out = fn(*args)
+    return out, (time.perf_counter() - inicio) * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    linhas = _linhas(n)
+
+    # mesma saída nos dois caminhos
+    assert json.loads(antigo(linhas[:50])) == json.loads(novo(linhas[:50]))
+
+    # medido em blocos de BLOCO linhas (somando tempo e bytes): 10k linhas montadas de
+    # uma vez no caminho antigo passam de alguns GB de RAM
+    codificacoes = ["gzip", "br"] if brotli is not None else ["gzip"]
+    total = {"antigo": [0.0, 0], "novo": [0.0, 0], **{c: [0.0, 0] for c in codificacoes}}
+    for i in range(0, n, BLOCO):
+        bloco = linhas[i:i + BLOCO]
+        for nome, fn in (("antigo", antigo), ("novo", novo)):
+            corpo, t = _tempo(fn, bloco)
+            total[nome][0] += t
+            total[nome][1] += len(corpo)
+        for cod in codificacoes:
+            comprimido, t = _tempo(comprimir, corpo, cod)
+            total[cod][0] += t
+            total[cod][1] += len(comprimido)
+
+    print(f"{n} linhas")
+    print(f"antigo (json + jsonable_encoder): {total['antigo'][0]:8.0f} ms  {total['antigo'][1] / 2**20:7.1f} MiB")
+    print(f"novo   (orjson + pass-through)  : {total['novo'][0]:8.0f} ms  {total['novo'][1] / 2**20:7.1f} MiB")
+    for cod in codificacoes:
+        t, b = total[cod]
+        print(f"  + {cod:4}: {t:8.0f} ms  {b / 2**20:7.1f} MiB na rede ({total['novo'][1] / b:.1f}x menor)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# benchmarks/bench_llm_cauda.py
+"""
+Proteção de cauda do gateway do LLM, contra o servidor falso:
+  - cauda lenta: 5% das respostas demoram 5 s — latência sem hedge x com hedge;
+  - queda: o provedor passa a responder 500 — tempo por resposta com o disjuntor.
+
+Uso (a partir de Backend/):
+    python -m benchmarks.bench_llm_cauda [respostas] [threads]
+"""
+import os
+import sys
+import time
+import random
+
+os.environ.setdefault("FAKE_PORTA", "8908")
+os.environ.setdefault("FAKE_RPS_LIMITE", "0")
+os.environ.setdefault("LLM_BACKOFF_BASE_MS", "50")
+
+from benchmarks.bench_llm_gateway import RESPOSTAS, _rodar, _subir_fake  # noqa: E402
+from loadtest import fake_openai  # noqa: E402
+from llm_gateway import LLMGateway  # noqa: E402
+
+
+def main():
+    respostas = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    rnd = random.Random(5)
+    pedidos = [f"{rnd.choice(RESPOSTAS)} caso {i}" for i in range(respostas)]  # todas únicas
+
+    servidor = _subir_fake()
+
+    fake_openai.FAKE_TAXA_LENTA, fake_openai.FAKE_LENTA_MS = 0.05, 5000
+    print(f"cauda lenta: {respostas} respostas, {threads} threads, 5% levam 5 s\n")
+    _rodar("sem hedge", LLMGateway(rps=1e9, burst=1e9, max_concorrencia=32, hedge=False), pedidos, threads, True)
+    gateway = LLMGateway(rps=1e9, burst=1e9, max_concorrencia=32, hedge=True)
+    # aquece a janela de latências para o atraso do hedge sair do p95, não do padrão
+    for _ in range(30):
+        gateway._latencias.append(fake_openai.FAKE_LATENCIA_MS)
+    _rodar("com hedge", gateway, pedidos, threads, True)
+
+    time.sleep(fake_openai.FAKE_LENTA_MS / 1000.0)  # requisições perdedoras do hedge terminam
+    fake_openai.FAKE_TAXA_LENTA, fake_openai.FAKE_TAXA_ERRO = 0.0, 1.0
+    print("\nqueda: o provedor responde 500 em todas as chamadas\n")
+    _rodar("com disjuntor", LLMGateway(rps=1e9, burst=1e9, max_concorrencia=32), pedidos[:100], threads, True)
+    servidor.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_llm_gateway.py
+"""
+Pico de formulários contra o servidor falso da OpenAI (loadtest/fake_openai.py):
+N classificações concorrentes, parte delas repetidas, com o provedor limitando
+a taxa (429). Mostra vazão, latência e os contadores do gateway.
+
+Uso (a partir de Backend/):
+    python -m benchmarks.bench_llm_gateway [formularios] [threads]
+"""
+import os
+import sys
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+PORTA = int(os.getenv("FAKE_PORTA", "8907"))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("OPENAI_BASE_URL", f"http://127.0.0.1:{PORTA}/v1")
+os.environ.setdefault("FAKE_LATENCIA_MS", "150")
+os.environ.setdefault("FAKE_JITTER_MS", "50")
+os.environ.setdefault("FAKE_RPS_LIMITE", "40")
+
+import uvicorn  # noqa: E402
+
+from loadtest import fake_openai  # noqa: E402
+from llm_gateway import LLMGateway  # noqa: E402
+import llm_utils  # noqa: E402
+
+RESPOSTAS = [
+    "tc de abdome e rm de neuro", "usg", "mamografia", "rx de tórax", "pet-ct e oncologia",
+    "doppler", "nenhum em especial", "angio tc", "densitometria", "rm musculoesqueletico",
+]
+
+
+def _subir_fake():
+    servidor = uvicorn.Server(uvicorn.Config(fake_openai.app, host="127.0.0.1", port=PORTA, log_level="warning"))
+    threading.Thread(target=servidor.run, daemon=True).start()
+    while not servidor.started:
+        time.sleep(0.05)
+    return servidor
+
+
+def main():
+    formularios = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    rnd = random.Random(3)
+    # metade repetida (respostas curtas iguais), metade única
+    pedidos = [
+        rnd.choice(RESPOSTAS) if i % 2 else f"{rnd.choice(RESPOSTAS)} caso {i}"
+        for i in range(formularios)
+    ]
+
+    servidor = _subir_fake()
+    print(f"{formularios} respostas, {threads} threads, provedor limitado a {fake_openai.FAKE_RPS_LIMITE:.0f} req/s\n")
+
+    # sem controle: cada resposta chama o provedor direto, sem nova tentativa
+    gateway = LLMGateway(rps=1e9, burst=1e9, max_concorrencia=threads, tentativas=1, hedge=False)
+    _rodar("sem controle", gateway, pedidos, threads, coalescer=False)
+
+    gateway = LLMGateway(rps=30, burst=10, max_concorrencia=16)
+    _rodar("gateway", gateway, pedidos, threads, coalescer=True)
+    servidor.should_exit = True
+
+
+def _rodar(nome, gateway, pedidos, threads, coalescer):
+    llm_utils.obter_gateway = lambda: gateway
+    llm_utils.limpar_cache()
+    fake_openai._stats.clear()
+    if not coalescer:
+        gateway.voos.fazer = lambda chave, fn: (fn(), False)
+
+    latencias = []
+    classificadas = []
+
+    def um(resposta):
+        inicio = time.perf_counter()
+        metricas = llm_utils.processar_resposta_aberta("Quais exames você mais lauda?", resposta, {})
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        classificadas.append(bool(metricas))
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(um, pedidos))
+    total = time.perf_counter() - inicio
+
+    latencias.sort()
+    p = lambda q: latencias[min(int(q * len(latencias)), len(latencias) - 1)]  # noqa: E731
+    print(f"== {nome}: {total:.2f}s ({len(pedidos) / total:.1f}/s), {sum(classificadas)} com métricas")
+    print(f"   latência p50={p(0.5):.0f}ms p95={p(0.95):.0f}ms p99={p(0.99):.0f}ms")
+    print(f"   gateway: {gateway.metricas()}")
+    print(f"   servidor falso: {dict(fake_openai._stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/bench_payload.py
+"""
+Corpo de /cronograma/pdf e /cronograma/update até o ponto em que o trabalho de
+verdade começa (chave do PDF / JSON para o banco), caminho antigo x novo.
+
+  antigo: json.loads -> Dict[str, Any] (o que o FastAPI fazia) -> semanas_pdf
+          remontando cada aula em dict -> chave com json.dumps(sort_keys)
+  novo  : validar_cronograma_json (Pydantic, direto dos bytes) -> semanas_pdf
+          com as próprias aulas -> chave só com os campos impressos
+
+Também mede quanto custa recusar um payload inválido (duração errada na última
+aula, o pior caso para a validação).
+
+Uso (a partir de Backend/):
+    python -m benchmarks.bench_payload [repeticoes]
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+from typing import Any, Dict
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from pydantic import TypeAdapter, ValidationError  # noqa: E402
+
+from armazenamento import serializar_cronograma  # noqa: E402
+from benchmarks.bench_armazenamento import _amostras  # noqa: E402
+from core import semanas_pdf  # noqa: E402
+from modelos import validar_cronograma_json  # noqa: E402
+from pdf_cache import PDF_LAYOUT_VERSAO, chave_pdf  # noqa: E402
+
+_DICT = TypeAdapter(Dict[str, Any])
+
+
+def _semanas_antigo(cronograma_json):
+    return [
+        [
+            {"module_name": a.get("module_name"), "lesson_theme": a.get("lesson_theme"), "duration_min": a.get("duration_min")}
+            for a in w.get("lessons", [])
+        ]
+        for w in cronograma_json.get("weeks", [])
+        if w.get("week") != "remaining"
+    ]
+
+
+def pdf_antigo(corpo: bytes) -> str:
+    cronograma_json = _DICT.validate_python(json.loads(corpo))
+    conteudo = json.dumps(_semanas_antigo(cronograma_json), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"v{PDF_LAYOUT_VERSAO}:{conteudo}".encode("utf-8")).hexdigest()
+
+
+def pdf_novo(corpo: bytes) -> str:
+    return chave_pdf(semanas_pdf(validar_cronograma_json(corpo)))
+
+
+def update_antigo(corpo: bytes) -> str:
+    cronograma_json = _DICT.validate_python(json.loads(corpo))
+    if "weeks" not in cronograma_json or not isinstance(cronograma_json["weeks"], list):
+        raise ValueError("payload inválido")
+    return serializar_cronograma(cronograma_json)
+
+
+def update_novo(corpo: bytes) -> str:
+    return serializar_cronograma(validar_cronograma_json(corpo))
+
+
+def recusar(corpo: bytes):
+    try:
+        validar_cronograma_json(corpo)
+    except ValidationError:
+        return
+    raise AssertionError("payload inválido passou")
+
+
+def _tempo(fn, corpos, repeticoes):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for c in corpos:
+            fn(c)
+        melhor = min(melhor, (time.perf_counter() - inicio) * 1000 / len(corpos))
+    return melhor
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    docs = list(_amostras(200))
+    corpos = [json.dumps(d, ensure_ascii=False).encode() for d in docs]
+
+    # o que vai para o banco não muda
+    for c in corpos[:20]:
+        assert json.loads(update_antigo(c)) == json.loads(update_novo(c))
+
+    invalidos = []
+    for d in docs:
+        ruim = json.loads(json.dumps(d))
+        ruim["weeks"][-1]["lessons"][-1]["duration_min"] = "meia hora"
+        invalidos.append(json.dumps(ruim, ensure_ascii=False).encode())
+
+    kb = sum(map(len, corpos)) / len(corpos) / 1024
+    print(f"{len(corpos)} cronogramas, {kb:.0f} KB em média (ms por payload, melhor de {repeticoes})")
+    for nome, antigo, novo in (("pdf", pdf_antigo, pdf_novo), ("update", update_antigo, update_novo)):
+        ta, tn = _tempo(antigo, corpos, repeticoes), _tempo(novo, corpos, repeticoes)
+        print(f"{nome:>7}: antigo {ta:6.2f}  novo {tn:6.2f}  ({ta / tn:.1f}x)")
+    print(f"recusa (inválido na última aula): {_tempo(recusar, invalidos, repeticoes):6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_pdf.py
+"""
+Tamanho e tempo de render do PDF do cronograma, sem x com a otimização de
+saída (otimizar_pdf.py), para 4, 12 e 24 semanas. Mostra também o tamanho em
+base64 (como vai no anexo do SendGrid) e confere que as fontes estão em subset
+e que o slogan é uma imagem só. Por último, um lote de cronogramas distintos
+(como numa exportação em massa) sem x com o cache de células de aula.
+
+Uso (a partir de Backend/):
+    python -m benchmarks.bench_pdf [repeticoes] [cronogramas_no_lote]
+"""
+import os
+import sys
+import time
+from io import BytesIO
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from PyPDF2 import PdfReader  # noqa: E402
+
+import lib  # noqa: E402
+from core import run_cronograma, semanas_pdf  # noqa: E402
+from benchmarks.bench_armazenamento import _amostras  # noqa: E402
+from otimizar_pdf import fontes_sem_subset, tamanho_base64  # noqa: E402
+
+
+def _semanas(n):
+    return semanas_pdf(run_cronograma({
+        "nivel": "R1",
+        "email": "bench@radioclub.com",
+        "respostas": {
+            "Quanto tempo, por semana, você consegue dedicar aos estudos com o RadioClub?": "Entre 3h e 4h",
+            "numero_semanas": n,
+        },
+    }))
+
+
+def _render(semanas, otimizar, repeticoes):
+    lib.PDF_OTIMIZAR = otimizar
+    lib.gerar_pdf_bytes(semanas)  # aquecimento (capa/contracapa otimizadas ficam em cache)
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        dados = lib.gerar_pdf_bytes(semanas).getvalue()
+    return dados, (time.perf_counter() - inicio) * 1000 / repeticoes
+
+
+def _imagens(paginas):
+    ids = set()
+    for pagina in paginas:
+        xobjects = pagina["/Resources"].get_object().get("/XObject")
+        for ref in (xobjects.get_object().values() if xobjects else []):
+            if ref.get_object().get("/Subtype") == "/Image":
+                ids.add(ref.idnum)
+    return len(ids)
+
+
+def _lote(docs, cache):
+    lib.PDF_CELULAS_CACHE = cache
+    lib._celulas.clear()
+    inicio = time.perf_counter()
+    for semanas in docs:
+        lib.gerar_pdf_bytes(semanas)
+    return (time.perf_counter() - inicio) * 1000
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    n_lote = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    print(f"{'semanas':>7} | {'original':>10} {'base64':>10} {'ms':>6} | {'otimizado':>10} {'base64':>10} {'ms':>6} | redução")
+    for n in (4, 12, 24):
+        semanas = _semanas(n)
+        antes, t_antes = _render(semanas, False, repeticoes)
+        depois, t_depois = _render(semanas, True, repeticoes)
+        print(
+            f"{n:>7} | {len(antes):>10,} {tamanho_base64(len(antes)):>10,} {t_antes:>6.0f} | "
+            f"{len(depois):>10,} {tamanho_base64(len(depois)):>10,} {t_depois:>6.0f} | "
+            f"{1 - len(depois) / len(antes):.0%}"
+        )
+
+    reader = PdfReader(BytesIO(depois))
+    sem_subset = fontes_sem_subset(reader)
+    print(f"fontes sem subset: {sem_subset or 'nenhuma'}")
+    miolo = list(reader.pages)[1:-1]
+    print(f"imagens distintas no miolo ({len(miolo)} páginas): {_imagens(miolo)}")
+
+    docs = [semanas_pdf(d) for d in _amostras(n_lote)]
+    semanas_total = sum(len(d) for d in docs)
+    cache = lib.PDF_CELULAS_CACHE
+    # alternado e com o melhor de 2, para o aquecimento não pesar só de um lado
+    sem, com = float("inf"), float("inf")
+    for _ in range(2):
+        sem = min(sem, _lote(docs, 0))
+        com = min(com, _lote(docs, cache))
+    print(f"lote de {n_lote} cronogramas ({semanas_total} semanas):")
+    print(f"  sem cache de células: {sem:8.0f} ms  {sem / semanas_total:5.1f} ms/semana")
+    print(f"  com cache de células: {com:8.0f} ms  {com / semanas_total:5.1f} ms/semana  ({len(lib._celulas)} células)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_solver.py
+"""
+Qualidade (peso total agendado e minutos usados) e latência do modo guloso x ótimo,
+para catálogos de tamanhos diferentes (o catálogo real replicado com variações).
+
+Uso (a partir de Backend/):
+    python -m benchmarks.bench_solver [orcamento_ms]
+"""
+import os
+import sys
+import time
+import copy
+import random
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from lib import gerar_cronograma  # noqa: E402
+from otimizador import gerar_cronograma_otimo  # noqa: E402
+from indice_catalogo import obter_catalogo_compilado, calcular_pesos_esparso  # noqa: E402
+from metricas_base import METRICAS  # noqa: E402
+from common import configurar_metricas_comuns  # noqa: E402
+
+CENARIOS = [(30, 60, 4), (90, 180, 12), (120, 240, 12), (240, 360, 24)]
+
+
+def _pesos_base():
+    metricas = copy.deepcopy(METRICAS)
+    configurar_metricas_comuns(metricas, {"nivel": "R2", "respostas": {}})
+    metricas["exame_rx"] += 4
+    metricas["subespecialidade_neuro"] += 4
+    return calcular_pesos_esparso(obter_catalogo_compilado(), metricas, "R2")
+
+
+def _replicar(pesos, fator, rnd):
+    out = list(pesos)
+    for _ in range(fator - 1):
+        out += [
+            {**a, "duration_min": max(5, a["duration_min"] + rnd.randint(-10, 10)),
+             "peso": round(a["peso"] * rnd.uniform(0.8, 1.2), 4)}
+            for a in pesos
+        ]
+    return out
+
+
+def _medir(fn):
+    inicio = time.perf_counter()
+    semanas, _ = fn()
+    ms = (time.perf_counter() - inicio) * 1000
+    peso = sum(a["peso"] for s in semanas for a in s)
+    minutos = sum(a["duration_min"] for s in semanas for a in s)
+    return peso, minutos, ms
+
+
+def main():
+    orcamento = float(sys.argv[1]) if len(sys.argv) > 1 else 200.0
+    rnd = random.Random(7)
+    base = _pesos_base()
+
+    print(f"orçamento do modo ótimo: {orcamento:.0f} ms")
+    print(f"{'aulas':>6} {'min-max':>8} {'sem':>4} | {'guloso peso/min/ms':>24} | {'ótimo peso/min/ms':>24}")
+    for fator in (1, 2, 4):
+        pesos = _replicar(base, fator, rnd)
+        for tmin, tmax, semanas in CENARIOS:
+            g = _medir(lambda: gerar_cronograma(pesos, tmax, semanas, tmin, limite_restantes=0))
+            o = _medir(lambda: gerar_cronograma_otimo(pesos, tmax, semanas, tmin, orcamento_ms=orcamento, limite_restantes=0))
+            print(
+                f"{len(pesos):>6} {tmin:>3}-{tmax:<4} {semanas:>4} | "
+                f"{g[0]:>9.1f} {g[1]:>6} {g[2]:>7.1f} | {o[0]:>9.1f} {o[1]:>6} {o[2]:>7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_temas.py
+"""
+Índice de temas (indice_temas.py): tempo de montagem, latência por consulta
+e, para algumas respostas abertas de exemplo, as aulas encontradas e em que
+semana do cronograma elas caem sem e com o bônus (TEMAS_BOOST).
+
+Uso (a partir de Backend/):
+    python -m benchmarks.bench_temas [repeticoes]
+"""
+import os
+import sys
+import time
+import copy
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from lib import gerar_cronograma  # noqa: E402
+from core import aplicar_temas_citados  # noqa: E402
+from indice_catalogo import obter_catalogo_compilado, calcular_pesos_esparso  # noqa: E402
+from indice_temas import TEMAS_BOOST, IndiceTemas, separar_temas  # noqa: E402
+from metricas_base import METRICAS  # noqa: E402
+from common import configurar_metricas_comuns  # noqa: E402
+from r1 import PERGUNTAS_TEMAS  # noqa: E402
+
+RESPOSTAS = [
+    "Pneumonia, AVC, Aneurisma, Abdome Agudo, Fraturas, física",
+    "TEP e apendicite",
+    "rm de joelho, ombro",
+    "nódulos de tireoide",
+    "PET-CT, angio tc",
+    "mama",
+    "ainda não sei",
+]
+
+
+def _semana(semanas, ids):
+    onde = {a["id"]: n for n, s in enumerate(semanas, 1) for a in s}
+    return [onde.get(i, "-") for i in ids]
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    aulas = obter_catalogo_compilado()["aulas"]
+
+    inicio = time.perf_counter()
+    indice = IndiceTemas(aulas)
+    print(f"{len(aulas)} aulas, {len(indice.postings)} palavras: índice montado em "
+          f"{(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    # consulta fria (sem o cache de expansão) e quente, por resposta
+    for nome, limpar in (("fria", True), ("quente", False)):
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            if limpar:
+                indice._expandir.cache_clear()
+            for r in RESPOSTAS:
+                indice.aulas_citadas([r])
+        us = (time.perf_counter() - inicio) * 1e6 / (repeticoes * len(RESPOSTAS))
+        print(f"consulta {nome:<6}: {us:6.1f} µs por resposta")
+
+    metricas = copy.deepcopy(METRICAS)
+    configurar_metricas_comuns(metricas, {"nivel": "R1", "respostas": {}})
+    base = calcular_pesos_esparso(obter_catalogo_compilado(), metricas, "R1")
+
+    print(f"\nTEMAS_BOOST={TEMAS_BOOST:g}; semana da aula num cronograma R1 de 12 semanas, 3h/semana "
+          "(sem bônus -> com bônus, '-' = ficou de fora)")
+    for resposta in RESPOSTAS:
+        form = {"nivel": "R1", "respostas": {PERGUNTAS_TEMAS[1]: resposta}}
+        pesos = copy.deepcopy(base)
+        aplicar_temas_citados(pesos, form)
+        citadas = sorted(indice.aulas_citadas([resposta]).items(), key=lambda x: -x[1])
+        ids = [aulas[i]["id"] for i, _ in citadas]
+        antes = _semana(gerar_cronograma(copy.deepcopy(base), 180, 12, 90)[0], ids)
+        depois = _semana(gerar_cronograma(pesos, 180, 12, 90)[0], ids)
+
+        print(f"\n\"{resposta}\" -> {separar_temas(resposta)}: {len(citadas)} aulas")
+        for (i, bonus), a, d in zip(citadas, antes, depois):
+            print(f"  +{bonus:4.1f}  semana {a!s:>2} -> {d!s:>2}  {aulas[i]['module_name']} / {aulas[i]['lesson_theme']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# benchmarks/bench_workers.py
+"""
+Memória por worker e tempo de subida do gunicorn (gunicorn.conf.py), com e
+sem preload (PRELOAD=1 x PRELOAD=0).
+
+Sobe o servidor com N workers, exercita /cronograma/cenarios e /cronograma/pdf
+(catálogo, regras e PDF em todos os workers), e lê /proc/<pid>/smaps_rollup de
+cada worker:
+  USS = memória só daquele processo (Private_Clean + Private_Dirty): é o que
+        cada worker a mais custa de verdade;
+  PSS = RSS com as páginas compartilhadas divididas entre os processos.
+Depois mata um worker e mede quanto tempo o substituto leva para atender.
+
+Precisa de Linux (/proc) e das variáveis do .env (DB_URL, JWT_SECRET_KEY);
+não precisa de banco nem de LLM.
+
+Uso (a partir de Backend/):
+    python -m benchmarks.bench_workers [workers]
+"""
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import tempfile
+import subprocess
+import urllib.request
+from pathlib import Path
+
+from dotenv import load_dotenv
+load_dotenv()
+
+CARGA = "Quanto tempo, por semana, você consegue dedicar aos estudos com o RadioClub?"
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _post(url, corpo, token=None):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    req = urllib.request.Request(url, data=json.dumps(corpo).encode(), headers=headers, method="POST")
+    with urllib.request.urlopen(req, timeout=60) as r:
+        return r.read()
+
+
+def _filhos(pid):
+    filhos = []
+    for d in Path("/proc").iterdir():
+        if d.name.isdigit():
+            try:
+                if int((d / "stat").read_text().rsplit(")", 1)[1].split()[1]) == pid:
+                    filhos.append(int(d.name))
+            except (OSError, IndexError, ValueError):
+                pass
+    return sorted(filhos)
+
+
+def _memoria(pid):
+    campos = {}
+    for linha in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        nome, valor = linha.split(":", 1)
+        campos[nome] = int(valor.split()[0])  # kB
+    return {
+        "rss": campos["Rss"] / 1024,
+        "pss": campos["Pss"] / 1024,
+        "uss": (campos["Private_Clean"] + campos["Private_Dirty"]) / 1024,
+    }
+
+
+def _pronto(url, limite_s=120):
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < limite_s:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return time.perf_counter() - inicio
+        except OSError:
+            time.sleep(0.02)
+    raise RuntimeError("servidor não subiu")
+
+
+def rodar(preload: bool, n_workers: int):
+    from app.security import create_access_token
+
+    porta = _porta_livre()
+    base = f"http://127.0.0.1:{porta}"
+    env = dict(
+        os.environ, PRELOAD="1" if preload else "0", WEB_CONCURRENCY=str(n_workers),
+        BIND=f"127.0.0.1:{porta}", PDF_CACHE_DIR=tempfile.mkdtemp(prefix="bench_workers_"),
+    )
+    log = Path(env["PDF_CACHE_DIR"]) / "gunicorn.log"
+    inicio = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--error-logfile", str(log), "app.main:app"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _pronto(f"{base}/healthz")
+        while len(_filhos(proc.pid)) < n_workers:
+            time.sleep(0.05)
+        # todos os workers de pé: cada um atende pelo menos um pedido
+        for _ in range(n_workers * 3):
+            _pronto(f"{base}/healthz")
+        subida = time.perf_counter() - inicio
+
+        token = create_access_token("bench@radioclub.com")
+        for i in range(n_workers * 6):
+            cenarios = _post(f"{base}/cronograma/cenarios", {
+                "nivel": f"R{i % 4 + 1}", "email": f"aluno{i}@radioclub.com",
+                "respostas": {CARGA: "Entre 2h e 3h"}, "cenarios": [{"numero_semanas": 8}, {"numero_semanas": 24}],
+            })
+            cronograma = json.loads(cenarios)["cenarios"][i % 2]["cronograma"]
+            _post(f"{base}/cronograma/pdf", cronograma, token)
+
+        workers = _filhos(proc.pid)
+        mem = [_memoria(p) for p in workers]
+        mestre = _memoria(proc.pid)
+
+        # respawn: mata um worker e espera o substituto terminar o startup
+        os.kill(workers[0], signal.SIGKILL)
+        t0 = time.perf_counter()
+        while True:
+            novos = set(_filhos(proc.pid)) - set(workers)
+            if novos and f"[{min(novos)}] [INFO] Application startup complete" in log.read_text():
+                break
+            time.sleep(0.005)
+        respawn = time.perf_counter() - t0
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+
+    return {
+        "subida_s": subida,
+        "respawn_s": respawn,
+        "mestre": mestre,
+        "uss": sum(m["uss"] for m in mem) / len(mem),
+        "pss": sum(m["pss"] for m in mem) / len(mem),
+        "rss": sum(m["rss"] for m in mem) / len(mem),
+    }
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    print(f"{n} workers (médias por worker, MiB)")
+    for preload in (False, True):
+        r = rodar(preload, n)
+        print(
+            f"{'preload' if preload else 'sem preload':>11}: USS {r['uss']:6.1f}  PSS {r['pss']:6.1f}  RSS {r['rss']:6.1f}"
+            f" | master RSS {r['mestre']['rss']:6.1f} | subida {r['subida_s']:5.2f}s  respawn {r['respawn_s']:5.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
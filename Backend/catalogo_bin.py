@@ -0,0 +1,241 @@
+# catalogo_bin.py
+"""
+Catálogo compilado (o mesmo índice de indice_catalogo.compilar_catalogo) num
+arquivo binário compacto, lido com mmap.
+
+Com workers pré-forkados (gunicorn.conf.py) os objetos Python do master são
+compartilhados copy-on-write, mas cada leitura mexe no refcount e a página
+acaba copiada para o worker. Aqui o índice (métrica -> aulas) e os textos das
+aulas ficam num arquivo mapeado: as páginas são as do page cache, as mesmas
+para todos os processos, e ler não copia nada.
+
+Layout (little-endian; seções alinhadas em 8 bytes):
+  cabeçalho : magic, versão, sha256 do catalogo.json e as contagens
+  textos    : offsets u32 (n+1, em caracteres) + UTF-8 concatenado — id, módulo
+              e tema de cada aula (3 por aula) e depois o nome de cada métrica
+  duração   : u32 por aula
+  métricas  : início de cada lista no postings, u32 (CSR, n+1)
+  postings  : índice da aula u32 + valor f64
+  geral     : aulas com subespecialidade_geral: índice u32 + valor f64
+
+Uso (a partir de Backend/), para gerar o arquivo no build da imagem:
+    python -m catalogo_bin [destino]
+"""
+import os
+import sys
+import mmap
+import struct
+import hashlib
+from array import array
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from lib import BASE_DIR, JSON_PATH, carregar_catalogo
+
+CATALOGO_BIN_PATH = Path(os.getenv("CATALOGO_BIN", str(BASE_DIR / "files" / "catalogo.bin")))
+
+MAGIC = b"RCCB"
+VERSAO = 1
+_CABECALHO = struct.Struct("<4sI32s6I")
+GERAL = "subespecialidade_geral"
+
+
+def digest_fonte(path: Path = JSON_PATH) -> bytes:
+    return hashlib.sha256(Path(path).read_bytes()).digest()
+
+
+def _alinhar(buf: bytearray):
+    buf.extend(b"\0" * (-len(buf) % 8))
+
+
+def _le(tipo: str, valores) -> bytes:
+    a = array(tipo, valores)
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a.tobytes()
+
+
+def serializar(catalogo: List[Dict[str, Any]], digest: bytes) -> bytes:
+    textos: List[str] = []
+    duracoes: List[int] = []
+    postings: Dict[str, List[tuple]] = {}
+    geral_idx: List[int] = []
+    geral_val: List[float] = []
+
+    for i, aula in enumerate(catalogo):
+        if not isinstance(aula.get("id"), str):
+            raise ValueError(f"Aula {i}: id precisa ser texto para o formato binário")
+        textos += [aula["id"], aula["module_name"], aula["lesson_theme"]]
+        duracoes.append(int(aula["duration_min"]))
+        for metrica, valor in aula.get("metrics", {}).items():
+            if metrica == GERAL:
+                geral_idx.append(i)
+                geral_val.append(float(valor))
+            else:
+                postings.setdefault(metrica, []).append((i, float(valor)))
+
+    metricas = list(postings)
+    textos += metricas
+    offsets = [0]
+    for t in textos:
+        offsets.append(offsets[-1] + len(t))
+    inicio = [0]
+    for m in metricas:
+        inicio.append(inicio[-1] + len(postings[m]))
+    todos = [p for m in metricas for p in postings[m]]
+
+    blob = "".join(textos).encode("utf-8")
+
+    buf = bytearray(_CABECALHO.pack(
+        MAGIC, VERSAO, digest, len(catalogo), len(metricas), len(todos), len(geral_idx), len(textos), len(blob),
+    ))
+    for parte in (
+        _le("I", offsets), blob,
+        _le("I", duracoes),
+        _le("I", inicio),
+        _le("I", [i for i, _ in todos]), _le("d", [v for _, v in todos]),
+        _le("I", geral_idx), _le("d", geral_val),
+    ):
+        _alinhar(buf)
+        buf += parte
+    return bytes(buf)
+
+
+def gravar(catalogo: List[Dict[str, Any]], destino: Path = CATALOGO_BIN_PATH, digest: Optional[bytes] = None) -> Path:
+    dados = serializar(catalogo, digest if digest is not None else digest_fonte())
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    tmp = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(dados)
+    tmp.replace(destino)
+    return destino
+
+
+class _Aulas(Sequence):
+    """Aulas como dicts montados na hora, a partir dos textos mapeados."""
+
+    def __init__(self, cat: "CatalogoBinario"):
+        self._cat = cat
+
+    def __len__(self) -> int:
+        return self._cat.n_aulas
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        t = self._cat.texto
+        return {
+            "id": t(3 * i),
+            "module_name": t(3 * i + 1),
+            "lesson_theme": t(3 * i + 2),
+            "duration_min": self._cat.duracao[i],
+        }
+
+    def __iter__(self):
+        # caminho quente: calcular_pesos_esparso percorre todas as aulas a cada pedido
+        # (decodifica o bloco de textos uma vez e corta pelos offsets)
+        off, textos, duracao = self._cat._textos_off, self._cat.textos(), self._cat.duracao
+        for i in range(self._cat.n_aulas):
+            a, b, c, d = off[3 * i:3 * i + 4]
+            yield {
+                "id": textos[a:b],
+                "module_name": textos[b:c],
+                "lesson_theme": textos[c:d],
+                "duration_min": duracao[i],
+            }
+
+
+class _Indice(Mapping):
+    """métrica -> pares (aula, valor), lidos direto dos arrays mapeados."""
+
+    def __init__(self, cat: "CatalogoBinario"):
+        self._cat = cat
+        textos, off, base = cat.textos(), cat._textos_off, 3 * cat.n_aulas
+        self._pos = {textos[off[base + j]:off[base + j + 1]]: j for j in range(cat.n_metricas)}
+
+    def __getitem__(self, metrica: str):
+        j = self._pos[metrica]
+        a, b = self._cat.inicio[j], self._cat.inicio[j + 1]
+        return zip(self._cat.post_idx[a:b], self._cat.post_val[a:b])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._pos)
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+
+class CatalogoBinario:
+    def __init__(self, path: Path = CATALOGO_BIN_PATH):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if sys.byteorder != "little":
+            raise RuntimeError("catalogo.bin é little-endian")
+
+        magic, versao, self.digest, self.n_aulas, self.n_metricas, n_post, n_geral, n_textos, tam_textos = \
+            _CABECALHO.unpack_from(self._mm, 0)
+        if magic != MAGIC or versao != VERSAO:
+            raise ValueError(f"{path}: formato desconhecido")
+
+        mv = memoryview(self._mm)
+        pos = _CABECALHO.size
+
+        def secao(tamanho: int, formato: Optional[str] = None):
+            nonlocal pos
+            pos += -pos % 8
+            parte = mv[pos:pos + tamanho]
+            pos += tamanho
+            return parte.cast(formato) if formato else parte
+
+        self._textos_off = secao(4 * (n_textos + 1), "I")
+        self._utf8 = secao(tam_textos)
+        self.duracao = secao(4 * self.n_aulas, "I")
+        self.inicio = secao(4 * (self.n_metricas + 1), "I")
+        self.post_idx = secao(4 * n_post, "I")
+        self.post_val = secao(8 * n_post, "d")
+        self.geral_idx = secao(4 * n_geral, "I")
+        self.geral_val = secao(8 * n_geral, "d")
+
+    def textos(self) -> str:
+        # decodificado a cada uso, sem guardar: a cópia seria memória privada do worker
+        return str(self._utf8, "utf-8")
+
+    def texto(self, k: int) -> str:
+        return self.textos()[self._textos_off[k]:self._textos_off[k + 1]]
+
+    def compilado(self) -> Dict[str, Any]:
+        """Mesmas chaves que indice_catalogo.compilar_catalogo usa nos cálculos."""
+        return {
+            "aulas": _Aulas(self),
+            "posicao": {aula["id"]: i for i, aula in enumerate(_Aulas(self))},
+            "indice": _Indice(self),
+            "com_geral": dict(zip(self.geral_idx, self.geral_val)),
+            "baselines": {},
+        }
+
+
+def abrir(path: Path = CATALOGO_BIN_PATH, fonte: Path = JSON_PATH) -> CatalogoBinario:
+    """Abre o binário; se não existe ou foi gerado de outro catalogo.json, gera de novo."""
+    digest = digest_fonte(fonte)
+    try:
+        cat = CatalogoBinario(path)
+        if cat.digest == digest:
+            return cat
+    except (FileNotFoundError, ValueError, struct.error):
+        pass
+    gravar(carregar_catalogo(fonte), path, digest)
+    return CatalogoBinario(path)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    destino = gravar(carregar_catalogo(), Path(argv[0]) if argv else CATALOGO_BIN_PATH)
+    print(f"✅ {destino} ({destino.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# concorrencia.py
+"""
+Primitivas de concorrência compartilhadas entre threads do mesmo processo.
+"""
+import time
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple
+
+_preload_forkserver = set()
+_pools = []
+
+
+def pool_processos(max_workers: int, preload: Iterable[str] = ()) -> ProcessPoolExecutor:
+    """
+    ProcessPoolExecutor com filhos saídos de um forkserver, não de um fork do
+    processo atual. O pool é criado sob demanda dentro do worker do servidor, e
+    um fork ali copiaria os sockets dos clientes conectados naquele instante:
+    quando o worker fecha uma conexão keep-alive o filho ainda segura o
+    descritor, o FIN não sai e o próximo pedido do cliente nessa conexão fica
+    sem resposta até o timeout dele. `preload` são os módulos importados uma vez
+    no forkserver (os filhos já nascem com eles).
+    """
+    _preload_forkserver.update(preload)
+    contexto = multiprocessing.get_context("forkserver")
+    contexto.set_forkserver_preload(sorted(_preload_forkserver))
+    pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=contexto)
+    _pools.append(pool)
+    return pool
+
+
+def descartar_pool(pool: ProcessPoolExecutor) -> None:
+    """Fecha um pool quebrado sem esperar (os filhos que restarem são encerrados)."""
+    if pool in _pools:
+        _pools.remove(pool)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def encerrar_pools():
+    """
+    Fecha os pools de pool_processos. Vai no shutdown do app: o worker do
+    uvicorn termina pelo próprio SIGTERM, sem atexit, e os filhos ficariam
+    órfãos esperando tarefa.
+    """
+    while _pools:
+        _pools.pop().shutdown(wait=True, cancel_futures=True)
+
+
+class SingleFlight:
+    """
+    Coalesce chamadas idênticas em andamento: enquanto `fazer(chave, fn)` está
+    rodando, quem pedir a mesma chave espera e recebe o mesmo resultado (ou a
+    mesma exceção) em vez de executar `fn` de novo. Nada fica guardado depois
+    que a chamada termina.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._em_andamento: Dict[Hashable, Future] = {}
+
+    def fazer(self, chave: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Devolve (resultado, coalescida) — `coalescida` é True se outra thread fez o trabalho."""
+        with self._lock:
+            futuro = self._em_andamento.get(chave)
+            lider = futuro is None
+            if lider:
+                futuro = Future()
+                self._em_andamento[chave] = futuro
+
+        if not lider:
+            return futuro.result(), True
+
+        try:
+            futuro.set_result(fn())
+        except BaseException as e:
+            futuro.set_exception(e)
+        finally:
+            with self._lock:
+                self._em_andamento.pop(chave, None)
+        return futuro.result(), False
+
+    def em_andamento(self) -> int:
+        with self._lock:
+            return len(self._em_andamento)
+
+
+class CircuitBreaker:
+    """
+    Disjuntor: depois de `limite_falhas` falhas seguidas, abre e recusa chamadas
+    por `aberto_s` segundos; passado esse tempo, deixa passar uma chamada de teste
+    (meio-aberto) — se ela der certo fecha, se falhar abre de novo.
+    """
+
+    FECHADO, ABERTO, MEIO_ABERTO = "fechado", "aberto", "meio_aberto"
+
+    def __init__(self, limite_falhas: int, aberto_s: float, nome: str = "circuito"):
+        self.limite_falhas = max(limite_falhas, 1)
+        self.aberto_s = aberto_s
+        self.nome = nome
+        self._lock = threading.Lock()
+        self._estado = self.FECHADO
+        self._falhas = 0
+        self._aberto_ate = 0.0
+        self._teste_em_andamento = False
+        self._aberturas = 0
+        self._recusadas = 0
+
+    def permitir(self) -> bool:
+        with self._lock:
+            if self._estado == self.FECHADO:
+                return True
+            if self._estado == self.ABERTO and time.monotonic() >= self._aberto_ate:
+                self._estado = self.MEIO_ABERTO
+                self._teste_em_andamento = False
+            if self._estado == self.MEIO_ABERTO and not self._teste_em_andamento:
+                self._teste_em_andamento = True
+                return True
+            self._recusadas += 1
+            return False
+
+    def sucesso(self):
+        with self._lock:
+            if self._estado != self.FECHADO:
+                print(f"✅ {self.nome}: fechado de novo")
+            self._estado = self.FECHADO
+            self._falhas = 0
+            self._teste_em_andamento = False
+
+    def falha(self):
+        with self._lock:
+            self._falhas += 1
+            if self._estado == self.MEIO_ABERTO or (
+                self._estado == self.FECHADO and self._falhas >= self.limite_falhas
+            ):
+                self._estado = self.ABERTO
+                self._aberto_ate = time.monotonic() + self.aberto_s
+                self._teste_em_andamento = False
+                self._aberturas += 1
+                print(f"⚠️ {self.nome}: aberto por {self.aberto_s:.0f}s após {self._falhas} falhas seguidas")
+
+    def neutro(self):
+        """Chamada terminou sem dizer nada sobre a saúde do serviço (ex.: 429, fila cheia)."""
+        with self._lock:
+            self._teste_em_andamento = False
+
+    def estado(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "estado": self._estado,
+                "falhas_seguidas": self._falhas,
+                "aberturas": self._aberturas,
+                "recusadas": self._recusadas,
+            }
@@ -4,15 +4,15 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 import smtplib
 import os
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 import copy
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail, Attachment, FileContent, FileName, FileType, Disposition
 import base64
 from lib import (
-    carregar_catalogo,
-    calcular_pesos_aulas,
     gerar_cronograma,
     gerar_pdf_bytes,
     METRICAS,
@@ -21,17 +21,72 @@ from lib import (
     atualizar_metricas_r2,
     atualizar_metricas_r3,
     atualizar_metricas_r4,
+    PERGUNTAS_ABERTAS_R1,
+    PERGUNTAS_ABERTAS_R2,
+    PERGUNTAS_ABERTAS_R3,
+    PERGUNTAS_ABERTAS_R4,
+    PERGUNTAS_TEMAS_R1,
+    PERGUNTAS_TEMAS_R2,
+    PERGUNTAS_TEMAS_R3,
+    PERGUNTAS_TEMAS_R4,
 )
+from llm_utils import LLM_CLASSIFICACAO, classificar_lote, pares_abertos
+from indice_catalogo import obter_catalogo_compilado, calcular_pesos_esparso
+from indice_temas import TEMAS_BOOST, obter_indice_temas
+from otimizador import gerar_cronograma_otimo
+from concorrencia import pool_processos
 
-def run_cronograma(form_json: Dict[str, Any]) -> Dict[str, Any]:
+# Modo padrão de montagem das semanas: "guloso" (lib.gerar_cronograma) ou "otimo" (otimizador.py)
+SOLVER_MODO = os.getenv("SOLVER_MODO", "guloso")
+# Processos para o /cronograma/cenarios no modo ótimo (1 = sequencial)
+CENARIOS_WORKERS = int(os.getenv("CENARIOS_WORKERS", "1"))
+
+# Endpoint do SendGrid (o teste de carga aponta para loadtest/fake_sendgrid.py)
+SENDGRID_HOST = os.getenv("SENDGRID_HOST", "https://api.sendgrid.com")
+
+PERGUNTA_CARGA = "Quanto tempo, por semana, você consegue dedicar aos estudos com o RadioClub?"
+
+# Opções da pergunta no formulário (Frontend, Part3.tsx)
+MAPA_CARGA = {
+    "Até 1h": (30, 60),
+    "Entre 1h e 2h": (60, 120),
+    "Entre 2h e 3h": (90, 180),
+    "Entre 3h e 4h": (120, 240),
+    "Mais de 4h": (240, 360),
+}
+# Rótulos curtos das primeiras versões da API, ainda aceitos
+_CARGA_ALIASES = {
+    "1h a 2h": "Entre 1h e 2h",
+    "2h a 3h": "Entre 2h e 3h",
+    "3h a 4h": "Entre 3h e 4h",
+}
+CARGA_PADRAO = (90, 180)
+
+_pool_cenarios: Optional[ProcessPoolExecutor] = None
+_pool_cenarios_lock = threading.Lock()
+
+
+def faixa_carga(carga: Optional[str]) -> Optional[Tuple[int, int]]:
+    """(tempo_min, tempo_max) da opção de carga; None se não for uma opção conhecida."""
+    return MAPA_CARGA.get(_CARGA_ALIASES.get(carga, carga))
+
+
+def _faixa_carga_obrigatoria(carga: str) -> Tuple[int, int]:
+    faixa = faixa_carga(carga)
+    if faixa is None:
+        raise ValueError(f"Carga desconhecida: {carga!r} (opções: {list(MAPA_CARGA)})")
+    return faixa
+
+
+def calcular_pesos_formulario(form_json: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Métricas do aluno (incluindo as chamadas ao LLM) e peso de cada aula do catálogo."""
     email = form_json.get("email")
     nivel = form_json.get("nivel", "").upper()
-    respostas = form_json.get("respostas", {})
 
     if not email or not nivel:
         raise ValueError("Campos obrigatórios: email, nivel")
 
-    catalogo = carregar_catalogo()
+    catalogo = obter_catalogo_compilado()
 
     metricas = copy.deepcopy(METRICAS)
     configurar_metricas_comuns(metricas, form_json)
@@ -45,94 +100,284 @@ def run_cronograma(form_json: Dict[str, Any]) -> Dict[str, Any]:
     else:
         atualizar_metricas_r4(form_json, metricas)
 
-    pesos = calcular_pesos_aulas(catalogo, metricas)
+    pesos = calcular_pesos_esparso(catalogo, metricas, form_json.get("nivel"))
+    aplicar_temas_citados(pesos, form_json)
+    return pesos, metricas
 
-    numero_semanas = int(metricas.get("semanas") or respostas.get("numero_semanas") or 12)
 
-    mapa_carga = {
-        "Até 1h": (30, 60),
-        "1h a 2h": (60, 120),
-        "2h a 3h": (90, 180),
-        "3h a 4h": (120, 240),
-        "Mais de 4h": (240, 360),
-    }
+def aplicar_temas_citados(pesos: List[Dict[str, Any]], form_json: Dict[str, Any]) -> None:
+    """
+    Soma ao peso das aulas os temas citados nas respostas abertas
+    ("AVC, pneumonia") via índice lexical local (indice_temas.py). `pesos`
+    segue a ordem do catálogo compilado, a mesma das posições do índice.
+    """
+    if TEMAS_BOOST <= 0:
+        return
+    r = form_json.get("respostas") or {}
+    respostas = [r[campo] for campo in _perguntas_temas(form_json.get("nivel")) if r.get(campo)]
+    if not respostas:
+        return
+    for i, bonus in obter_indice_temas().aulas_citadas(respostas).items():
+        pesos[i]["peso"] = round(pesos[i]["peso"] + bonus, 4)
 
-    carga_txt = respostas.get(
-        "Quanto tempo, por semana, você consegue dedicar aos estudos com o RadioClub?"
-    )
-    tempo_min, tempo_max = mapa_carga.get(carga_txt, (90, 180))
 
-    semanas, restantes = gerar_cronograma(
-        pesos, tempo_max, numero_semanas, tempo_min
-    )
+def _perguntas_abertas(nivel: Optional[str]):
+    """Mesma escolha de módulo de calcular_pesos_formulario."""
+    nivel = (nivel or "").upper()
+    if nivel.startswith("R1"):
+        return PERGUNTAS_ABERTAS_R1
+    if nivel.startswith("R2"):
+        return PERGUNTAS_ABERTAS_R2
+    if nivel.startswith("R3"):
+        return PERGUNTAS_ABERTAS_R3
+    return PERGUNTAS_ABERTAS_R4
 
-    # Construção do formato FINAL para o front
-    weeks_output = []
-
-    for idx, semana in enumerate(semanas, start=1):
-        weeks_output.append({
-            "week": idx,
-            "lessons": [
-                {
-                    "module_name": aula["module_name"],
-                    "lesson_theme": aula["lesson_theme"],
-                    "duration_min": aula["duration_min"],
-                    "peso": aula["peso"]
-                }
-                for aula in semana
-            ]
-        })
+
+def _perguntas_temas(nivel: Optional[str]):
+    nivel = (nivel or "").upper()
+    if nivel.startswith("R1"):
+        return PERGUNTAS_TEMAS_R1
+    if nivel.startswith("R2"):
+        return PERGUNTAS_TEMAS_R2
+    if nivel.startswith("R3"):
+        return PERGUNTAS_TEMAS_R3
+    return PERGUNTAS_TEMAS_R4
+
+
+def preclassificar_formularios(forms: Iterable[Dict[str, Any]], paralelo: int = 1) -> None:
+    """
+    Jobs em lote (ingestao, regenerar): classifica as respostas abertas de um
+    bloco inteiro de formulários em chamadas de até LLM_LOTE_MAX respostas,
+    antes do pipeline; cada run_cronograma depois acha tudo no cache. Se o LLM
+    falhar, cada formulário tenta de novo sozinho.
+    """
+    if LLM_CLASSIFICACAO != "lote":
+        return
+    pares = [
+        par
+        for form in forms
+        if isinstance(form, dict) and isinstance(form.get("respostas"), dict)
+        for par in pares_abertos(form["respostas"], _perguntas_abertas(form.get("nivel")))
+    ]
+    if not pares:
+        return
+    try:
+        classificar_lote(pares, paralelo=paralelo)
+    except Exception as e:
+        print(f"⚠️ Pré-classificação em lote falhou, cada formulário tenta sozinho: {type(e).__name__}: {e}")
+
+
+def _aula_saida(aula: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": aula["id"],
+        "module_name": aula["module_name"],
+        "lesson_theme": aula["lesson_theme"],
+        "duration_min": aula["duration_min"],
+        "peso": aula["peso"]
+    }
+
+
+def montar_saida(
+    semanas: List[List[Dict[str, Any]]],
+    restantes: List[Dict[str, Any]],
+    tempo_min: int,
+    tempo_max: int,
+    limite_restantes: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Formato FINAL para o front (aulas já no formato de saída)."""
+    weeks_output = [
+        {"week": idx, "lessons": semana}
+        for idx, semana in enumerate(semanas, start=1)
+    ]
 
     # Última semana = aulas restantes
     weeks_output.append({
         "week": "remaining",
-        "lessons": [
-            {
-                "module_name": aula["module_name"],
-                "lesson_theme": aula["lesson_theme"],
-                "duration_min": aula["duration_min"],
-                "peso": aula["peso"]
-            }
-            for aula in restantes
-        ]
+        "lessons": restantes
     })
 
     # Resumo
-    minutos_por_semana = [sum(a["duration_min"] for a in w) for w in semanas]
+    minutos_por_semana = [sum(int(a.get("duration_min") or 0) for a in w) for w in semanas]
     total = sum(minutos_por_semana)
 
+    params = {
+        "tempo_min_semana": tempo_min,
+        "tempo_max_semana": tempo_max
+    }
+    if limite_restantes is not None:
+        # "remaining" foi truncada: não serve de base para replanejar
+        params["limite_restantes"] = limite_restantes
+
     return {
         "weeks": weeks_output,
         "summary": {
             "total_minutes": total,
             "minutes_per_week": minutos_por_semana
         },
-        "params": {
-            "tempo_min_semana": tempo_min,
-            "tempo_max_semana": tempo_max
-        }
+        "params": params
     }
 
-def run_pdf(cronograma_json: Dict[str, Any]) -> BytesIO:
-    # ===== FORMATO NOVO (weeks) =====
-    if "weeks" in cronograma_json:
-        semanas = []
 
-        for w in cronograma_json.get("weeks", []):
-            # ignora remaining
-            if w.get("week") == "remaining":
-                continue
+def _solver(modo: Optional[str]):
+    return gerar_cronograma_otimo if (modo or SOLVER_MODO) == "otimo" else gerar_cronograma
 
-            aulas = []
-            for a in w.get("lessons", []):
-                aulas.append({
-                    "module_name": a.get("module_name"),
-                    "lesson_theme": a.get("lesson_theme"),
-                    "duration_min": a.get("duration_min"),
-                })
 
-            semanas.append(aulas)
+def agendar(
+    pesos: List[Dict[str, Any]],
+    tempo_min: int,
+    tempo_max: int,
+    numero_semanas: int,
+    limite_restantes: Optional[int] = None,
+    modo: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Monta as semanas a partir dos pesos já calculados e devolve o formato FINAL para o front."""
+    semanas, restantes = _solver(modo)(
+        pesos, tempo_max, numero_semanas, tempo_min,
+        limite_restantes=limite_restantes,
+    )
+    return montar_saida(
+        [[_aula_saida(aula) for aula in semana] for semana in semanas],
+        [_aula_saida(aula) for aula in restantes],
+        tempo_min, tempo_max, limite_restantes,
+    )
+
+
+def replanejar(
+    cronograma_json: Dict[str, Any],
+    numero_semanas: Optional[int] = None,
+    carga: Optional[str] = None,
+    a_partir_da_semana: Optional[int] = None,
+    modo: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Replaneja um cronograma salvo reaproveitando o prefixo que não muda.
+
+    O estado do agendamento depois da semana k é só (semanas 1..k, aulas ainda
+    não agendadas), e as não agendadas estão na "remaining" em ordem de peso.
+    Então estender 12 -> 24 semanas calcula só as 12 novas, e uma mudança de
+    carga recalcula a partir de `a_partir_da_semana` (padrão: 1).
+    """
+    params = cronograma_json.get("params") or {}
+    if params.get("limite_restantes") is not None:
+        raise ValueError("Este cronograma foi salvo com 'remaining' truncada; gere de novo pelo /cronograma.")
+
+    semanas = [w.get("lessons", []) for w in cronograma_json.get("weeks", []) if w.get("week") != "remaining"]
+    restantes = next(
+        (w.get("lessons", []) for w in cronograma_json.get("weeks", []) if w.get("week") == "remaining"), []
+    )
+
+    tempo_min = params.get("tempo_min_semana", CARGA_PADRAO[0])
+    tempo_max = params.get("tempo_max_semana", CARGA_PADRAO[1])
+    if carga is not None:
+        tempo_min, tempo_max = _faixa_carga_obrigatoria(carga)
+    mudou_carga = (tempo_min, tempo_max) != (params.get("tempo_min_semana"), params.get("tempo_max_semana"))
+
+    numero_semanas = int(numero_semanas or len(semanas))
+    if a_partir_da_semana is not None:
+        primeira = max(int(a_partir_da_semana), 1)
+    elif mudou_carga:
+        primeira = 1
+    else:
+        primeira = len(semanas) + 1
+    primeira = min(primeira, len(semanas) + 1, numero_semanas + 1)
+
+    fixas = semanas[:primeira - 1]
+    # semanas descartadas voltam para o "pool", na mesma ordem do agendamento (peso, posição no catálogo)
+    posicao = obter_catalogo_compilado()["posicao"]
+    pool = [a for s in semanas[primeira - 1:] for a in s] + list(restantes)
+    pool.sort(key=lambda a: (-(a.get("peso") or 0), posicao.get(a.get("id"), len(posicao))))
+    pool = [{**a, "peso": a.get("peso") or 0, "duration_min": int(a.get("duration_min") or 0)} for a in pool]
+
+    novas, sobra = _solver(modo)(pool, tempo_max, numero_semanas - len(fixas), tempo_min)
+    return montar_saida(fixas + novas, sobra, tempo_min, tempo_max)
+
+
+def run_cronograma(
+    form_json: Dict[str, Any],
+    limite_restantes: Optional[int] = None,
+    modo: Optional[str] = None,
+) -> Dict[str, Any]:
+    respostas = form_json.get("respostas", {})
+    pesos, metricas = calcular_pesos_formulario(form_json)
+
+    numero_semanas = int(metricas.get("semanas") or respostas.get("numero_semanas") or 12)
+    tempo_min, tempo_max = faixa_carga(respostas.get(PERGUNTA_CARGA)) or CARGA_PADRAO
 
+    return agendar(pesos, tempo_min, tempo_max, numero_semanas, limite_restantes, modo)
+
+
+def _agendar_cenario(args):
+    pesos, cenario, limite_restantes, modo = args
+    tempo_min, tempo_max = cenario["tempo_min_semana"], cenario["tempo_max_semana"]
+    return agendar(pesos, tempo_min, tempo_max, cenario["numero_semanas"], limite_restantes, modo)
+
+
+def run_cenarios(
+    form_json: Dict[str, Any],
+    cenarios: List[Dict[str, Any]],
+    limite_restantes: Optional[int] = 0,
+    modo: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Calcula os pesos uma única vez (métricas + LLM) e roda o agendamento para cada
+    cenário {"carga": <opção do MAPA_CARGA>, "numero_semanas": N}.
+    """
+    respostas = form_json.get("respostas", {})
+    pesos, metricas = calcular_pesos_formulario(form_json)
+    semanas_padrao = int(metricas.get("semanas") or respostas.get("numero_semanas") or 12)
+    carga_padrao = respostas.get(PERGUNTA_CARGA)
+
+    normalizados = []
+    for c in cenarios:
+        if c.get("carga"):
+            carga = c["carga"]
+            tempo_min, tempo_max = _faixa_carga_obrigatoria(carga)
+        else:
+            # sem carga no cenário: a do formulário, com o mesmo padrão do /cronograma
+            carga = carga_padrao
+            tempo_min, tempo_max = faixa_carga(carga) or CARGA_PADRAO
+        normalizados.append({
+            "carga": carga,
+            "numero_semanas": int(c.get("numero_semanas") or semanas_padrao),
+            "tempo_min_semana": tempo_min,
+            "tempo_max_semana": tempo_max,
+        })
+
+    tarefas = [(pesos, c, limite_restantes, modo) for c in normalizados]
+    # o guloso leva menos de 1 ms por cenário; só o modo ótimo compensa ir para outros processos
+    if (modo or SOLVER_MODO) == "otimo" and CENARIOS_WORKERS > 1 and len(tarefas) > 1:
+        global _pool_cenarios
+        with _pool_cenarios_lock:
+            if _pool_cenarios is None:
+                _pool_cenarios = pool_processos(CENARIOS_WORKERS, preload=["core"])
+            pool = _pool_cenarios
+        resultados = list(pool.map(_agendar_cenario, tarefas))
+    else:
+        resultados = [_agendar_cenario(t) for t in tarefas]
+
+    return [
+        {"carga": c["carga"], "numero_semanas": c["numero_semanas"], "cronograma": r}
+        for c, r in zip(normalizados, resultados)
+    ]
+
+def semanas_pdf(cronograma_json: Dict[str, Any]) -> Optional[List[List[Dict[str, Any]]]]:
+    """
+    Só o que aparece no PDF: as aulas de cada semana (sem a remaining). As aulas
+    vão como estão, sem remontar: o PDF só lê módulo, tema e duração.
+    """
+    # ===== FORMATO NOVO (weeks) =====
+    if "weeks" not in cronograma_json:
+        return None
+    return [
+        w.get("lessons", [])
+        for w in cronograma_json.get("weeks", [])
+        if w.get("week") != "remaining"
+    ]
+
+
+def run_pdf(cronograma_json: Dict[str, Any]) -> BytesIO:
+    semanas = semanas_pdf(cronograma_json)
+    if semanas is not None:
         return gerar_pdf_bytes(semanas)
 
 def send_email_with_pdf(recipient_email: str, pdf_io: BytesIO):
@@ -161,7 +406,7 @@ def send_email_with_pdf(recipient_email: str, pdf_io: BytesIO):
 
     # Envia via SendGrid
     try:
-        sg = SendGridAPIClient(sendgrid_api_key)
+        sg = SendGridAPIClient(sendgrid_api_key, host=SENDGRID_HOST)
         response = sg.send(message)
         print(f"✅ E-mail enviado com sucesso para {recipient_email}")
     except Exception as e:
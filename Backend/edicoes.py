@@ -0,0 +1,132 @@
+# edicoes.py
+"""
+Edições parciais de um cronograma salvo (move/add/remove/reorder de aulas).
+
+As operações são aplicadas sobre o documento no formato de armazenamento
+(ver armazenamento.py) e só os totais das semanas afetadas são recalculados.
+"""
+from typing import Dict, Any, List, Set
+
+from pydantic import ValidationError
+
+from armazenamento import catalogo_por_id, compactar_aula, expandir_aula
+from modelos import CRONOGRAMA_MAX_AULAS, CRONOGRAMA_MAX_AULAS_SEMANA, validar_aula
+
+OPERACOES = ("move", "add", "remove", "reorder")
+
+
+def _indice_semana(cronograma: Dict[str, Any], semana) -> int:
+    for idx, w in enumerate(cronograma["weeks"]):
+        if w.get("week") == semana:
+            return idx
+    raise ValueError(f"Semana não encontrada: {semana!r}")
+
+
+def _aulas(cronograma: Dict[str, Any], idx: int) -> List[Dict[str, Any]]:
+    return cronograma["weeks"][idx].setdefault("lessons", [])
+
+
+def _posicao(aulas: List, index, inserir: bool = False) -> int:
+    limite = len(aulas) if inserir else len(aulas) - 1
+    if index is None and inserir:
+        return len(aulas)
+    if not isinstance(index, int) or not 0 <= index <= limite:
+        raise ValueError(f"Índice de aula inválido: {index!r}")
+    return index
+
+
+def _aula_nova(aula) -> Dict[str, Any]:
+    """
+    Aula de uma operação 'add': só o id (AUL-XXXX) é expandido do catálogo;
+    aula feita à mão precisa do formato completo de modelos.Aula.
+    """
+    if not isinstance(aula, dict):
+        raise ValueError("Operação 'add' precisa de uma aula ('lesson')")
+    if "module_name" not in aula:
+        if aula.get("id") not in catalogo_por_id():
+            raise ValueError(f"Aula fora do catálogo: {aula.get('id')!r} (envie o id do catálogo ou a aula completa)")
+        aula = expandir_aula(aula)
+    try:
+        return dict(validar_aula(aula))
+    except ValidationError as e:
+        erro = e.errors(include_url=False)[0]
+        campo = ".".join(str(p) for p in erro["loc"])
+        raise ValueError(f"Aula inválida na operação 'add' ({campo}: {erro['msg']})")
+
+
+def _verificar_limites(cronograma: Dict[str, Any], afetadas: Set[int]) -> None:
+    """Mesmos limites de modelos.Cronograma, para o /patch não gravar o que o /update recusaria."""
+    for idx in afetadas:
+        if len(_aulas(cronograma, idx)) > CRONOGRAMA_MAX_AULAS_SEMANA:
+            semana = cronograma["weeks"][idx].get("week")
+            raise ValueError(f"Semana {semana!r} com mais de {CRONOGRAMA_MAX_AULAS_SEMANA} aulas")
+    total = sum(len(w.get("lessons") or []) for w in cronograma["weeks"])
+    if total > CRONOGRAMA_MAX_AULAS:
+        raise ValueError(f"Cronograma com {total} aulas (máximo {CRONOGRAMA_MAX_AULAS})")
+
+
+def aplicar_operacoes(cronograma: Dict[str, Any], ops: List[Dict[str, Any]]) -> Set[int]:
+    """Aplica as operações in-place e devolve os índices (em `weeks`) das semanas alteradas."""
+    afetadas: Set[int] = set()
+
+    for op in ops:
+        tipo = op.get("op")
+
+        if tipo == "move":
+            origem = _indice_semana(cronograma, op.get("from_week"))
+            destino = _indice_semana(cronograma, op.get("to_week"))
+            aulas_origem = _aulas(cronograma, origem)
+            aula = aulas_origem.pop(_posicao(aulas_origem, op.get("from_index")))
+            aulas_destino = _aulas(cronograma, destino)
+            aulas_destino.insert(_posicao(aulas_destino, op.get("to_index"), inserir=True), aula)
+            afetadas.update((origem, destino))
+
+        elif tipo == "add":
+            idx = _indice_semana(cronograma, op.get("week"))
+            aula = _aula_nova(op.get("lesson"))
+            aulas = _aulas(cronograma, idx)
+            aulas.insert(_posicao(aulas, op.get("index"), inserir=True), compactar_aula(aula))
+            afetadas.add(idx)
+
+        elif tipo == "remove":
+            idx = _indice_semana(cronograma, op.get("week"))
+            aulas = _aulas(cronograma, idx)
+            aulas.pop(_posicao(aulas, op.get("index")))
+            afetadas.add(idx)
+
+        elif tipo == "reorder":
+            idx = _indice_semana(cronograma, op.get("week"))
+            aulas = _aulas(cronograma, idx)
+            ordem = op.get("order")
+            if not isinstance(ordem, list) or sorted(ordem) != list(range(len(aulas))):
+                raise ValueError("Operação 'reorder' precisa de 'order' com uma permutação dos índices da semana")
+            aulas[:] = [aulas[i] for i in ordem]
+            afetadas.add(idx)
+
+        else:
+            raise ValueError(f"Operação desconhecida: {tipo!r} (esperado um de {OPERACOES})")
+
+    _verificar_limites(cronograma, afetadas)
+    return afetadas
+
+
+def recalcular_resumo(cronograma: Dict[str, Any], afetadas: Set[int]) -> Dict[str, Any]:
+    """Atualiza summary.minutes_per_week só nas semanas afetadas (a 'remaining' não conta)."""
+    numeradas = [i for i, w in enumerate(cronograma["weeks"]) if w.get("week") != "remaining"]
+    resumo = cronograma.setdefault("summary", {})
+    minutos = list(resumo.get("minutes_per_week") or [])
+    if len(minutos) != len(numeradas):
+        # resumo ausente ou inconsistente: recalcula tudo uma vez
+        minutos = [0] * len(numeradas)
+        afetadas = set(numeradas)
+
+    for pos, idx in enumerate(numeradas):
+        if idx in afetadas:
+            minutos[pos] = sum(
+                int(expandir_aula(a).get("duration_min") or 0)
+                for a in cronograma["weeks"][idx].get("lessons", [])
+            )
+
+    resumo["minutes_per_week"] = minutos
+    resumo["total_minutes"] = sum(minutos)
+    return resumo
@@ -0,0 +1,63 @@
+# gunicorn.conf.py
+"""
+Workers uvicorn pré-forkados a partir de um master já aquecido.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+- on_starting: o master aplica as migrações pendentes (migrar.py) antes de
+  subir qualquer worker, para o código novo não atender com o banco antigo;
+  MIGRAR_NA_SUBIDA=0 desliga (migração como passo separado do deploy);
+- preload_app: o master importa a aplicação uma vez (fontes registradas,
+  regras dos níveis, catálogo) e roda aquecimento.aquecer() antes do fork;
+- gc.freeze() logo antes do fork tira esses objetos das varreduras do GC, que
+  senão escreveria nos cabeçalhos deles e copiaria as páginas em cada worker;
+- post_fork: cada worker descarta as conexões herdadas dos engines SQLAlchemy
+  (socket compartilhado entre processos corrompe o protocolo do Postgres).
+
+PRELOAD=0 volta ao modo antigo (cada worker importa e monta tudo sozinho).
+"""
+import gc
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("PRELOAD", "1") != "0"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+accesslog = "-"
+migrar_na_subida = os.getenv("MIGRAR_NA_SUBIDA", "1") != "0"
+
+
+def on_starting(server):
+    if not migrar_na_subida:
+        return
+    from sqlalchemy import create_engine
+    from migrar import migrar
+
+    engine = create_engine(os.environ["DB_URL"])
+    try:
+        novas = migrar(engine)
+    finally:
+        engine.dispose()
+    server.log.info(f"Migrações aplicadas: {novas}" if novas else "Banco já está atualizado")
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from aquecimento import aquecer
+
+    tempos = aquecer()
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"Estado somente-leitura pronto no master: {tempos} ({gc.get_freeze_count()} objetos congelados)")
+
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+    from app.main import engine as engine_main
+    from app.routers.cronograma import engine as engine_cronograma
+
+    for engine in (engine_main, engine_cronograma):
+        engine.dispose(close=False)
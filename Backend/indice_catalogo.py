@@ -0,0 +1,188 @@
+# indice_catalogo.py
+"""
+Catálogo compilado em índice invertido (métrica -> aulas) para calcular os pesos
+de forma incremental.
+
+Cada aula do catalogo.json toca só 2–4 métricas e as métricas de um aluno diferem
+das do nível (METRICAS + ajuste por nível) em poucas chaves. Então:
+  1. o score de cada aula para a métrica-base de cada nível é calculado uma vez;
+  2. para um aluno, só as métricas que mudaram percorrem o índice e somam o delta.
+
+O resultado é o mesmo de lib.calcular_pesos_aulas (incluindo a penalidade de
+`subespecialidade_geral` e os multiplicadores de foco).
+
+Por padrão o índice é lido de files/catalogo.bin com mmap (catalogo_bin.py),
+compartilhado entre os workers; CATALOGO_BINARIO=0 volta a montar tudo em
+memória a partir do JSON.
+"""
+import os
+import copy
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+from lib import carregar_catalogo
+import catalogo_bin
+from metricas_base import METRICAS
+from common import configurar_metricas_comuns
+
+GERAL = "subespecialidade_geral"
+PENALIDADE_GERAL = -0.2
+CATALOGO_BINARIO = os.getenv("CATALOGO_BINARIO", "1") != "0"
+
+
+def compilar_catalogo(catalogo: List[Dict[str, Any]]) -> Dict[str, Any]:
+    aulas = []
+    indice: Dict[str, List[Tuple[int, float]]] = {}
+    com_geral: Dict[int, float] = {}
+
+    for i, aula in enumerate(catalogo):
+        aulas.append({
+            "id": aula.get("id"),
+            "module_name": aula["module_name"],
+            "lesson_theme": aula["lesson_theme"],
+            "duration_min": int(aula["duration_min"]),
+        })
+        for metrica, valor in aula.get("metrics", {}).items():
+            if metrica == GERAL:
+                com_geral[i] = float(valor)
+            else:
+                indice.setdefault(metrica, []).append((i, float(valor)))
+
+    return {
+        "catalogo": catalogo,
+        "aulas": aulas,
+        "posicao": {a["id"]: i for i, a in enumerate(aulas)},
+        "indice": indice,
+        "com_geral": com_geral,
+        "baselines": {},
+    }
+
+
+@lru_cache(maxsize=1)
+def obter_catalogo_compilado() -> Dict[str, Any]:
+    if CATALOGO_BINARIO:
+        try:
+            return catalogo_bin.abrir().compilado()
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Catálogo binário indisponível ({e}); usando o catalogo.json")
+    return compilar_catalogo(carregar_catalogo())
+
+
+def aquecer_baselines(compilado: Dict[str, Any], niveis=("R1", "R2", "R3", "R4")):
+    """Calcula de antemão as bases por nível (no master, antes do fork)."""
+    for nivel in niveis:
+        _baseline(compilado, nivel)
+
+
+def _efetivos(metricas: Dict[str, Any]) -> Dict[str, float]:
+    """Valor de cada métrica já com o multiplicador de foco (só as não-nulas)."""
+    foco_subesp = metricas.get("foco_subespecialidade", 0)
+    foco_exames = metricas.get("foco_exames", 0)
+
+    efetivos = {}
+    for metrica, valor in metricas.items():
+        if not valor or not isinstance(valor, (int, float)):
+            continue
+        if metrica.startswith("subespecialidade_"):
+            valor *= (1 + foco_subesp)
+        elif metrica.startswith("exame_"):
+            valor *= (1 + foco_exames)
+        efetivos[metrica] = float(valor)
+    return efetivos
+
+
+def _validadas(compilado: Dict[str, Any], metricas: Dict[str, Any]) -> set:
+    """Aulas com `subespecialidade_geral` que também têm uma subespecialidade específica do aluno (> 0)."""
+    com_geral = compilado["com_geral"]
+    validadas = set()
+    for metrica, valor in metricas.items():
+        if metrica.startswith("subespecialidade_") and metrica != GERAL and isinstance(valor, (int, float)) and valor > 0:
+            validadas.update(i for i, _ in compilado["indice"].get(metrica, ()) if i in com_geral)
+    return validadas
+
+
+def _nivel_base(nivel: str) -> str:
+    """
+    Nível canônico da base: só os que configurar_metricas_comuns distingue
+    (mesmo `startswith` de core.calcular_pesos_formulario). Assim o cache de
+    bases não cresce com cada texto que o cliente mandar em `nivel`.
+    """
+    nivel = (nivel or "").upper()
+    for canonico in ("R1", "R2", "R3"):
+        if nivel.startswith(canonico):
+            return canonico
+    return "R4 / medico radiologista"
+
+
+def _baseline(compilado: Dict[str, Any], nivel: str) -> Dict[str, Any]:
+    nivel = _nivel_base(nivel)
+    base = compilado["baselines"].get(nivel)
+    if base is None:
+        metricas = copy.deepcopy(METRICAS)
+        configurar_metricas_comuns(metricas, {"nivel": nivel, "respostas": {}})
+        base = {
+            "efetivos": _efetivos(metricas),
+            "validadas": _validadas(compilado, metricas),
+            "scores": _scores_completos(compilado, metricas),
+        }
+        compilado["baselines"][nivel] = base
+    return base
+
+
+def _scores_completos(compilado: Dict[str, Any], metricas: Dict[str, Any]) -> List[float]:
+    efetivos = _efetivos(metricas)
+    scores = [0.0] * len(compilado["aulas"])
+    for metrica, valor in efetivos.items():
+        if metrica == GERAL:
+            continue
+        for i, valor_aula in compilado["indice"].get(metrica, ()):
+            scores[i] += valor_aula * valor
+
+    validadas = _validadas(compilado, metricas)
+    valor_geral = efetivos.get(GERAL, 0.0)
+    for i, valor_aula in compilado["com_geral"].items():
+        scores[i] += PENALIDADE_GERAL if i in validadas else valor_aula * valor_geral
+    return scores
+
+
+def calcular_scores(compilado: Dict[str, Any], metricas: Dict[str, Any], nivel: str) -> List[float]:
+    """Scores (sem arredondar) de todas as aulas, na ordem do catálogo."""
+    base = _baseline(compilado, nivel)
+    base_ef = base["efetivos"]
+    efetivos = _efetivos(metricas)
+    scores = list(base["scores"])
+    indice = compilado["indice"]
+
+    # 1) deltas das métricas que mudaram em relação ao nível
+    for metrica in efetivos.keys() | base_ef.keys():
+        if metrica == GERAL:
+            continue
+        delta = efetivos.get(metrica, 0.0) - base_ef.get(metrica, 0.0)
+        if delta:
+            for i, valor_aula in indice.get(metrica, ()):
+                scores[i] += valor_aula * delta
+
+    # 2) subespecialidade_geral: só as aulas cujo termo mudou
+    com_geral = compilado["com_geral"]
+    validadas = _validadas(compilado, metricas)
+    geral_aluno, geral_base = efetivos.get(GERAL, 0.0), base_ef.get(GERAL, 0.0)
+    if geral_aluno == geral_base:
+        candidatas = validadas ^ base["validadas"]
+    else:
+        candidatas = com_geral.keys()
+
+    for i in candidatas:
+        valor_aula = com_geral[i]
+        antes = PENALIDADE_GERAL if i in base["validadas"] else valor_aula * geral_base
+        depois = PENALIDADE_GERAL if i in validadas else valor_aula * geral_aluno
+        scores[i] += depois - antes
+
+    return scores
+
+
+def calcular_pesos_esparso(compilado: Dict[str, Any], metricas: Dict[str, Any], nivel: str) -> List[Dict[str, Any]]:
+    """Mesmo formato de saída de lib.calcular_pesos_aulas."""
+    return [
+        {**aula, "peso": round(score, 4)}
+        for aula, score in zip(compilado["aulas"], calcular_scores(compilado, metricas, nivel))
+    ]
@@ -0,0 +1,175 @@
+# indice_temas.py
+"""
+Índice lexical do catálogo para as respostas abertas que citam temas
+("AVC, pneumonia e abdome agudo", "Fraturas", "RM de joelho"): cada tema
+citado vira um bônus direto no peso das aulas que falam dele, sem passar pelo
+LLM (que só reduz a resposta a categorias como `subespecialidade_neuro`).
+
+  - texto sem acento e minúsculo; palavras de `lesson_theme` (peso 1) e de
+    `module_name` (peso TEMAS_PESO_MODULO);
+  - BM25 por palavra do catálogo, calculado uma vez (aquecimento.py);
+  - cada palavra da consulta com 4+ letras também casa com palavras do
+    catálogo parecidas (trigramas de caracteres, ex. "fraturas" -> "fratura")
+    ou que começam com ela ("neuro" -> "neurorradiologia");
+  - por tema, ficam as aulas com pelo menos metade do score da melhor e que
+    cobrem pelo menos metade das palavras (por idf) do tema.
+
+Tudo em memória e local: uma consulta leva dezenas de microssegundos.
+"""
+import os
+import re
+import math
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Tuple
+
+TEMAS_BOOST = float(os.getenv("TEMAS_BOOST", "6"))         # somado ao peso da aula mais relevante (0 desliga)
+TEMAS_MAX_AULAS = int(os.getenv("TEMAS_MAX_AULAS", "6"))   # tema amplo: o bônus é dividido entre as aulas
+TEMAS_PESO_MODULO = 0.5
+TEMAS_SIMILARIDADE = 0.7   # Dice mínimo entre trigramas para casar palavras diferentes
+TEMAS_RELEVANCIA_MIN = 0.5
+TEMAS_COBERTURA_MIN = 0.5
+
+_K1, _B = 1.2, 0.75
+
+STOPWORDS = frozenset("""
+    a o as os ao aos de da do das dos e em no na nos nas num numa um uma uns umas com sem para pra pro por
+    que se ou ja mais muito muita sua seu suas seus meu minha meus minhas isso esse essa este esta algo algum
+    alguma tudo todo toda todos todas ainda nao sei nada nenhum nenhuma quero gostaria vou ver vendo estou
+    ano anos parte tema temas exame exames area sobre geral principalmente tambem
+""".split())
+
+_PALAVRA = re.compile(r"[a-z0-9]+")
+_SEPARADOR = re.compile(r"[,;/|+\n()]|\s+e\s+|\s+ou\s+")
+
+
+def dobrar(texto: str) -> str:
+    """Sem acento e minúsculo ("Tórax" -> "torax")."""
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii").lower()
+
+
+def palavras(texto: str) -> List[str]:
+    # números soltos ("Parte 2", "2 anos") não são tema
+    return [p for p in _PALAVRA.findall(dobrar(texto)) if len(p) > 1 and p not in STOPWORDS and not p.isdigit()]
+
+
+def trigramas(palavra: str) -> frozenset:
+    p = f"#{palavra}#"
+    return frozenset(p[i:i + 3] for i in range(len(p) - 2))
+
+
+def separar_temas(resposta: Any) -> List[str]:
+    """"AVC, pneumonia e abdome agudo" -> ["avc", "pneumonia", "abdome agudo"]."""
+    if isinstance(resposta, (list, tuple)):
+        resposta = ", ".join(map(str, resposta))
+    return [t.strip() for t in _SEPARADOR.split(dobrar(str(resposta))) if t.strip()]
+
+
+class IndiceTemas:
+    def __init__(self, aulas: Sequence[Dict[str, Any]]):
+        self.n = len(aulas)
+        tfs: List[Dict[str, float]] = []
+        for aula in aulas:
+            tf: Dict[str, float] = {}
+            for p in palavras(aula["lesson_theme"]):
+                tf[p] = tf.get(p, 0.0) + 1.0
+            for p in palavras(aula["module_name"]):
+                tf[p] = tf.get(p, 0.0) + TEMAS_PESO_MODULO
+            tfs.append(tf)
+
+        df: Dict[str, int] = {}
+        for tf in tfs:
+            for p in tf:
+                df[p] = df.get(p, 0) + 1
+        self.idf = {p: math.log(1 + (self.n - d + 0.5) / (d + 0.5)) for p, d in df.items()}
+
+        # BM25 já pronto por (palavra, aula): a consulta só soma
+        tamanhos = [sum(tf.values()) for tf in tfs]
+        medio = sum(tamanhos) / max(len(tamanhos), 1) or 1.0
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        for i, (tf, dl) in enumerate(zip(tfs, tamanhos)):
+            norma = _K1 * (1 - _B + _B * dl / medio)
+            for p, f in tf.items():
+                self.postings.setdefault(p, []).append((i, self.idf[p] * f * (_K1 + 1) / (f + norma)))
+
+        self.trigramas = {p: trigramas(p) for p in self.postings}
+        self.por_trigrama: Dict[str, List[str]] = {}
+        for p, tris in self.trigramas.items():
+            for t in tris:
+                self.por_trigrama.setdefault(t, []).append(p)
+        self._expandir = lru_cache(maxsize=4096)(self._expandir_sem_cache)
+
+    def _expandir_sem_cache(self, palavra: str) -> Tuple[Tuple[str, float], ...]:
+        """Palavras do catálogo que valem por `palavra`, com a similaridade (1.0 = a própria)."""
+        if len(palavra) < 4:
+            return ((palavra, 1.0),) if palavra in self.postings else ()
+        tris = trigramas(palavra)
+        comuns: Dict[str, int] = {}
+        for t in tris:
+            for p in self.por_trigrama.get(t, ()):
+                comuns[p] = comuns.get(p, 0) + 1
+        saida = []
+        for p, c in comuns.items():
+            sim = 1.0 if p == palavra else 2 * c / (len(tris) + len(self.trigramas[p]))
+            if p != palavra and p.startswith(palavra):
+                sim = max(sim, TEMAS_SIMILARIDADE)
+            if sim >= TEMAS_SIMILARIDADE:
+                saida.append((p, sim))
+        return tuple(saida)
+
+    def buscar(self, tema: str) -> Dict[int, float]:
+        """Aulas (posição no catálogo) -> relevância 0..1 para um tema."""
+        melhor_por_palavra: List[Dict[int, Tuple[float, float]]] = []
+        for palavra in dict.fromkeys(palavras(tema)):
+            expansoes = self._expandir(palavra)
+            if not expansoes:
+                continue  # palavra que o catálogo não tem: não conta nem contra
+            por_aula: Dict[int, Tuple[float, float]] = {}
+            for p, sim in expansoes:
+                for i, w in self.postings[p]:
+                    score = sim * w
+                    if score > por_aula.get(i, (0.0, 0.0))[0]:
+                        por_aula[i] = (score, sim * self.idf[p])
+            melhor_por_palavra.append(por_aula)
+        if not melhor_por_palavra:
+            return {}
+
+        # idf da palavra da consulta = o da melhor expansão (a própria, se existir)
+        pesos_idf = [max(c for _, c in por_aula.values()) for por_aula in melhor_por_palavra]
+        total_idf = sum(pesos_idf)
+        scores: Dict[int, float] = {}
+        cobertura: Dict[int, float] = {}
+        for por_aula, peso in zip(melhor_por_palavra, pesos_idf):
+            for i, (score, c) in por_aula.items():
+                scores[i] = scores.get(i, 0.0) + score
+                cobertura[i] = cobertura.get(i, 0.0) + min(c, peso) / total_idf
+
+        topo = max(scores.values())
+        return {
+            i: s / topo
+            for i, s in scores.items()
+            if s >= TEMAS_RELEVANCIA_MIN * topo and cobertura[i] >= TEMAS_COBERTURA_MIN
+        }
+
+    def aulas_citadas(self, respostas: Sequence[Any]) -> Dict[int, float]:
+        """
+        Bônus de peso por aula (posição no catálogo) para as respostas abertas:
+        TEMAS_BOOST × relevância, dividido quando o tema casa com mais de
+        TEMAS_MAX_AULAS aulas. Temas diferentes que citam a mesma aula somam.
+        """
+        bonus: Dict[int, float] = {}
+        for resposta in respostas:
+            for tema in separar_temas(resposta):
+                achadas = self.buscar(tema)
+                if not achadas:
+                    continue
+                fator = TEMAS_BOOST * min(1.0, TEMAS_MAX_AULAS / len(achadas))
+                for i, rel in achadas.items():
+                    bonus[i] = bonus.get(i, 0.0) + fator * rel
+        return bonus
+
+
+@lru_cache(maxsize=1)
+def obter_indice_temas() -> IndiceTemas:
+    from indice_catalogo import obter_catalogo_compilado
+    return IndiceTemas(obter_catalogo_compilado()["aulas"])
@@ -0,0 +1,306 @@
+# ingestao.py
+"""
+Ingestão em lote de exportações do formulário (NDJSON ou CSV do Tally).
+
+Cada linha passa pelo mesmo pipeline do POST /cronograma (run_cronograma), com
+paralelismo limitado, e é gravada com INSERTs de várias linhas por lote
+(ON CONFLICT na chave de idempotência: reimportar o mesmo arquivo não duplica).
+Devolve um status por linha: criado, duplicado ou erro. Linhas cujas respostas
+abertas o LLM não classificou (fora do ar, disjuntor aberto) são erro, não um
+cronograma só com as respostas fechadas.
+
+Uso (a partir de Backend/):
+    python -m ingestao coorte.csv [--formato csv|ndjson] [--workers 8] [--lote 100] [--relatorio status.ndjson]
+"""
+import os
+import io
+import sys
+import csv
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+from sqlalchemy import create_engine, text
+
+from core import run_cronograma, preclassificar_formularios
+from llm_utils import ClassificacaoIndisponivel, classificacao_estrita
+from armazenamento import chave_idempotencia, serializar_cronograma
+
+# Perguntas de múltipla escolha: no CSV chegam como "A, B, C" e viram lista
+PERGUNTAS_MULTIPLA_ESCOLHA = {
+    "Quais seus objetivos com o Curso Radioclub?",
+    "Além do conteúdo técnico, você se interessa por alguns desses outros temas?",
+    "Quais exames de imagem você já tem contato na prática ou vai ter nesse início de R1?",
+    "Quais subespecialidades você vai ter mais contato na Residência?",
+    "Quais exames você mais lauda/interpreta e tem contato no R2 atualmente?",
+    "Quais subespecialidades você mais tem contato na Residência?",
+    "Quais exames você tem mais contato hoje na residência e gostaria de aprofundar?",
+    "Quais subespecialidades você mais tem contato na Residência e gostaria de aprofundar?",
+    "Quais exames você realiza na sua prática atual e gostaria de revisar ou de se atualizar?",
+    "Em quais subespecialidades você tem mais interesse revisar ou se aprofundar agora?",
+}
+
+# Colunas do CSV que não são respostas (nomes comparados em minúsculas)
+COLUNAS_CSV = {
+    "respondent id": "respondent_id",
+    "respondent_id": "respondent_id",
+    "submitted at": "submitted_at",
+    "submitted_at": "submitted_at",
+    "name": "name",
+    "nome": "name",
+    "nome completo": "name",
+    "email": "email",
+    "e-mail": "email",
+    "nivel": "nivel",
+    "nível": "nivel",
+}
+COLUNAS_IGNORADAS = {"submission id", "submission_id"}
+
+
+# ===== LEITURA =====
+def ler_ndjson(linhas: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    """(número da linha, formulário ou exceção) — uma linha inválida não para a leitura."""
+    for n, linha in enumerate(linhas, start=1):
+        linha = linha.strip()
+        if not linha:
+            continue
+        try:
+            yield n, json.loads(linha)
+        except ValueError as e:
+            yield n, ValueError(f"JSON inválido: {e}")
+
+
+def _valor_csv(pergunta: str, valor: str):
+    valor = valor.strip()
+    if valor.startswith("["):
+        try:
+            return json.loads(valor)
+        except ValueError:
+            pass
+    if pergunta in PERGUNTAS_MULTIPLA_ESCOLHA:
+        return [p.strip() for p in valor.split(",") if p.strip()]
+    return valor
+
+
+def ler_csv(linhas: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    leitor = csv.DictReader(linhas)
+    for n, linha in enumerate(leitor, start=2):  # linha 1 é o cabeçalho
+        form: Dict[str, Any] = {"respostas": {}}
+        for coluna, valor in linha.items():
+            if coluna is None or valor is None or not str(valor).strip():
+                continue
+            chave = coluna.strip().lower()
+            if chave in COLUNAS_IGNORADAS:
+                continue
+            if chave in COLUNAS_CSV:
+                form[COLUNAS_CSV[chave]] = valor.strip()
+            else:
+                form["respostas"][coluna.strip()] = _valor_csv(coluna.strip(), valor)
+        yield n, form
+
+
+def ler_registros(linhas: Iterable[str], formato: str) -> Iterator[Tuple[int, Any]]:
+    if formato == "csv":
+        return ler_csv(linhas)
+    if formato == "ndjson":
+        return ler_ndjson(linhas)
+    raise ValueError(f"Formato desconhecido: {formato} (use csv ou ndjson)")
+
+
+# ===== PROCESSAMENTO =====
+def preparar_linha(form: Dict[str, Any], modo: Optional[str] = None) -> Dict[str, Any]:
+    """Parâmetros do INSERT para um formulário (roda o pipeline completo, incluindo o LLM)."""
+    if not isinstance(form, dict) or not isinstance(form.get("respostas"), dict):
+        raise ValueError("Formulário sem 'respostas'")
+    resultado = run_cronograma(form, modo=modo)
+    return {
+        "name": form.get("name"),
+        "email": form["email"],
+        "nivel": form["nivel"],
+        "respostas": json.dumps(form["respostas"], ensure_ascii=False),
+        "cronograma": serializar_cronograma(resultado),
+        "chave": chave_idempotencia(form),
+    }
+
+
+def _inserir_lote(conn, linhas: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Um INSERT de várias linhas; devolve {chave: id} das que entraram."""
+    valores, params = [], {}
+    for i, linha in enumerate(linhas):
+        valores.append(
+            f"(:name{i}, :email{i}, :nivel{i}, CAST(:respostas{i} AS jsonb), CAST(:cronograma{i} AS jsonb), :chave{i})"
+        )
+        params.update({f"{k}{i}": v for k, v in linha.items()})
+
+    r = conn.execute(text(f"""
+        INSERT INTO cronogramas (name, email, nivel, respostas, cronograma, chave_idempotencia)
+        VALUES {", ".join(valores)}
+        ON CONFLICT (chave_idempotencia) DO NOTHING
+        RETURNING chave_idempotencia, id
+    """), params)
+    return {chave: str(id_) for chave, id_ in r}
+
+
+def _chaves_existentes(conn, chaves: List[str]) -> set:
+    if not chaves:
+        return set()
+    r = conn.execute(
+        text("SELECT chave_idempotencia FROM cronogramas WHERE chave_idempotencia = ANY(:chaves)"),
+        {"chaves": chaves},
+    )
+    return {row[0] for row in r}
+
+
+def _processar(engine, pool, itens, workers, modo, status, vistas) -> None:
+    """
+    Um INSERT para `itens` (no máximo uma linha por chave). Preenche `status` e
+    põe em `vistas` só as chaves que ficaram gravadas (agora ou antes).
+    """
+    # envios já gravados (importação repetida) não passam de novo pelo pipeline
+    with engine.connect() as conn:
+        existentes = _chaves_existentes(conn, [c for _, _, c in itens])
+    for n, form, chave in itens:
+        if chave in existentes:
+            status[n] = {"linha": n, "status": "duplicado", "email": form.get("email")}
+    vistas.update(existentes)
+    itens = [i for i in itens if i[2] not in existentes]
+
+    def preparar(item):
+        n, form, _ = item
+        try:
+            # sem a classificação do LLM a linha é erro: gravada degradada, a chave
+            # de idempotência impediria reimportar depois
+            with classificacao_estrita():
+                return n, preparar_linha(form, modo), None
+        except ClassificacaoIndisponivel as e:
+            return n, None, f"LLM indisponível ({e}); importe o arquivo de novo depois"
+        except Exception as e:
+            return n, None, f"{type(e).__name__}: {e}"
+
+    # respostas abertas do bloco inteiro em poucas chamadas ao LLM (ficam no cache)
+    preclassificar_formularios([form for _, form, _ in itens], paralelo=workers)
+
+    prontas: List[Tuple[int, Dict[str, Any]]] = []
+    for n, linha, erro in pool.map(preparar, itens):
+        if erro:
+            status[n] = {"linha": n, "status": "erro", "erro": erro}
+        else:
+            prontas.append((n, linha))
+
+    if prontas:
+        try:
+            with engine.begin() as conn:
+                inseridas = _inserir_lote(conn, [linha for _, linha in prontas])
+        except Exception as e:
+            for n, _ in prontas:
+                status[n] = {"linha": n, "status": "erro", "erro": f"INSERT do lote falhou: {e}"}
+            return
+        for n, linha in prontas:
+            id_ = inseridas.get(linha["chave"])
+            status[n] = (
+                {"linha": n, "status": "criado", "id": id_, "email": linha["email"]}
+                if id_ else {"linha": n, "status": "duplicado", "email": linha["email"]}
+            )
+            vistas.add(linha["chave"])  # criada agora ou gravada por outro processo no meio tempo
+
+
+def ingerir(
+    engine,
+    registros: Iterable[Tuple[int, Any]],
+    workers: int = 8,
+    lote: int = 100,
+    modo: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Processa os registros em lotes de `lote` linhas (`workers` em paralelo) e
+    gera um status por linha, na ordem do arquivo.
+
+    Uma linha só é "duplicado" se a mesma chave já está gravada. Cópias da mesma
+    chave no mesmo lote vão em rodadas seguintes: se a primeira falhar, a
+    próxima cópia ainda é importada.
+    """
+    vistas: set = set()  # chaves já gravadas
+    registros = iter(registros)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            bloco = list(islice(registros, lote))
+            if not bloco:
+                break
+
+            status: Dict[int, Dict[str, Any]] = {}
+            fila: List[Tuple[int, Dict[str, Any], str]] = []
+            for n, form in bloco:
+                if isinstance(form, Exception):
+                    status[n] = {"linha": n, "status": "erro", "erro": str(form)}
+                elif not isinstance(form, dict):
+                    status[n] = {"linha": n, "status": "erro", "erro": "Registro não é um objeto JSON"}
+                else:
+                    fila.append((n, form, chave_idempotencia(form)))
+
+            while fila:
+                rodada, resto, nesta = [], [], set()
+                for item in fila:
+                    n, form, chave = item
+                    if chave in vistas:
+                        status[n] = {"linha": n, "status": "duplicado", "email": form.get("email")}
+                    elif chave in nesta:
+                        resto.append(item)
+                    else:
+                        nesta.add(chave)
+                        rodada.append(item)
+                _processar(engine, pool, rodada, workers, modo, status, vistas)
+                fila = resto
+
+            for n, _ in bloco:
+                yield status[n]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa uma exportação do formulário (CSV ou NDJSON).")
+    parser.add_argument("arquivo", help="arquivo .csv ou .ndjson ('-' para stdin)")
+    parser.add_argument("--formato", choices=["csv", "ndjson"], help="padrão: pela extensão do arquivo")
+    parser.add_argument("--workers", type=int, default=8, help="formulários processados em paralelo")
+    parser.add_argument("--lote", type=int, default=100, help="linhas por INSERT")
+    parser.add_argument("--modo", choices=["guloso", "otimo"], default=None)
+    parser.add_argument("--relatorio", help="grava o status de cada linha neste arquivo NDJSON")
+    args = parser.parse_args(argv)
+
+    formato = args.formato or ("csv" if args.arquivo.lower().endswith(".csv") else "ndjson")
+    entrada = (
+        io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig")
+        if args.arquivo == "-"
+        else open(args.arquivo, encoding="utf-8-sig", newline="")
+    )
+    relatorio = open(args.relatorio, "w", encoding="utf-8") if args.relatorio else None
+
+    engine = create_engine(os.getenv("DB_URL"), pool_pre_ping=True)
+    resumo = {"total": 0, "criado": 0, "duplicado": 0, "erro": 0}
+    inicio = time.perf_counter()
+    try:
+        for s in ingerir(engine, ler_registros(entrada, formato), args.workers, args.lote, args.modo):
+            resumo["total"] += 1
+            resumo[s["status"]] += 1
+            if relatorio:
+                relatorio.write(json.dumps(s, ensure_ascii=False) + "\n")
+            if s["status"] == "erro":
+                print(f"❌ linha {s['linha']}: {s['erro']}")
+            if resumo["total"] % 100 == 0:
+                taxa = resumo["total"] / (time.perf_counter() - inicio)
+                print(f"  {resumo['total']} linhas ({taxa:.1f}/s)")
+    finally:
+        entrada.close()
+        if relatorio:
+            relatorio.close()
+
+    print(f"✅ Concluído em {time.perf_counter() - inicio:.1f}s: {resumo}")
+    return 0 if resumo["erro"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
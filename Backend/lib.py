@@ -1,9 +1,16 @@
 # lib.py
+import os
+import copy
 import json
-from typing import Any, Dict, List
+import heapq
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
 from reportlab.lib.pagesizes import A4  # type: ignore
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak  # type: ignore
 from reportlab.lib import colors  # type: ignore
+from reportlab import rl_config  # type: ignore
 from reportlab.lib.enums import TA_CENTER
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle  # type: ignore
 from reportlab.lib.utils import ImageReader
@@ -11,15 +18,16 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from io import BytesIO
 from PyPDF2 import PdfReader, PdfWriter
+from otimizar_pdf import PDF_OTIMIZAR, assinaturas_estatico, otimizar_leitor, pdf_estatico
 from pathlib import Path
 
 # ==== Imports do teu projeto ====
 from metricas_base import METRICAS
 from common import configurar_metricas_comuns
-from r1 import atualizar_metricas as atualizar_metricas_r1
-from r2 import atualizar_metricas as atualizar_metricas_r2
-from r3 import atualizar_metricas as atualizar_metricas_r3
-from r4 import atualizar_metricas as atualizar_metricas_r4
+from r1 import atualizar_metricas as atualizar_metricas_r1, PERGUNTAS_ABERTAS as PERGUNTAS_ABERTAS_R1, PERGUNTAS_TEMAS as PERGUNTAS_TEMAS_R1
+from r2 import atualizar_metricas as atualizar_metricas_r2, PERGUNTAS_ABERTAS as PERGUNTAS_ABERTAS_R2, PERGUNTAS_TEMAS as PERGUNTAS_TEMAS_R2
+from r3 import atualizar_metricas as atualizar_metricas_r3, PERGUNTAS_ABERTAS as PERGUNTAS_ABERTAS_R3, PERGUNTAS_TEMAS as PERGUNTAS_TEMAS_R3
+from r4 import atualizar_metricas as atualizar_metricas_r4, PERGUNTAS_ABERTAS as PERGUNTAS_ABERTAS_R4, PERGUNTAS_TEMAS as PERGUNTAS_TEMAS_R4
 
 # Base do projeto (lib.py está na raiz neste layout)
 BASE_DIR = Path(__file__).resolve().parent
@@ -80,6 +88,7 @@ def calcular_pesos_aulas(catalogo, metricas_aluno):
             score += float(valor_aula) * float(valor_aluno)
 
         resultado.append({
+            "id": aula.get("id"),
             "module_name": aula["module_name"],
             "lesson_theme": aula["lesson_theme"],
             "duration_min": int(aula["duration_min"]),
@@ -94,46 +103,129 @@ def gerar_cronograma(
     tempo_min_semana: int = 0,
     frac_limite_max: float = 0.90,
     peso_min_intermediario: float = 3.5,
+    limite_restantes: Optional[int] = None,
 ):
-    aulas_ordenadas = sorted(pesos_aulas, key=lambda x: x["peso"], reverse=True)
+    """
+    Preenche as semanas tirando as aulas de um heap em ordem decrescente de peso,
+    sob demanda, em vez de ordenar o catálogo inteiro.
+
+    limite_restantes: None devolve todas as aulas que sobraram (ordenadas por peso),
+    0 não monta a lista e N devolve só as N de maior peso.
+    """
+    # (-peso, posição) reproduz a ordenação estável por peso decrescente
+    heap = [(-a["peso"], i) for i, a in enumerate(pesos_aulas)]
+    heapq.heapify(heap)
     cronograma: List[List[Dict[str, Any]]] = [[] for _ in range(numero_semanas)]
     limite_90 = tempo_max_semana * frac_limite_max
 
     for semana_idx in range(numero_semanas):
-        if not aulas_ordenadas:
+        if not heap:
             break
 
         total_semana = 0
+        # aulas que não couberam nesta semana (só ficam mais longe de caber); voltam ao heap no fim dela
+        puladas = []
 
-        while aulas_ordenadas:
+        while heap:
             if total_semana >= limite_90:
                 break
 
-            # Regras de encaixe
-            if total_semana < tempo_min_semana:
-                def cabe(a):
-                    return a["duration_min"] + total_semana <= tempo_max_semana
-            else:
-                def cabe(a):
-                    return (
-                        a["peso"] >= peso_min_intermediario
-                        and a["duration_min"] + total_semana <= tempo_max_semana
-                    )
-
-            candidato = next((a for a in aulas_ordenadas if cabe(a)), None)
-            if candidato is None:
+            aula = pesos_aulas[heap[0][1]]
+
+            # Regras de encaixe: depois do mínimo, só entram aulas com peso >= peso_min_intermediario;
+            # como o heap sai em ordem de peso, a primeira abaixo do corte encerra a semana
+            if total_semana >= tempo_min_semana and aula["peso"] < peso_min_intermediario:
                 break
 
-            cronograma[semana_idx].append(candidato)
-            total_semana += candidato["duration_min"]
-            aulas_ordenadas.remove(candidato)
+            item = heapq.heappop(heap)
+            if aula["duration_min"] + total_semana <= tempo_max_semana:
+                cronograma[semana_idx].append(aula)
+                total_semana += aula["duration_min"]
+            else:
+                puladas.append(item)
+
+        for item in puladas:
+            heapq.heappush(heap, item)
 
-    # Tudo que sobrou vira aulas restantes
-    aulas_restantes = aulas_ordenadas
+    # Tudo que sobrou vira aulas restantes (ordenadas só se o chamador pedir)
+    if limite_restantes is None:
+        # sort por chave (estável, na ordem original) sai mais barato que ordenar as tuplas do heap
+        escolhidas = {id(a) for semana in cronograma for a in semana}
+        aulas_restantes = sorted(
+            (a for a in pesos_aulas if id(a) not in escolhidas), key=lambda a: -a["peso"]
+        )
+    elif limite_restantes <= 0:
+        aulas_restantes = []
+    else:
+        aulas_restantes = [pesos_aulas[i] for _, i in heapq.nsmallest(limite_restantes, heap)]
 
     return cronograma, aulas_restantes
 
 
+# imagens só em Flate: o ASCII85 deixa o stream ~25% maior e o encoder é Python puro
+rl_config.useA85 = 0
+
+
+@lru_cache(maxsize=1)
+def _slogan() -> ImageReader:
+    # um ImageReader por processo: com um novo a cada página, o PNG era lido e
+    # decodificado de novo em todas elas (o canvas tira o md5 dos pixels)
+    img = ImageReader(str(SLOGAN_PATH))
+    img.getRGBData()
+    return img
+
+
+# Células de aula (módulo/tema) já quebradas em linhas, por (texto, estilo, largura):
+# as ~400 aulas do catálogo se repetem em quase todo PDF com as mesmas larguras
+PDF_CELULAS_CACHE = int(os.getenv("PDF_CELULAS_CACHE", "4096"))
+_celulas: "OrderedDict[tuple, Paragraph]" = OrderedDict()
+_celulas_lock = threading.Lock()
+
+
+class _ParagrafoPronto(Paragraph):
+    """Paragraph já quebrado para uma largura: o wrap nessa largura não refaz a quebra de linhas."""
+    _largura_pronta = None
+
+    def wrap(self, availWidth, availHeight):
+        if availWidth == self._largura_pronta:
+            return self.width, self.height
+        return super().wrap(availWidth, availHeight)
+
+
+def _celula(texto: str, estilo: ParagraphStyle, largura: float) -> Paragraph:
+    if PDF_CELULAS_CACHE <= 0:
+        return Paragraph(texto, estilo)
+    chave = (texto, estilo.name, estilo.fontName, estilo.fontSize, estilo.leading, largura)
+    with _celulas_lock:
+        modelo = _celulas.get(chave)
+        if modelo is not None:
+            _celulas.move_to_end(chave)
+
+    if modelo is None:
+        modelo = _ParagrafoPronto(texto, estilo)
+        modelo.wrap(largura, 0)
+        modelo._largura_pronta = largura
+        with _celulas_lock:
+            _celulas[chave] = modelo
+            if len(_celulas) > PDF_CELULAS_CACHE:
+                _celulas.popitem(last=False)
+
+    # cópia rasa: frags e linhas ficam compartilhados (só leitura); o canvas que o
+    # drawOn pendura no objeto não, então dois renders em paralelo não se cruzam
+    return copy.copy(modelo)
+
+
+def _ler_estatico(path: Path, por_assinatura: Dict[str, Any]) -> PdfReader:
+    """
+    Capa/contracapa: versão otimizada (em cache no processo) ou o arquivo original.
+    Com a otimização, as imagens entram em `por_assinatura` para deduplicar com o resto do PDF.
+    """
+    if PDF_OTIMIZAR:
+        reader = PdfReader(BytesIO(pdf_estatico(str(path))))
+        return otimizar_leitor(reader, por_assinatura, assinaturas_estatico(str(path)))
+    return PdfReader(open(path, "rb"))
+
+
 def gerar_pdf_bytes(cronograma: List[List[Dict[str, Any]]]) -> BytesIO:
     miolo_buf = BytesIO()
 
@@ -144,8 +236,7 @@ def gerar_pdf_bytes(cronograma: List[List[Dict[str, Any]]]) -> BytesIO:
     # --- Slogan controlado por largura (percentual da área útil) ---
     WIDTH_RATIO = 0.45  # 45% da largura útil
     try:
-        img = ImageReader(str(SLOGAN_PATH))
-        iw, ih = img.getSize()
+        iw, ih = _slogan().getSize()
     except Exception:
         iw, ih = (1, 1)
 
@@ -180,7 +271,7 @@ def gerar_pdf_bytes(cronograma: List[List[Dict[str, Any]]]) -> BytesIO:
     # desenha o slogan usando o mesmo WIDTH_RATIO
     def on_page(canvas, doc_):
         try:
-            img = ImageReader(str(SLOGAN_PATH))
+            img = _slogan()
             iw, ih = img.getSize()
 
             avail_w = doc_.pagesize[0] - doc_.leftMargin - doc_.rightMargin
@@ -200,6 +291,13 @@ def gerar_pdf_bytes(cronograma: List[List[Dict[str, Any]]]) -> BytesIO:
 
     elementos = []
 
+    # Larguras (Módulo↑, Minutos↑, Tema↓)
+    total_w = doc.pagesize[0] - doc.leftMargin - doc.rightMargin
+    cw_mod = 0.32 * total_w
+    cw_tema = 0.48 * total_w
+    cw_min = 0.20 * total_w
+    PADDING = 4
+
     for i, semana in enumerate(cronograma, 1):
         data = []
         # 1) Faixa SEMANA X
@@ -212,8 +310,9 @@ def gerar_pdf_bytes(cronograma: List[List[Dict[str, Any]]]) -> BytesIO:
         for aula in semana:
             total_semana += aula["duration_min"]
             data.append([
-                Paragraph(aula["module_name"], styles["Normal"]),
-                Paragraph(aula["lesson_theme"], tema_style),
+                # mesma largura útil que a Table usa na célula (coluna - paddings)
+                _celula(aula["module_name"], styles["Normal"], cw_mod - PADDING - PADDING),
+                _celula(aula["lesson_theme"], tema_style, cw_tema - PADDING - PADDING),
                 str(aula["duration_min"]),  # string para ALIGN funcionar
             ])
 
@@ -223,12 +322,6 @@ def gerar_pdf_bytes(cronograma: List[List[Dict[str, Any]]]) -> BytesIO:
         total_txt = f"TOTAL: ({horas}H{mins:02d})"
         data.append(["", "", total_txt])
 
-        # Larguras (Módulo↑, Minutos↑, Tema↓)
-        total_w = doc.pagesize[0] - doc.leftMargin - doc.rightMargin
-        cw_mod = 0.32 * total_w
-        cw_tema = 0.48 * total_w
-        cw_min = 0.20 * total_w
-
         # Alturas das linhas
         content_h = 36
         total_h = max(18, int(round(content_h * 0.6)))
@@ -281,10 +374,10 @@ def gerar_pdf_bytes(cronograma: List[List[Dict[str, Any]]]) -> BytesIO:
             ("VALIGN", (2, 2), (2, -2), "MIDDLE"),
 
             # Padding menor
-            ("LEFTPADDING", (0, 0), (-1, -1), 4),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 4),
-            ("TOPPADDING", (0, 0), (-1, -1), 4),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+            ("LEFTPADDING", (0, 0), (-1, -1), PADDING),
+            ("RIGHTPADDING", (0, 0), (-1, -1), PADDING),
+            ("TOPPADDING", (0, 0), (-1, -1), PADDING),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), PADDING),
 
             # Linha TOTAL: col 0..1 cinza; col 2 azul/ branco/ bold/ centralizado
             ("BACKGROUND", (0, -1), (1, -1), CINZA),
@@ -307,21 +400,25 @@ def gerar_pdf_bytes(cronograma: List[List[Dict[str, Any]]]) -> BytesIO:
     doc.build(elementos, onFirstPage=on_page, onLaterPages=on_page)
     miolo_buf.seek(0)
 
-    # Junta CAPA + MIOLO + CONTRACAPA (usa *PATH já definidos no módulo)
+    # Junta CAPA + MIOLO + CONTRACAPA (usa *PATH já definidos no módulo);
+    # as imagens repetidas entre os três documentos saem uma vez só
     writer = PdfWriter()
+    por_assinatura: Dict[str, Any] = {}
     try:
-        r = PdfReader(open(CAPA_PATH, "rb"))
+        r = _ler_estatico(CAPA_PATH, por_assinatura)
         for p in r.pages:
             writer.add_page(p)
     except Exception:
         pass
 
     r = PdfReader(miolo_buf)
+    if PDF_OTIMIZAR:
+        otimizar_leitor(r, por_assinatura)
     for p in r.pages:
         writer.add_page(p)
 
     try:
-        r = PdfReader(open(CONTRACAPA_PATH, "rb"))
+        r = _ler_estatico(CONTRACAPA_PATH, por_assinatura)
         for p in r.pages:
             writer.add_page(p)
     except Exception:
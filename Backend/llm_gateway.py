@@ -0,0 +1,359 @@
+# llm_gateway.py
+"""
+Porta única de saída para o LLM (OpenAI).
+
+Picos de formulários (disparos de marketing) geram centenas de classificações
+em poucos minutos; em vez de cada uma chamar a API por conta própria, todas
+passam por aqui:
+  - token bucket (LLM_RPS / LLM_BURST): limita a taxa de chamadas ao provedor;
+  - semáforo (LLM_MAX_CONCORRENCIA): limita as chamadas simultâneas;
+  - single-flight: prompts idênticos em andamento viram uma chamada só;
+  - timeout por chamada e novas tentativas com backoff exponencial + jitter
+    (respeitando o Retry-After dos 429);
+  - admissão: quem esperaria mais que LLM_FILA_MAX_MS por vaga é recusado na hora;
+  - hedge: se a resposta passa do p95 recente, uma segunda requisição igual
+    é disparada e vale a que chegar primeiro;
+  - disjuntor: depois de LLM_CB_FALHAS falhas seguidas o provedor não é
+    chamado por LLM_CB_ABERTO_S segundos (CircuitoAberto na hora).
+
+Os contadores ficam em `metricas()` (expostos em /admin/metricas).
+Para testar sem a OpenAI, aponte OPENAI_BASE_URL para o servidor falso em
+loadtest/fake_openai.py.
+"""
+import os
+import time
+import json
+import random
+import hashlib
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, List, Optional
+
+from dotenv import load_dotenv
+load_dotenv()
+import openai
+from openai import OpenAI
+
+from concorrencia import CircuitBreaker, SingleFlight
+
+# ===== CONFIG =====
+LLM_MODELO = os.getenv("LLM_MODELO", "gpt-4o-mini")
+LLM_RPS = float(os.getenv("LLM_RPS", "8"))
+LLM_BURST = float(os.getenv("LLM_BURST", "16"))
+LLM_MAX_CONCORRENCIA = int(os.getenv("LLM_MAX_CONCORRENCIA", "8"))
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "20"))
+LLM_TENTATIVAS = int(os.getenv("LLM_TENTATIVAS", "3"))
+LLM_BACKOFF_BASE_MS = float(os.getenv("LLM_BACKOFF_BASE_MS", "250"))
+LLM_BACKOFF_MAX_MS = float(os.getenv("LLM_BACKOFF_MAX_MS", "4000"))
+LLM_FILA_MAX_MS = float(os.getenv("LLM_FILA_MAX_MS", "30000"))
+
+# Hedge: segunda requisição igual quando a primeira passa do p95 recente
+LLM_HEDGE = os.getenv("LLM_HEDGE", "1") == "1"
+LLM_HEDGE_PERCENTIL = float(os.getenv("LLM_HEDGE_PERCENTIL", "0.95"))
+LLM_HEDGE_PADRAO_MS = float(os.getenv("LLM_HEDGE_PADRAO_MS", "3000"))  # até juntar amostras
+LLM_HEDGE_MIN_MS = float(os.getenv("LLM_HEDGE_MIN_MS", "200"))
+LLM_HEDGE_JANELA = int(os.getenv("LLM_HEDGE_JANELA", "200"))
+LLM_HEDGE_MIN_AMOSTRAS = 20
+
+# Disjuntor: para de chamar o provedor depois de falhas seguidas (timeout, conexão, 5xx)
+LLM_CB_FALHAS = int(os.getenv("LLM_CB_FALHAS", "5"))
+LLM_CB_ABERTO_S = float(os.getenv("LLM_CB_ABERTO_S", "30"))
+
+# Erros que valem nova tentativa (os demais, ex. 400/401, sobem direto)
+_RETENTAVEIS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class LLMIndisponivel(Exception):
+    """O LLM não respondeu (fila cheia, timeouts ou erros em todas as tentativas)."""
+
+
+class CircuitoAberto(LLMIndisponivel):
+    """O disjuntor está aberto: nem chegamos a chamar o provedor."""
+
+
+class TokenBucket:
+    def __init__(self, taxa: float, capacidade: float):
+        self.taxa = taxa
+        self.capacidade = max(capacidade, 1.0)
+        self._tokens = self.capacidade
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def tentar(self) -> bool:
+        """Pega um token se houver agora, sem esperar."""
+        with self._lock:
+            agora = time.monotonic()
+            self._tokens = min(self.capacidade, self._tokens + (agora - self._ultimo) * self.taxa)
+            self._ultimo = agora
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def adquirir(self, prazo: float) -> float:
+        """
+        Bloqueia até ter um token. Devolve quanto esperou (s); levanta
+        LLMIndisponivel se a espera passar do `prazo` (time.monotonic()).
+        """
+        esperou = 0.0
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._tokens = min(self.capacidade, self._tokens + (agora - self._ultimo) * self.taxa)
+                self._ultimo = agora
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return esperou
+                espera = (1 - self._tokens) / self.taxa
+
+            if agora + espera > prazo:
+                raise LLMIndisponivel("fila do LLM cheia (limite de taxa)")
+            time.sleep(espera)
+            esperou += espera
+
+
+class LLMGateway:
+    def __init__(
+        self,
+        rps: float = LLM_RPS,
+        burst: float = LLM_BURST,
+        max_concorrencia: int = LLM_MAX_CONCORRENCIA,
+        timeout_s: float = LLM_TIMEOUT_S,
+        tentativas: int = LLM_TENTATIVAS,
+        fila_max_ms: float = LLM_FILA_MAX_MS,
+        hedge: bool = LLM_HEDGE,
+    ):
+        self.bucket = TokenBucket(rps, burst)
+        self.semaforo = threading.BoundedSemaphore(max_concorrencia)
+        self.timeout_s = timeout_s
+        self.tentativas = max(tentativas, 1)
+        self.fila_max_s = fila_max_ms / 1000.0
+        self.max_concorrencia = max_concorrencia
+        self.hedge = hedge
+        self.voos = SingleFlight()
+        self.circuito = CircuitBreaker(LLM_CB_FALHAS, LLM_CB_ABERTO_S, nome="circuito do LLM")
+
+        self._client: Optional[OpenAI] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._client_lock = threading.Lock()
+        self._contadores_lock = threading.Lock()
+        self._contadores = {
+            "chamadas": 0,       # pedidos recebidos pelo gateway
+            "enviadas": 0,       # requisições HTTP de fato feitas ao provedor
+            "sucesso": 0,
+            "coalescidas": 0,    # atendidas por uma chamada idêntica em andamento
+            "throttled": 0,      # tiveram que esperar o token bucket
+            "rejeitadas": 0,     # recusadas na admissão (fila cheia)
+            "retries": 0,
+            "timeouts": 0,
+            "falhas": 0,         # terminaram em erro depois das tentativas
+            "hedges": 0,         # segundas requisições disparadas
+            "hedges_venceram": 0,
+        }
+        self._latencia_total_ms = 0.0
+        self._latencias: Deque[float] = deque(maxlen=LLM_HEDGE_JANELA)
+
+    # ----- cliente (criado sob demanda: seguro para fork) -----
+    @property
+    def client(self) -> OpenAI:
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = OpenAI(
+                        api_key=os.getenv("OPENAI_API_KEY"),
+                        base_url=os.getenv("OPENAI_BASE_URL") or None,
+                        timeout=self.timeout_s,
+                        max_retries=0,  # as novas tentativas são feitas aqui
+                    )
+        return self._client
+
+    def _contar(self, chave: str, n: int = 1):
+        with self._contadores_lock:
+            self._contadores[chave] += n
+
+    def metricas(self) -> Dict[str, Any]:
+        with self._contadores_lock:
+            dados = dict(self._contadores)
+            enviadas_ok = dados["sucesso"]
+            latencia_media = self._latencia_total_ms / enviadas_ok if enviadas_ok else 0.0
+        dados["em_andamento"] = self.voos.em_andamento()
+        dados["latencia_media_ms"] = round(latencia_media, 1)
+        dados["hedge"] = {
+            "ativo": self.hedge,
+            "atraso_ms": round(self.atraso_hedge_s() * 1000, 1),
+            "taxa_vitoria": round(dados["hedges_venceram"] / dados["hedges"], 3) if dados["hedges"] else 0.0,
+        }
+        dados["circuito"] = self.circuito.estado()
+        return dados
+
+    # ----- chamada -----
+    def completar(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 200,
+        modelo: Optional[str] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Texto da resposta do chat completion (com `response_format` json_schema,
+        o JSON gerado). Levanta LLMIndisponivel se não conseguir.
+        """
+        modelo = modelo or LLM_MODELO
+        self._contar("chamadas")
+
+        chave = hashlib.sha256(
+            json.dumps([modelo, max_tokens, messages, response_format], ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        texto, coalescida = self.voos.fazer(
+            chave, lambda: self._com_tentativas(messages, max_tokens, modelo, response_format)
+        )
+        if coalescida:
+            self._contar("coalescidas")
+        return texto
+
+    def _com_tentativas(self, messages, max_tokens: int, modelo: str, response_format=None) -> str:
+        ultimo_erro: Optional[Exception] = None
+        for tentativa in range(self.tentativas):
+            if tentativa:
+                self._contar("retries")
+                time.sleep(self._backoff(tentativa, ultimo_erro))
+            if not self.circuito.permitir():
+                raise CircuitoAberto("circuito do LLM aberto")
+            try:
+                return self._tentativa(messages, max_tokens, modelo, response_format)
+            except LLMIndisponivel:
+                self.circuito.neutro()
+                self._contar("rejeitadas")
+                raise
+            except _RETENTAVEIS as e:
+                if isinstance(e, openai.APITimeoutError):
+                    self._contar("timeouts")
+                ultimo_erro = e
+            except Exception as e:
+                self._contar("falhas")
+                raise LLMIndisponivel(f"{type(e).__name__}: {e}") from e
+
+        self._contar("falhas")
+        raise LLMIndisponivel(f"{type(ultimo_erro).__name__}: {ultimo_erro}") from ultimo_erro
+
+    def _tentativa(self, messages, max_tokens: int, modelo: str, response_format=None) -> str:
+        """
+        Uma tentativa, com hedge: se a primeira requisição passar do atraso de
+        hedge (p95 recente) sem responder, dispara uma segunda igual e fica com
+        a que chegar primeiro. O hedge só sai se houver token e vaga livres na
+        hora — sob carga ele não acrescenta requisições.
+        """
+        prazo = time.monotonic() + self.fila_max_s
+        if self.bucket.adquirir(prazo) > 0:
+            self._contar("throttled")
+        if not self.semaforo.acquire(timeout=max(prazo - time.monotonic(), 0)):
+            raise LLMIndisponivel("fila do LLM cheia (concorrência)")
+
+        if not self.hedge:
+            return self._enviar(messages, max_tokens, modelo, response_format)
+
+        primaria = self._pool().submit(self._enviar, messages, max_tokens, modelo, response_format)
+        wait([primaria], timeout=self.atraso_hedge_s())
+        if primaria.done() or not self._pode_hedge():
+            return primaria.result()
+
+        self._contar("hedges")
+        hedge = self._pool().submit(self._enviar, messages, max_tokens, modelo, response_format)
+        pendentes = {primaria, hedge}
+        erro: Optional[BaseException] = None
+        while pendentes:
+            prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                if futuro.exception() is None:
+                    if futuro is hedge:
+                        self._contar("hedges_venceram")
+                    return futuro.result()
+                erro = futuro.exception()
+        raise erro
+
+    def _pode_hedge(self) -> bool:
+        if self.circuito.estado()["estado"] != CircuitBreaker.FECHADO:
+            return False
+        if not self.bucket.tentar():
+            return False
+        return self.semaforo.acquire(blocking=False)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # cada tarefa do pool já segura uma vaga do semáforo, então o pool nunca enfileira
+        if self._executor is None:
+            with self._client_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concorrencia, thread_name_prefix="llm"
+                    )
+        return self._executor
+
+    def atraso_hedge_s(self) -> float:
+        with self._contadores_lock:
+            amostras = sorted(self._latencias)
+        if len(amostras) < LLM_HEDGE_MIN_AMOSTRAS:
+            return LLM_HEDGE_PADRAO_MS / 1000.0
+        p = amostras[min(int(LLM_HEDGE_PERCENTIL * len(amostras)), len(amostras) - 1)]
+        return max(p, LLM_HEDGE_MIN_MS) / 1000.0
+
+    def _enviar(self, messages, max_tokens: int, modelo: str, response_format=None) -> str:
+        """Faz a requisição HTTP. Chamado já com uma vaga do semáforo, que é liberada aqui."""
+        try:
+            self._contar("enviadas")
+            inicio = time.perf_counter()
+            extra = {"response_format": response_format} if response_format else {}
+            resp = self.client.chat.completions.create(
+                model=modelo,
+                messages=messages,
+                max_tokens=max_tokens,
+                timeout=self.timeout_s,
+                **extra,
+            )
+            ms = (time.perf_counter() - inicio) * 1000
+            with self._contadores_lock:
+                self._contadores["sucesso"] += 1
+                self._latencia_total_ms += ms
+                self._latencias.append(ms)
+            self.circuito.sucesso()
+            return (resp.choices[0].message.content or "").strip()
+        except (openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError):
+            self.circuito.falha()
+            raise
+        except Exception:
+            # 429, 4xx: o provedor está de pé
+            self.circuito.neutro()
+            raise
+        finally:
+            self.semaforo.release()
+
+    @staticmethod
+    def _backoff(tentativa: int, erro: Optional[Exception]) -> float:
+        """Backoff exponencial com jitter completo; um Retry-After do provedor tem prioridade."""
+        teto = min(LLM_BACKOFF_MAX_MS, LLM_BACKOFF_BASE_MS * (2 ** (tentativa - 1))) / 1000.0
+        espera = random.uniform(0, teto)
+        resposta = getattr(erro, "response", None)
+        if resposta is not None:
+            try:
+                espera = max(espera, float(resposta.headers.get("retry-after", 0)))
+            except (TypeError, ValueError):
+                pass
+        return min(espera, LLM_BACKOFF_MAX_MS / 1000.0)
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def obter_gateway() -> LLMGateway:
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    return _gateway
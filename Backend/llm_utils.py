@@ -1,14 +1,31 @@
 # llm_utils.py
 import os
 import re
-from typing import Dict, List
-from openai import OpenAI  # pip install openai>=1.0.0
+import json
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Literal, Optional, Sequence, Tuple, Union
 from dotenv import load_dotenv
 load_dotenv()  # carrega variáveis do .env
 
-# Cliente da OpenAI (pega da variável de ambiente)
+from pydantic import TypeAdapter, ValidationError
+from typing_extensions import TypedDict
+
+# Chamadas à OpenAI passam pelo gateway (limite de taxa, concorrência, retries)
 # Ex.: export OPENAI_API_KEY="sk-xxxx"
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from llm_gateway import obter_gateway, LLMIndisponivel, CircuitoAberto
+
+# Quantas classificações (pergunta, resposta) manter em memória
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "4096"))
+
+# "lote": todas as respostas abertas do formulário num chat completion só, com
+# saída estruturada (JSON schema); "individual": uma chamada por pergunta
+LLM_CLASSIFICACAO = os.getenv("LLM_CLASSIFICACAO", "lote")
+# Máximo de respostas por chamada (jobs em lote juntam vários formulários)
+LLM_LOTE_MAX = int(os.getenv("LLM_LOTE_MAX", "20"))
 
 # Listas de categorias (mantidas exatamente como você enviou)
 EXAMES = [
@@ -54,12 +71,71 @@ SUBESPECIALIDADES = [
     "subespecialidade_pratica_cetrus",
 ]
 
-def processar_resposta_aberta(pergunta: str, resposta: str, metricas: Dict) -> Dict:
-    """Usa LLM para interpretar resposta aberta e atualizar métricas (mesma lógica do seu original)."""
-    if not resposta or str(resposta).strip() == "":
-        return metricas
+CATEGORIAS: List[str] = EXAMES + SUBESPECIALIDADES
+
+
+class ClassificacaoIndisponivel(Exception):
+    """Modo estrito: uma resposta aberta ficou sem classificação (LLM fora, saída inválida)."""
+
+
+# Fora do modo estrito, falha do LLM degrada para as respostas fechadas
+_estrita: ContextVar[bool] = ContextVar("classificacao_estrita", default=False)
+
+
+@contextmanager
+def classificacao_estrita():
+    """
+    Jobs que gravam por cima de cronogramas salvos (regenerar, ingestao): dentro
+    do bloco, uma resposta aberta que o LLM não classificou levanta
+    ClassificacaoIndisponivel em vez de sair um cronograma só com as fechadas.
+    Vale para a thread/contexto atual.
+    """
+    token = _estrita.set(True)
+    try:
+        yield
+    finally:
+        _estrita.reset(token)
+
+
+def _normalizar_resposta(resposta) -> str:
+    return " ".join(str(resposta).split())
+
+
+# Cache (pergunta, resposta) -> chaves, comum às duas formas de classificar.
+# Só respostas bem-sucedidas entram (falhas não são cacheadas), então
+# reprocessamentos em lote não pagam de novo por respostas repetidas.
+_cache: "OrderedDict[Tuple[str, str], Tuple[str, ...]]" = OrderedDict()
+_cache_lock = threading.Lock()
 
-    categorias: List[str] = EXAMES + SUBESPECIALIDADES
+
+def _do_cache(par: Tuple[str, str]) -> Optional[Tuple[str, ...]]:
+    with _cache_lock:
+        chaves = _cache.get(par)
+        if chaves is not None:
+            _cache.move_to_end(par)
+        return chaves
+
+
+def _guardar(par: Tuple[str, str], chaves: Tuple[str, ...]) -> None:
+    with _cache_lock:
+        _cache[par] = chaves
+        _cache.move_to_end(par)
+        while len(_cache) > LLM_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def limpar_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def _classificar(pergunta: str, resposta: str) -> Tuple[str, ...]:
+    """Chama o LLM (uma pergunta por chamada) e devolve as chaves reconhecidas."""
+    chaves = _do_cache((pergunta, resposta))
+    if chaves is not None:
+        return chaves
+
+    categorias: List[str] = CATEGORIAS
 
     # === PROMPT ORIGINAL PRESERVADO ===
     prompt = f"""
@@ -75,34 +151,211 @@ def processar_resposta_aberta(pergunta: str, resposta: str, metricas: Dict) -> D
     """
     # ================================
 
+    saida_raw = obter_gateway().completar(
+        [
+            {"role": "system", "content": "Você é um classificador de respostas abertas."},
+            {"role": "user", "content": prompt},
+        ],
+        max_tokens=200,
+    ).lower()
+
+    # limpeza básica (mesma ideia do seu original)
+    saida = re.sub(r"[^a-z0-9_, ]", "", saida_raw)
+    chaves = tuple(s.strip() for s in saida.split(",") if s.strip())
+    _guardar((pergunta, resposta), chaves)
+    return chaves
+
+
+# ===== Classificação em lote (saída estruturada) =====
+# As categorias vão uma vez só, como enum do schema; o provedor restringe a
+# saída a elas e a resposta é validada de novo aqui.
+class _Classificacao(TypedDict):
+    indice: int
+    chaves: List[Literal[tuple(CATEGORIAS)]]  # type: ignore[valid-type]
+
+
+class _Saida(TypedDict):
+    classificacoes: List[_Classificacao]
+
+
+_SAIDA = TypeAdapter(_Saida)
+
+FORMATO_LOTE: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "classificacao_respostas",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "classificacoes": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "indice": {"type": "integer"},
+                            "chaves": {"type": "array", "items": {"type": "string", "enum": CATEGORIAS}},
+                        },
+                        "required": ["indice", "chaves"],
+                        "additionalProperties": False,
+                    },
+                }
+            },
+            "required": ["classificacoes"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+def _prompt_lote(pares: Sequence[Tuple[str, str]]) -> str:
+    itens = "\n".join(
+        f'{i}. Pergunta: {json.dumps(p, ensure_ascii=False)}\n   Resposta do aluno: {json.dumps(r, ensure_ascii=False)}'
+        for i, (p, r) in enumerate(pares, start=1)
+    )
+    return f"""Mapeie cada resposta do aluno para UMA OU MAIS chaves de categoria (lista "chaves" do schema).
+
+Regras:
+- Se não houver correspondência clara, devolva "chaves": [].
+- Um item em "classificacoes" por resposta, com o mesmo "indice" da lista abaixo.
+
+{itens}"""
+
+
+def _classificar_chamada(pares: Sequence[Tuple[str, str]]) -> List[Tuple[str, ...]]:
+    """Um chat completion para até LLM_LOTE_MAX respostas; levanta ValueError se a saída não bate."""
+    saida = obter_gateway().completar(
+        [
+            {"role": "system", "content": "Você é um classificador de respostas abertas."},
+            {"role": "user", "content": _prompt_lote(pares)},
+        ],
+        max_tokens=40 + 60 * len(pares),
+        response_format=FORMATO_LOTE,
+    )
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "Você é um classificador de respostas abertas."},
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=200,
-        )
-
-        saida_raw = resp.choices[0].message.content.strip().lower()
-
-        # limpeza básica (mesma ideia do seu original)
-        saida = re.sub(r"[^a-z0-9_, ]", "", saida_raw)
-        chaves = [s.strip() for s in saida.split(",") if s.strip()]
-
-        if not chaves or "nenhuma" in chaves:
-            return metricas
-
-        # Atualiza métricas (mesmas regras do seu original)
-        for chave in chaves:
-            if chave in EXAMES:
-                metricas[chave] = metricas.get(chave, 0) + 2
-            elif chave in SUBESPECIALIDADES:
-                metricas[chave] = metricas.get(chave, 0) + 4
-
-    except Exception:
-        # Sem Streamlit: não loga nada aqui; apenas não quebra o backend.
-        pass
+        classificacoes = _SAIDA.validate_json(saida)["classificacoes"]
+    except ValidationError as e:
+        raise ValueError(f"saída do LLM fora do schema: {e.error_count()} erro(s)") from e
+
+    por_indice = {c["indice"]: tuple(dict.fromkeys(c["chaves"])) for c in classificacoes}
+    if len(classificacoes) != len(pares) or set(por_indice) != set(range(1, len(pares) + 1)):
+        raise ValueError(f"saída do LLM com {len(classificacoes)} classificações para {len(pares)} respostas")
+    return [por_indice[i] for i in range(1, len(pares) + 1)]
+
+
+def classificar_lote(pares: Iterable[Tuple[str, str]], paralelo: int = 1) -> Dict[Tuple[str, str], Tuple[str, ...]]:
+    """
+    Chaves de cada (pergunta, resposta normalizada), com as que não estão no
+    cache classificadas em chamadas de até LLM_LOTE_MAX respostas (`paralelo`
+    chamadas ao mesmo tempo; o gateway continua limitando). Levanta
+    LLMIndisponivel/ValueError se alguma chamada falhar; as que deram certo
+    ficam no cache.
+    """
+    resultado: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+    faltam: List[Tuple[str, str]] = []
+    for par in dict.fromkeys(pares):
+        chaves = _do_cache(par)
+        if chaves is None:
+            faltam.append(par)
+        else:
+            resultado[par] = chaves
+
+    tamanho = max(LLM_LOTE_MAX, 1)
+    lotes = [faltam[i:i + tamanho] for i in range(0, len(faltam), tamanho)]
+
+    def classificar(lote):
+        feitos = list(zip(lote, _classificar_chamada(lote)))
+        for par, chaves in feitos:
+            _guardar(par, chaves)
+        return feitos
+
+    if paralelo > 1 and len(lotes) > 1:
+        with ThreadPoolExecutor(max_workers=min(paralelo, len(lotes)), thread_name_prefix="classificar") as pool:
+            feitos = list(pool.map(classificar, lotes))
+    else:
+        feitos = [classificar(lote) for lote in lotes]
+    for feito in feitos:
+        resultado.update(feito)
+    return resultado
+
+
+Perguntas = Sequence[Union[str, Tuple[str, str]]]
+
+
+def _campos(perguntas: Perguntas) -> List[Tuple[str, str]]:
+    return [(p, p) if isinstance(p, str) else p for p in perguntas]
+
+
+def pares_abertos(respostas: Dict[str, Any], perguntas: Perguntas) -> List[Tuple[str, str]]:
+    """(pergunta, resposta normalizada) das perguntas abertas respondidas do formulário."""
+    pares = []
+    for campo, pergunta in _campos(perguntas):
+        resposta = respostas.get(campo)
+        if resposta and str(resposta).strip():
+            pares.append((pergunta, _normalizar_resposta(resposta)))
+    return pares
+
+
+def _aplicar(chaves: Sequence[str], metricas: Dict) -> None:
+    if not chaves or "nenhuma" in chaves:
+        return
+    # Atualiza métricas (mesmas regras do seu original)
+    for chave in chaves:
+        if chave in EXAMES:
+            metricas[chave] = metricas.get(chave, 0) + 2
+        elif chave in SUBESPECIALIDADES:
+            metricas[chave] = metricas.get(chave, 0) + 4
+
+
+def _falha_classificacao(e: Exception, ignoradas: str) -> None:
+    """Chamado dentro do except de quem classifica: levanta no modo estrito, senão só loga."""
+    if _estrita.get():
+        raise ClassificacaoIndisponivel(f"{type(e).__name__}: {e}") from e
+    if isinstance(e, CircuitoAberto):
+        # provedor fora do ar: degrada para as métricas sem a resposta aberta, sem esperar
+        return
+    if isinstance(e, LLMIndisponivel):
+        # Sem a classificação o cronograma sai só com as respostas fechadas; não quebra o backend.
+        print(f"⚠️ LLM indisponível, {ignoradas}: {e}")
+    else:
+        print(f"⚠️ Falha ao classificar, {ignoradas}: {type(e).__name__}: {e}")
+
+
+def processar_resposta_aberta(pergunta: str, resposta: str, metricas: Dict) -> Dict:
+    """Usa LLM para interpretar resposta aberta e atualizar métricas (mesma lógica do seu original)."""
+    if not resposta or str(resposta).strip() == "":
+        return metricas
+
+    try:
+        _aplicar(_classificar(pergunta, _normalizar_resposta(resposta)), metricas)
+    except Exception as e:
+        _falha_classificacao(e, "resposta aberta ignorada")
+
+    return metricas
+
+
+def processar_respostas_abertas(respostas: Dict[str, Any], perguntas: Perguntas, metricas: Dict) -> Dict:
+    """
+    Todas as perguntas abertas do formulário (`perguntas`: campo no formulário,
+    ou (campo, pergunta enviada ao LLM) quando são diferentes). No modo "lote" é um chat completion
+    só, ou nenhum se as respostas já foram classificadas (cache, ou
+    `core.preclassificar_formularios` nos jobs em lote).
+    """
+    if LLM_CLASSIFICACAO != "lote":
+        for campo, pergunta in _campos(perguntas):
+            if campo in respostas:
+                metricas = processar_resposta_aberta(pergunta, respostas[campo], metricas)
+        return metricas
+
+    pares = pares_abertos(respostas, perguntas)
+    if not pares:
+        return metricas
+    try:
+        classificadas = classificar_lote(pares)
+        for par in pares:
+            _aplicar(classificadas[par], metricas)
+
+    except Exception as e:
+        _falha_classificacao(e, "respostas abertas ignoradas")
 
     return metricas
@@ -0,0 +1,133 @@
+# loadtest/fake_openai.py
+"""
+Servidor falso da API de chat completions da OpenAI, para testar o gateway
+(llm_gateway.py) e o backend sem gastar cota nem depender da rede.
+
+Classifica a "Resposta do aluno" do prompt procurando os sufixos das chaves
+(ex.: "tc" -> exame_tc, "neuro" -> subespecialidade_neuro); sem nada, "nenhuma".
+Com `response_format` json_schema (classificação em lote, llm_utils), devolve o
+JSON do schema com uma classificação por resposta numerada do prompt.
+Em /stats, `prompt_tokens` estima os tokens de entrada (~4 caracteres por
+token, schema incluído), para comparar os modos de classificação.
+
+Comportamento configurável por variável de ambiente:
+  FAKE_LATENCIA_MS   latência média por resposta (padrão 300)
+  FAKE_JITTER_MS     variação uniforme da latência (padrão 100)
+  FAKE_RPS_LIMITE    acima dessa taxa devolve 429 com Retry-After (0 = sem limite)
+  FAKE_TAXA_ERRO     fração de respostas 500 (padrão 0)
+  FAKE_TAXA_LENTA    fração de respostas na cauda lenta (padrão 0)
+  FAKE_LENTA_MS      latência da cauda lenta (padrão 5000)
+
+Uso (a partir de Backend/):
+    uvicorn loadtest.fake_openai:app --port 8900
+    export OPENAI_BASE_URL=http://localhost:8900/v1 OPENAI_API_KEY=fake
+"""
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import threading
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from llm_utils import EXAMES, SUBESPECIALIDADES
+
+FAKE_LATENCIA_MS = float(os.getenv("FAKE_LATENCIA_MS", "300"))
+FAKE_JITTER_MS = float(os.getenv("FAKE_JITTER_MS", "100"))
+FAKE_RPS_LIMITE = float(os.getenv("FAKE_RPS_LIMITE", "0"))
+FAKE_TAXA_ERRO = float(os.getenv("FAKE_TAXA_ERRO", "0"))
+FAKE_TAXA_LENTA = float(os.getenv("FAKE_TAXA_LENTA", "0"))
+FAKE_LENTA_MS = float(os.getenv("FAKE_LENTA_MS", "5000"))
+
+app = FastAPI(title="Fake OpenAI")
+
+_stats = Counter()
+_janela = []  # instantes das requisições do último segundo
+_lock = threading.Lock()
+
+
+def _chaves(resposta: str) -> list:
+    resposta = resposta.lower()
+    palavras = set(re.findall(r"[a-z0-9]+", resposta))
+    return [
+        c for c in EXAMES + SUBESPECIALIDADES
+        if c.split("_", 1)[1] in palavras or c.split("_", 1)[1].replace("_", " ") in resposta
+    ]
+
+
+def classificar(prompt: str) -> str:
+    m = re.search(r'Resposta do aluno: "(.*?)"', prompt, re.S)
+    chaves = _chaves(m.group(1) if m else prompt)
+    return ", ".join(chaves) if chaves else "nenhuma"
+
+
+def classificar_lote(prompt: str) -> str:
+    itens = re.findall(r'^(\d+)\. Pergunta: .*\n\s+Resposta do aluno: (".*")$', prompt, re.M)
+    return json.dumps({
+        "classificacoes": [{"indice": int(i), "chaves": _chaves(json.loads(r))} for i, r in itens]
+    })
+
+
+def _acima_do_limite() -> bool:
+    if FAKE_RPS_LIMITE <= 0:
+        return False
+    with _lock:
+        agora = time.monotonic()
+        while _janela and agora - _janela[0] > 1.0:
+            _janela.pop(0)
+        if len(_janela) >= FAKE_RPS_LIMITE:
+            return True
+        _janela.append(agora)
+        return False
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    corpo = await request.json()
+    _stats["requisicoes"] += 1
+
+    if _acima_do_limite():
+        _stats["429"] += 1
+        return JSONResponse(
+            status_code=429,
+            headers={"retry-after": "1"},
+            content={"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+        )
+
+    if FAKE_TAXA_LENTA and random.random() < FAKE_TAXA_LENTA:
+        _stats["lentas"] += 1
+        latencia = FAKE_LENTA_MS
+    else:
+        latencia = FAKE_LATENCIA_MS + random.uniform(-FAKE_JITTER_MS, FAKE_JITTER_MS)
+    await asyncio.sleep(max(latencia, 0) / 1000.0)
+
+    if FAKE_TAXA_ERRO and random.random() < FAKE_TAXA_ERRO:
+        _stats["500"] += 1
+        return JSONResponse(status_code=500, content={"error": {"message": "fake server error", "type": "server_error"}})
+
+    prompt = corpo["messages"][-1]["content"]
+    _stats["200"] += 1
+    tokens = len(json.dumps([corpo["messages"], corpo.get("response_format")], ensure_ascii=False)) // 4
+    _stats["prompt_tokens"] += tokens
+    lote = (corpo.get("response_format") or {}).get("type") == "json_schema"
+    return {
+        "id": f"chatcmpl-fake-{_stats['requisicoes']}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": corpo.get("model", "fake"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": classificar_lote(prompt) if lote else classificar(prompt)},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": tokens, "completion_tokens": 0, "total_tokens": tokens},
+    }
+
+
+@app.get("/stats")
+def stats():
+    return dict(_stats)
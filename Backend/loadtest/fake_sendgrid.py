@@ -0,0 +1,97 @@
+# loadtest/fake_sendgrid.py
+"""
+Servidor falso da API v3 do SendGrid (POST /v3/mail/send): recebe os e-mails
+do /cronograma/email sem entregar nada.
+
+Confere o que o SendGrid real recusaria (remetente, destinatário, anexo em
+base64 que precisa ser um PDF) e conta e-mails, bytes e tamanho dos anexos.
+
+Comportamento configurável por variável de ambiente:
+  FAKE_SENDGRID_LATENCIA_MS  latência média por envio (padrão 150)
+  FAKE_SENDGRID_JITTER_MS    variação uniforme da latência (padrão 50)
+  FAKE_SENDGRID_TAXA_ERRO    fração de respostas 500 (padrão 0)
+  FAKE_SENDGRID_DIR          se definido, grava cada PDF recebido nesse diretório
+
+Uso (a partir de Backend/):
+    uvicorn loadtest.fake_sendgrid:app --port 8901
+    export SENDGRID_HOST=http://localhost:8901 SENDGRID_API_KEY=fake EMAIL_SENDER=cronograma@radioclub.com
+"""
+import os
+import time
+import base64
+import random
+import asyncio
+import binascii
+from collections import Counter
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+FAKE_SENDGRID_LATENCIA_MS = float(os.getenv("FAKE_SENDGRID_LATENCIA_MS", "150"))
+FAKE_SENDGRID_JITTER_MS = float(os.getenv("FAKE_SENDGRID_JITTER_MS", "50"))
+FAKE_SENDGRID_TAXA_ERRO = float(os.getenv("FAKE_SENDGRID_TAXA_ERRO", "0"))
+FAKE_SENDGRID_DIR = os.getenv("FAKE_SENDGRID_DIR")
+
+app = FastAPI(title="Fake SendGrid")
+
+_stats = Counter()
+
+
+def _erro(status: int, mensagem: str) -> JSONResponse:
+    _stats[str(status)] += 1
+    return JSONResponse(status_code=status, content={"errors": [{"message": mensagem, "field": None, "help": None}]})
+
+
+@app.post("/v3/mail/send")
+async def mail_send(request: Request):
+    corpo_bruto = await request.body()
+    _stats["requisicoes"] += 1
+    _stats["bytes_recebidos"] += len(corpo_bruto)
+
+    if not request.headers.get("authorization", "").startswith("Bearer "):
+        return _erro(401, "The provided authorization grant is invalid, expired, or revoked")
+
+    try:
+        corpo = await request.json()
+        remetente = corpo["from"]["email"]
+        destinatarios = [t["email"] for p in corpo["personalizations"] for t in p.get("to", [])]
+    except (ValueError, KeyError, TypeError):
+        return _erro(400, "Invalid request body")
+    if not remetente or not destinatarios:
+        return _erro(400, "The from and to email addresses are required")
+
+    anexos = []
+    for anexo in corpo.get("attachments", []):
+        try:
+            dados = base64.b64decode(anexo["content"], validate=True)
+        except (KeyError, binascii.Error):
+            return _erro(400, "The attachment content must be base64 encoded")
+        if anexo.get("type") == "application/pdf" and not dados.startswith(b"%PDF"):
+            return _erro(400, "The attachment is not a valid PDF")
+        anexos.append(dados)
+
+    latencia = FAKE_SENDGRID_LATENCIA_MS + random.uniform(-FAKE_SENDGRID_JITTER_MS, FAKE_SENDGRID_JITTER_MS)
+    await asyncio.sleep(max(latencia, 0) / 1000.0)
+
+    if FAKE_SENDGRID_TAXA_ERRO and random.random() < FAKE_SENDGRID_TAXA_ERRO:
+        return _erro(500, "fake server error")
+
+    _stats["202"] += 1
+    _stats["emails"] += len(destinatarios)
+    _stats["anexos"] += len(anexos)
+    _stats["bytes_anexos"] += sum(len(a) for a in anexos)
+    if FAKE_SENDGRID_DIR:
+        pasta = Path(FAKE_SENDGRID_DIR)
+        pasta.mkdir(parents=True, exist_ok=True)
+        for i, dados in enumerate(anexos):
+            (pasta / f"{time.time_ns()}_{destinatarios[0]}_{i}.pdf").write_bytes(dados)
+    return Response(status_code=202)
+
+
+@app.get("/stats")
+def stats():
+    s = dict(_stats)
+    if s.get("anexos"):
+        s["anexo_medio_bytes"] = s["bytes_anexos"] // s["anexos"]
+    return s
@@ -0,0 +1,137 @@
+# loadtest/formularios.py
+"""
+Formulários sintéticos R1–R4 com a cara dos envios reais do Tally: perguntas
+de cada nível (as mesmas de r1.py … r4.py e common.py), múltipla escolha com
+1 a 4 opções e respostas abertas curtas, com repetição (muitos alunos escrevem
+o mesmo "TC e RM") e um pouco de ruído (caixa, pontuação, sem acento).
+"""
+import random
+from typing import Any, Dict, List, Optional
+
+from core import PERGUNTA_CARGA
+
+# Distribuição aproximada de uma coorte
+NIVEIS = {"R1": 0.40, "R2": 0.25, "R3": 0.20, "R4 / medico radiologista": 0.15}
+
+CARGAS = ["Até 1h", "Entre 1h e 2h", "Entre 2h e 3h", "Entre 3h e 4h", "Mais de 4h"]
+SEMANAS = [4, 8, 12, 12, 16, 24]
+
+OBJETIVOS = [
+    "Aprofundar conhecimentos na minha subespecialidade atual",
+    "Me atualizar com as inovações e protocolos mais recentes",
+    "Praticar com casos reais e discussões clínicas",
+    "Melhorar interpretação de exames no dia a dia",
+    "Complementar minha formação como residente de radiologia",
+]
+TEMAS_EXTRAS = [
+    "Inglês médico", "Como montar sua workstation", "Finanças médicas", "Trabalhos científicos",
+    "Inteligência artificial", "Revalidação de diploma", "Prefiro focar no conteúdo técnico",
+]
+EXAMES_BASICOS = ["RX", "USG", "Densitometria", "Mamografia", "TC", "RM"]
+EXAMES = EXAMES_BASICOS + ["Doppler", "AngioTC e AngioRM", "Fluoroscopia", "Contrastados"]
+SUBESPECIALIDADES = [
+    "Neuro", "Tórax", "Abdome", "Mama", "Musculoesquelético", "Cabeça e Pescoço",
+    "Pediatria", "Gineco/Obstetrícia", "Urologia", "Oncologia",
+]
+
+# Respostas abertas: as primeiras de cada lista aparecem bem mais (cache do LLM)
+ABERTAS_EXAMES = [
+    "TC e RM", "RM", "USG", "Tomografia", "ressonância de crânio", "RX de tórax",
+    "Doppler venoso", "mamografia e usg de mama", "TC de abdome com contraste", "Nenhum por enquanto",
+    "angio tc", "PET-CT", "RM de joelho e ombro", "fluoroscopia",
+]
+ABERTAS_SUBESPECIALIDADES = [
+    "Neuro", "Abdome", "Tórax", "Musculoesquelético", "neurorradiologia", "mama",
+    "Cabeça e pescoço", "pediatria", "Gineco", "Ainda não sei", "oncologia e PET", "urologia",
+]
+ABERTAS_TEMAS = [
+    "AVC, pneumonia e abdome agudo", "Fraturas", "física", "Aneurisma", "AVC",
+    "tromboembolismo pulmonar", "apendicite, colecistite", "trauma", "nódulos de tireoide",
+]
+ABERTAS_TEMPO_FORMADO = ["Menos de 1 ano", "2 anos", "Há 5 anos", "mais de 10 anos", "Terminei esse ano"]
+
+PERGUNTAS = {
+    "R1": {
+        "fechadas": {
+            "Quais exames de imagem você já tem contato na prática ou vai ter nesse início de R1?": EXAMES_BASICOS,
+            "Quais subespecialidades você vai ter mais contato na Residência?": SUBESPECIALIDADES,
+        },
+        "abertas": {
+            "Quais exames de imagem sente mais dificuldade no momento?": ABERTAS_EXAMES,
+            "Quais temas você está vendo ou vai ver no primeiro ano de Residência? (ex: Pneumonia, AVC, Aneurisma, Abdome Agudo, Fraturas, física...)": ABERTAS_TEMAS,
+        },
+    },
+    "R2": {
+        "fechadas": {
+            "Quais exames você mais lauda/interpreta e tem contato no R2 atualmente?": EXAMES,
+            "Quais subespecialidades você mais tem contato na Residência?": SUBESPECIALIDADES,
+        },
+        "abertas": {
+            "Quais desses exames de imagem sente mais dificuldade no momento? Algo passou batido no R1?": ABERTAS_EXAMES,
+            "Tem alguma subespecialidade que quer aprofundar mais ou revisar agora no R2?": ABERTAS_SUBESPECIALIDADES,
+        },
+    },
+    "R3": {
+        "fechadas": {
+            "Quais exames você tem mais contato hoje na residência e gostaria de aprofundar?": EXAMES + ["PET-CT"],
+            "Quais subespecialidades você mais tem contato na Residência e gostaria de aprofundar?": SUBESPECIALIDADES,
+        },
+        "abertas": {
+            "Já decidiu qual área quer seguir no R4/Fellow? se sim, qual?": ABERTAS_SUBESPECIALIDADES,
+            "Tem algum exame de imagem ou subespecialidade específica que você quer dominar ou revisar agora no R3? Ou algo que você sente que ficou pra trás do R1/R2?": ABERTAS_EXAMES + ABERTAS_SUBESPECIALIDADES,
+        },
+    },
+    "R4 / medico radiologista": {
+        "fechadas": {
+            "Quais exames você realiza na sua prática atual e gostaria de revisar ou de se atualizar?": EXAMES + ["PET-CT", "HSG"],
+            "Em quais subespecialidades você tem mais interesse revisar ou se aprofundar agora?": SUBESPECIALIDADES,
+        },
+        "abertas": {
+            "Tem algum exame de imagem ou tema que gostaria de priorizar primeiro?": ABERTAS_EXAMES + ABERTAS_TEMAS,
+            "Há quanto tempo terminou a residência?": ABERTAS_TEMPO_FORMADO,
+        },
+    },
+}
+
+_SEM_ACENTO = str.maketrans("áàâãéêíóôõúçÁÉÍÓÚÇ", "aaaaeeiooouc" + "AEIOUC")
+
+
+def _escolher_aberta(rnd: random.Random, opcoes: List[str]) -> str:
+    # Zipf aproximado: a i-ésima opção sai com peso 1/(i+1)
+    texto = rnd.choices(opcoes, weights=[1 / (i + 1) for i in range(len(opcoes))])[0]
+    ruido = rnd.random()
+    if ruido < 0.15:
+        texto = texto.lower()
+    elif ruido < 0.25:
+        texto = texto.translate(_SEM_ACENTO)
+    elif ruido < 0.30:
+        texto += "."
+    return texto
+
+
+def gerar_formulario(rnd: random.Random, n: int, nivel: Optional[str] = None) -> Dict[str, Any]:
+    """Formulário do n-ésimo aluno sintético (e-mail e respondent_id únicos por n)."""
+    nivel = nivel or rnd.choices(list(NIVEIS), weights=list(NIVEIS.values()))[0]
+    perguntas = PERGUNTAS[nivel]
+
+    respostas: Dict[str, Any] = {
+        PERGUNTA_CARGA: rnd.choice(CARGAS),
+        "numero_semanas": rnd.choice(SEMANAS),
+        "Quais seus objetivos com o Curso Radioclub?": rnd.sample(OBJETIVOS, rnd.randint(1, 3)),
+    }
+    if rnd.random() < 0.6:
+        respostas["Além do conteúdo técnico, você se interessa por alguns desses outros temas?"] = \
+            rnd.sample(TEMAS_EXTRAS, rnd.randint(1, 2))
+    for pergunta, opcoes in perguntas["fechadas"].items():
+        respostas[pergunta] = rnd.sample(opcoes, rnd.randint(1, min(4, len(opcoes))))
+    for pergunta, opcoes in perguntas["abertas"].items():
+        if rnd.random() < 0.85:  # nem todo mundo responde as abertas
+            respostas[pergunta] = _escolher_aberta(rnd, opcoes)
+
+    return {
+        "name": f"Aluno Carga {n}",
+        "email": f"aluno{n}@loadtest.radioclub.com",
+        "nivel": nivel,
+        "respondent_id": f"loadtest-{n}",
+        "respostas": respostas,
+    }
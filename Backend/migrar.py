@@ -0,0 +1,76 @@
+# migrar.py
+"""
+Aplica as migrações de `migrations/` em ordem (arquivos .sql ou .py com `aplicar(conn)`).
+As já aplicadas ficam registradas na tabela `schema_migrations`. Um advisory lock
+do Postgres serializa execuções simultâneas (várias réplicas subindo juntas).
+
+Uso (a partir de Backend/):
+    python -m migrar
+"""
+import os
+import sys
+import importlib.util
+from pathlib import Path
+
+from dotenv import load_dotenv
+load_dotenv()
+from sqlalchemy import create_engine, text
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+# chave arbitrária do pg_advisory_lock, só precisa ser a mesma em todas as réplicas
+LOCK_MIGRACOES = 720_301
+
+
+def _aplicar_arquivo(conn, path: Path):
+    if path.suffix == ".sql":
+        conn.exec_driver_sql(path.read_text(encoding="utf-8"))
+    else:
+        spec = importlib.util.spec_from_file_location(f"migrations.{path.stem}", path)
+        modulo = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modulo)
+        modulo.aplicar(conn)
+
+
+def migrar(engine) -> list:
+    with engine.connect() as trava:
+        trava.execute(text("SELECT pg_advisory_lock(:k)"), {"k": LOCK_MIGRACOES})
+        try:
+            return _migrar(engine)
+        finally:
+            trava.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": LOCK_MIGRACOES})
+            trava.commit()
+
+
+def _migrar(engine) -> list:
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                versao TEXT PRIMARY KEY,
+                aplicada_em TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+        """))
+        aplicadas = {r[0] for r in conn.execute(text("SELECT versao FROM schema_migrations"))}
+
+    novas = []
+    arquivos = sorted(p for p in MIGRATIONS_DIR.iterdir() if p.suffix in (".sql", ".py"))
+    for path in arquivos:
+        if path.stem in aplicadas:
+            continue
+        print(f"▶️ Aplicando {path.name}")
+        # cada migração roda na sua própria transação
+        with engine.begin() as conn:
+            _aplicar_arquivo(conn, path)
+            conn.execute(text("INSERT INTO schema_migrations (versao) VALUES (:v)"), {"v": path.stem})
+        novas.append(path.stem)
+    return novas
+
+
+def main():
+    engine = create_engine(os.getenv("DB_URL"))
+    novas = migrar(engine)
+    print(f"✅ {len(novas)} migração(ões) aplicada(s)" if novas else "✅ Banco já está atualizado")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
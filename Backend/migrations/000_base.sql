@@ -0,0 +1,24 @@
+-- Esquema base (já existente em produção; aqui para bancos novos/descartáveis)
+CREATE EXTENSION IF NOT EXISTS pgcrypto;
+
+CREATE TABLE IF NOT EXISTS cronogramas (
+    id          UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name        TEXT,
+    email       TEXT NOT NULL,
+    nivel       TEXT NOT NULL,
+    respostas   JSONB,
+    cronograma  JSONB,
+    status      BOOLEAN NOT NULL DEFAULT FALSE,
+    modifier    TEXT
+);
+
+CREATE TABLE IF NOT EXISTS backup (
+    id          UUID,
+    name        TEXT,
+    email       TEXT,
+    nivel       TEXT,
+    respostas   JSONB,
+    cronograma  JSONB,
+    status      BOOLEAN,
+    modifier    TEXT
+);
@@ -0,0 +1,12 @@
+-- respostas/cronograma passam a ser JSONB (idempotente se já forem JSONB)
+ALTER TABLE cronogramas
+    ALTER COLUMN respostas TYPE JSONB USING respostas::jsonb,
+    ALTER COLUMN cronograma TYPE JSONB USING cronograma::jsonb;
+
+ALTER TABLE backup
+    ALTER COLUMN respostas TYPE JSONB USING respostas::jsonb,
+    ALTER COLUMN cronograma TYPE JSONB USING cronograma::jsonb;
+
+-- Consultas por aula/módulo: cronograma @> '{"weeks": [{"lessons": [{"id": "AUL-0001"}]}]}'
+CREATE INDEX IF NOT EXISTS idx_cronogramas_cronograma_aulas
+    ON cronogramas USING GIN (cronograma jsonb_path_ops);
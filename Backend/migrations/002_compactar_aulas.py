@@ -0,0 +1,29 @@
+# migrations/002_compactar_aulas.py
+"""Regrava os cronogramas existentes no formato compacto (aulas como referência ao catálogo)."""
+from sqlalchemy import text
+
+from armazenamento import carregar_json, serializar_cronograma
+
+LOTE = 500
+
+
+def aplicar(conn):
+    ids = [r[0] for r in conn.execute(text("SELECT id FROM cronogramas ORDER BY id"))]
+    update_query = text("""
+        UPDATE cronogramas
+        SET cronograma = CAST(:cronograma AS jsonb)
+        WHERE id = :id
+    """)
+
+    for i in range(0, len(ids), LOTE):
+        rows = conn.execute(
+            text("SELECT id, cronograma FROM cronogramas WHERE id = ANY(:ids)"),
+            {"ids": ids[i:i + LOTE]},
+        ).fetchall()
+        novos = [
+            {"id": id_, "cronograma": serializar_cronograma(carregar_json(cron))}
+            for id_, cron in rows
+        ]
+        if novos:
+            conn.execute(update_query, novos)
+        print(f"  {min(i + LOTE, len(ids))}/{len(ids)} cronogramas compactados")
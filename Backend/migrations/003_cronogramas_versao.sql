@@ -0,0 +1,2 @@
+-- Versão para edição otimista (/cronograma/patch); incrementada a cada escrita
+ALTER TABLE cronogramas ADD COLUMN IF NOT EXISTS versao INTEGER NOT NULL DEFAULT 0;
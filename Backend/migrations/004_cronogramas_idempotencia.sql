@@ -0,0 +1,4 @@
+-- Chave de idempotência do envio (respondent_id ou hash de email/nivel/respostas).
+-- Linhas antigas ficam com NULL (UNIQUE aceita vários NULLs).
+ALTER TABLE cronogramas ADD COLUMN IF NOT EXISTS chave_idempotencia TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS cronogramas_chave_idempotencia_key ON cronogramas (chave_idempotencia);
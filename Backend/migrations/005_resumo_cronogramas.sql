@@ -0,0 +1,89 @@
+-- Resumo para o painel (/cronograma/estatisticas): uma linha por (nivel, status),
+-- mantida por triggers de statement em cronogramas. Ler o resumo custa o mesmo
+-- com 100 ou 1 milhão de cronogramas.
+CREATE TABLE IF NOT EXISTS resumo_cronogramas (
+    nivel     TEXT    NOT NULL,
+    status    BOOLEAN NOT NULL,
+    total     BIGINT  NOT NULL DEFAULT 0,
+    editados  BIGINT  NOT NULL DEFAULT 0,  -- modifier preenchido
+    semanas   BIGINT  NOT NULL DEFAULT 0,  -- soma das semanas (sem a remaining)
+    minutos   BIGINT  NOT NULL DEFAULT 0,  -- soma de summary.total_minutes
+    PRIMARY KEY (nivel, status)
+);
+
+-- Semanas e minutos de um cronograma; JSON fora do formato conta 0 (nunca derruba a escrita)
+CREATE OR REPLACE FUNCTION cronograma_semanas(c JSONB) RETURNS BIGINT
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE WHEN jsonb_typeof(c->'weeks') = 'array' THEN (
+        SELECT count(*) FROM jsonb_array_elements(c->'weeks') w
+        WHERE jsonb_typeof(w) = 'object' AND w->>'week' IS DISTINCT FROM 'remaining'
+    ) ELSE 0 END
+$$;
+
+CREATE OR REPLACE FUNCTION cronograma_minutos(c JSONB) RETURNS BIGINT
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE WHEN jsonb_typeof(c->'summary'->'total_minutes') = 'number'
+        THEN round((c->'summary'->>'total_minutes')::numeric)::bigint ELSE 0 END
+$$;
+
+-- Soma (INSERT), subtrai (DELETE) ou os dois (UPDATE) as linhas afetadas pelo statement
+CREATE OR REPLACE FUNCTION resumo_cronogramas_atualizar() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO resumo_cronogramas AS r (nivel, status, total, editados, semanas, minutos)
+        SELECT nivel, status, count(*), count(modifier),
+               sum(cronograma_semanas(cronograma)), sum(cronograma_minutos(cronograma))
+        FROM novas GROUP BY nivel, status ORDER BY nivel, status
+        ON CONFLICT (nivel, status) DO UPDATE SET
+            total    = r.total    + EXCLUDED.total,
+            editados = r.editados + EXCLUDED.editados,
+            semanas  = r.semanas  + EXCLUDED.semanas,
+            minutos  = r.minutos  + EXCLUDED.minutos;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        INSERT INTO resumo_cronogramas AS r (nivel, status, total, editados, semanas, minutos)
+        SELECT nivel, status, -count(*), -count(modifier),
+               -sum(cronograma_semanas(cronograma)), -sum(cronograma_minutos(cronograma))
+        FROM antigas GROUP BY nivel, status ORDER BY nivel, status
+        ON CONFLICT (nivel, status) DO UPDATE SET
+            total    = r.total    + EXCLUDED.total,
+            editados = r.editados + EXCLUDED.editados,
+            semanas  = r.semanas  + EXCLUDED.semanas,
+            minutos  = r.minutos  + EXCLUDED.minutos;
+    END IF;
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION resumo_cronogramas_zerar() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM resumo_cronogramas;
+    RETURN NULL;
+END $$;
+
+-- Sem escritas em cronogramas enquanto os triggers entram e o resumo é preenchido
+LOCK TABLE cronogramas IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS resumo_cronogramas_ins ON cronogramas;
+DROP TRIGGER IF EXISTS resumo_cronogramas_upd ON cronogramas;
+DROP TRIGGER IF EXISTS resumo_cronogramas_del ON cronogramas;
+DROP TRIGGER IF EXISTS resumo_cronogramas_trunc ON cronogramas;
+
+CREATE TRIGGER resumo_cronogramas_ins AFTER INSERT ON cronogramas
+    REFERENCING NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION resumo_cronogramas_atualizar();
+CREATE TRIGGER resumo_cronogramas_upd AFTER UPDATE ON cronogramas
+    REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION resumo_cronogramas_atualizar();
+CREATE TRIGGER resumo_cronogramas_del AFTER DELETE ON cronogramas
+    REFERENCING OLD TABLE AS antigas
+    FOR EACH STATEMENT EXECUTE FUNCTION resumo_cronogramas_atualizar();
+CREATE TRIGGER resumo_cronogramas_trunc AFTER TRUNCATE ON cronogramas
+    FOR EACH STATEMENT EXECUTE FUNCTION resumo_cronogramas_zerar();
+
+DELETE FROM resumo_cronogramas;
+INSERT INTO resumo_cronogramas (nivel, status, total, editados, semanas, minutos)
+SELECT nivel, status, count(*), count(modifier),
+       sum(cronograma_semanas(cronograma)), sum(cronograma_minutos(cronograma))
+FROM cronogramas GROUP BY nivel, status;
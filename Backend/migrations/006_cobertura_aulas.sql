@@ -0,0 +1,91 @@
+-- Cobertura do catálogo (/cronograma/cobertura): quantas vezes cada aula caiu em
+-- cada semana (0 = remaining), por nível. Mantida por triggers de statement em
+-- cronogramas; cada escrita aplica só a diferença entre as aulas antigas e novas.
+-- Aulas sem id (criadas à mão no painel) não entram.
+CREATE TABLE IF NOT EXISTS cobertura_aulas (
+    nivel    TEXT    NOT NULL,
+    aula_id  TEXT    NOT NULL,
+    semana   INTEGER NOT NULL,  -- 0 = remaining
+    vezes    BIGINT  NOT NULL DEFAULT 0,
+    PRIMARY KEY (nivel, aula_id, semana)
+);
+
+-- (aula_id, semana) de cada aula de um cronograma; JSON fora do formato é ignorado
+CREATE OR REPLACE FUNCTION cronograma_aulas(c JSONB)
+RETURNS TABLE (aula_id TEXT, semana INTEGER)
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT l->>'id',
+           CASE WHEN w->>'week' = 'remaining' THEN 0 ELSE (w->>'week')::integer END
+    FROM jsonb_array_elements(CASE WHEN jsonb_typeof(c->'weeks') = 'array' THEN c->'weeks' ELSE '[]' END) w,
+         jsonb_array_elements(CASE WHEN jsonb_typeof(w->'lessons') = 'array' THEN w->'lessons' ELSE '[]' END) l
+    WHERE jsonb_typeof(l) = 'object' AND l->>'id' IS NOT NULL
+      AND (w->>'week' = 'remaining' OR w->>'week' ~ '^[0-9]{1,6}$')
+$$;
+
+CREATE OR REPLACE FUNCTION cobertura_aulas_atualizar() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO cobertura_aulas AS c (nivel, aula_id, semana, vezes)
+        SELECT n.nivel, a.aula_id, a.semana, count(*)
+        FROM novas n, cronograma_aulas(n.cronograma) a
+        GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+        ON CONFLICT (nivel, aula_id, semana) DO UPDATE SET vezes = c.vezes + EXCLUDED.vezes;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO cobertura_aulas AS c (nivel, aula_id, semana, vezes)
+        SELECT o.nivel, a.aula_id, a.semana, -count(*)
+        FROM antigas o, cronograma_aulas(o.cronograma) a
+        GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+        ON CONFLICT (nivel, aula_id, semana) DO UPDATE SET vezes = c.vezes + EXCLUDED.vezes;
+    ELSE
+        -- só o saldo das linhas em que cronograma ou nível mudaram: marcar como
+        -- enviado não mexe na cobertura, e um /patch que move uma aula mexe em
+        -- duas linhas, não no cronograma inteiro
+        INSERT INTO cobertura_aulas AS c (nivel, aula_id, semana, vezes)
+        SELECT x.nivel, x.aula_id, x.semana, sum(x.d)
+        FROM (
+            SELECT n.nivel, n.cronograma AS novo, o.nivel AS nivel_antigo, o.cronograma AS antigo
+            FROM novas n JOIN antigas o USING (id)
+            WHERE n.cronograma IS DISTINCT FROM o.cronograma OR n.nivel IS DISTINCT FROM o.nivel
+        ) m, LATERAL (
+            SELECT m.nivel, a.aula_id, a.semana, 1 AS d FROM cronograma_aulas(m.novo) a
+            UNION ALL
+            SELECT m.nivel_antigo, a.aula_id, a.semana, -1 FROM cronograma_aulas(m.antigo) a
+        ) x
+        GROUP BY 1, 2, 3 HAVING sum(x.d) <> 0 ORDER BY 1, 2, 3
+        ON CONFLICT (nivel, aula_id, semana) DO UPDATE SET vezes = c.vezes + EXCLUDED.vezes;
+    END IF;
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION cobertura_aulas_zerar() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM cobertura_aulas;
+    RETURN NULL;
+END $$;
+
+LOCK TABLE cronogramas IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS cobertura_aulas_ins ON cronogramas;
+DROP TRIGGER IF EXISTS cobertura_aulas_upd ON cronogramas;
+DROP TRIGGER IF EXISTS cobertura_aulas_del ON cronogramas;
+DROP TRIGGER IF EXISTS cobertura_aulas_trunc ON cronogramas;
+
+CREATE TRIGGER cobertura_aulas_ins AFTER INSERT ON cronogramas
+    REFERENCING NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION cobertura_aulas_atualizar();
+CREATE TRIGGER cobertura_aulas_upd AFTER UPDATE ON cronogramas
+    REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION cobertura_aulas_atualizar();
+CREATE TRIGGER cobertura_aulas_del AFTER DELETE ON cronogramas
+    REFERENCING OLD TABLE AS antigas
+    FOR EACH STATEMENT EXECUTE FUNCTION cobertura_aulas_atualizar();
+CREATE TRIGGER cobertura_aulas_trunc AFTER TRUNCATE ON cronogramas
+    FOR EACH STATEMENT EXECUTE FUNCTION cobertura_aulas_zerar();
+
+DELETE FROM cobertura_aulas;
+INSERT INTO cobertura_aulas (nivel, aula_id, semana, vezes)
+SELECT c.nivel, a.aula_id, a.semana, count(*)
+FROM cronogramas c, cronograma_aulas(c.cronograma) a
+GROUP BY 1, 2, 3;
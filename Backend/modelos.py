@@ -0,0 +1,74 @@
+# modelos.py
+"""
+Formato do cronograma que chega de fora (painel em /cronograma/update, download
+em /cronograma/pdf), validado pelo Pydantic numa passada só, direto dos bytes
+do JSON (`validar_cronograma_json`).
+
+Os tipos são TypedDicts: o validador compilado devolve dicts comuns, no mesmo
+formato do que vem do banco, então o resto do caminho (PDF, armazenamento) não
+muda e não há objeto intermediário para converter de volta. Campos
+desconhecidos são mantidos (aulas editadas no painel podem ter mais coisa), mas
+módulo, tema e duração de cada aula são obrigatórios e tipados, e o tamanho é
+limitado.
+"""
+import os
+from typing import Any, Dict, List, Literal, Union
+
+from typing_extensions import Annotated, NotRequired, TypedDict
+from pydantic import AfterValidator, ConfigDict, Field, TypeAdapter, with_config
+
+# 104 semanas (limite do replanejamento) + a "remaining"
+CRONOGRAMA_MAX_SEMANAS = int(os.getenv("CRONOGRAMA_MAX_SEMANAS", "105"))
+CRONOGRAMA_MAX_AULAS_SEMANA = int(os.getenv("CRONOGRAMA_MAX_AULAS_SEMANA", "1000"))
+CRONOGRAMA_MAX_AULAS = int(os.getenv("CRONOGRAMA_MAX_AULAS", "5000"))
+TEXTO_MAX = 500
+
+
+@with_config(ConfigDict(extra="allow"))
+class Aula(TypedDict):
+    id: NotRequired[Annotated[str, Field(max_length=64)]]
+    module_name: Annotated[str, Field(max_length=TEXTO_MAX)]
+    lesson_theme: Annotated[str, Field(max_length=TEXTO_MAX)]
+    duration_min: Annotated[int, Field(ge=0, le=24 * 60)]
+    peso: NotRequired[float]
+
+
+@with_config(ConfigDict(extra="allow"))
+class Semana(TypedDict):
+    week: Union[int, Literal["remaining"]]
+    lessons: Annotated[List[Aula], Field(max_length=CRONOGRAMA_MAX_AULAS_SEMANA)]
+
+
+@with_config(ConfigDict(extra="allow"))
+class Resumo(TypedDict):
+    total_minutes: Annotated[int, Field(ge=0)]
+    minutes_per_week: Annotated[List[int], Field(max_length=CRONOGRAMA_MAX_SEMANAS)]
+
+
+@with_config(ConfigDict(extra="allow"))
+class Cronograma(TypedDict):
+    weeks: Annotated[List[Semana], Field(max_length=CRONOGRAMA_MAX_SEMANAS)]
+    summary: NotRequired[Resumo]
+    params: NotRequired[Dict[str, Any]]
+
+
+def _limitar_aulas(cronograma: Cronograma) -> Cronograma:
+    total = sum(len(w["lessons"]) for w in cronograma["weeks"])
+    if total > CRONOGRAMA_MAX_AULAS:
+        raise ValueError(f"Cronograma com {total} aulas (máximo {CRONOGRAMA_MAX_AULAS})")
+    return cronograma
+
+
+# Compilados uma vez no import
+_CRONOGRAMA = TypeAdapter(Annotated[Cronograma, AfterValidator(_limitar_aulas)])
+_AULA = TypeAdapter(Aula)
+
+
+def validar_cronograma_json(corpo: Union[str, bytes]) -> Cronograma:
+    """JSON -> Cronograma validado; levanta pydantic.ValidationError."""
+    return _CRONOGRAMA.validate_json(corpo)
+
+
+def validar_aula(aula: Dict[str, Any]) -> Aula:
+    """Uma aula avulsa (ex.: operação 'add' do /cronograma/patch); levanta pydantic.ValidationError."""
+    return _AULA.validate_python(aula)
@@ -0,0 +1,124 @@
+# otimizador.py
+"""
+Modo "ótimo" de montagem das semanas: em vez do preenchimento guloso
+(lib.gerar_cronograma), cada semana é uma mochila 0/1 resolvida por programação
+dinâmica sobre os minutos disponíveis, maximizando a soma de `peso`.
+
+Segue as mesmas regras do guloso, só arruma melhor as aulas dentro delas:
+
+  - capacidade da semana = frac_limite_max × tempo_max_semana (o guloso para de
+    encher ao passar desse ponto);
+  - depois de tempo_min_semana só entram aulas com peso >= peso_min_intermediario:
+    a mochila escolhe entre essas, e as de peso menor só completam a semana até
+    o mínimo, em ordem de peso, como no guloso.
+
+Roda com orçamento de tempo por requisição: o guloso é calculado primeiro (é
+barato) e, se o orçamento estourar ou o resultado não for melhor, é ele que volta.
+"""
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from lib import gerar_cronograma
+
+SOLVER_ORCAMENTO_MS = float(os.getenv("SOLVER_ORCAMENTO_MS", "200"))
+
+# De quantas em quantas aulas o DP confere o relógio
+_CHECAR_A_CADA = 16
+
+
+class OrcamentoEsgotado(Exception):
+    pass
+
+
+def _mochila(aulas: List[Dict[str, Any]], capacidade: int, prazo: float) -> List[int]:
+    """Índices (em `aulas`) do subconjunto de maior peso com soma de minutos <= capacidade."""
+    melhor = [0.0] * (capacidade + 1)  # melhor[c]: maior peso usando até c minutos
+    escolhas: List[Tuple[int, List[bool]]] = []
+
+    for n, aula in enumerate(aulas):
+        if n % _CHECAR_A_CADA == 0 and time.perf_counter() > prazo:
+            raise OrcamentoEsgotado()
+
+        dur, peso = aula["duration_min"], aula["peso"]
+        candidatos = [v + peso for v in melhor[:capacidade - dur + 1]]
+        atuais = melhor[dur:]
+        pega = [c > a for c, a in zip(candidatos, atuais)]
+        melhor[dur:] = [c if p else a for c, p, a in zip(candidatos, pega, atuais)]
+        escolhas.append((dur, pega))
+
+    # reconstrução de trás pra frente
+    selecionadas = []
+    c = capacidade
+    for n in range(len(aulas) - 1, -1, -1):
+        dur, pega = escolhas[n]
+        if c >= dur and pega[c - dur]:
+            selecionadas.append(n)
+            c -= dur
+    selecionadas.reverse()
+    return selecionadas
+
+
+def _peso_total(semanas: List[List[Dict[str, Any]]]) -> float:
+    return sum(a["peso"] for s in semanas for a in s)
+
+
+def gerar_cronograma_otimo(
+    pesos_aulas: List[Dict[str, Any]],
+    tempo_max_semana: int,
+    numero_semanas: int,
+    tempo_min_semana: int = 0,
+    frac_limite_max: float = 0.90,
+    peso_min_intermediario: float = 3.5,
+    orcamento_ms: Optional[float] = None,
+    limite_restantes: Optional[int] = None,
+):
+    """Mesma assinatura/retorno de lib.gerar_cronograma: (semanas, aulas_restantes)."""
+    orcamento_ms = SOLVER_ORCAMENTO_MS if orcamento_ms is None else orcamento_ms
+    prazo = time.perf_counter() + orcamento_ms / 1000.0
+
+    guloso = gerar_cronograma(
+        pesos_aulas, tempo_max_semana, numero_semanas, tempo_min_semana,
+        frac_limite_max, peso_min_intermediario, limite_restantes=limite_restantes,
+    )
+
+    capacidade = int(tempo_max_semana * frac_limite_max)
+    # aulas com peso <= 0 nunca aumentam o total; ordem por peso deixa a reconstrução estável
+    disponiveis = sorted(
+        (a for a in pesos_aulas if a["peso"] > 0 and a["duration_min"] <= capacidade),
+        key=lambda a: -a["peso"],
+    )
+
+    semanas: List[List[Dict[str, Any]]] = []
+    try:
+        for _ in range(numero_semanas):
+            altas = [a for a in disponiveis if a["peso"] >= peso_min_intermediario]
+            escolhidas = [altas[i] for i in _mochila(altas, capacidade, prazo)] if altas else []
+
+            # abaixo do corte: só até o mínimo da semana, em ordem de peso (regra do guloso)
+            total = sum(a["duration_min"] for a in escolhidas)
+            for aula in disponiveis:
+                if total >= tempo_min_semana:
+                    break
+                if aula["peso"] < peso_min_intermediario and total + aula["duration_min"] <= capacidade:
+                    escolhidas.append(aula)
+                    total += aula["duration_min"]
+
+            usadas = {id(a) for a in escolhidas}
+            semanas.append([a for a in disponiveis if id(a) in usadas])
+            disponiveis = [a for a in disponiveis if id(a) not in usadas]
+    except OrcamentoEsgotado:
+        return guloso
+
+    # empate (a menos de arredondamento) fica com o guloso
+    if _peso_total(semanas) <= _peso_total(guloso[0]) + 1e-6:
+        return guloso
+
+    if limite_restantes is not None and limite_restantes <= 0:
+        return semanas, []
+
+    usadas = {id(a) for s in semanas for a in s}
+    restantes = sorted((a for a in pesos_aulas if id(a) not in usadas), key=lambda a: -a["peso"])
+    if limite_restantes is not None:
+        restantes = restantes[:limite_restantes]
+    return semanas, restantes
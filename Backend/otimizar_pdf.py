@@ -0,0 +1,275 @@
+# otimizar_pdf.py
+"""
+Pós-processamento do PDF do cronograma (capa + miolo + contracapa) para
+diminuir o download e o anexo do e-mail (o SendGrid recebe o arquivo em
+base64, ~33% maior que o binário).
+
+- Imagens de 8 bits: o Flate é refeito no nível máximo, sem perdas. Com
+  PDF_PALETA_CORES > 0 (opcional, com perdas), imagens RGB também podem virar
+  paleta (Indexed) de até essa quantidade de cores, sem dithering, quando isso
+  fica menor.
+- Imagens idênticas (mesmos bytes e parâmetros) viram um único XObject,
+  também entre capa, miolo e contracapa: os três readers que vão para o mesmo
+  PdfWriter compartilham o mapa assinatura -> objeto (`otimizar_leitor`).
+- Content streams sem filtro são comprimidos.
+
+As fontes já saem em subset (ReportLab no miolo; capa e contracapa vêm com
+prefixo "XXXXXX+"), e o slogan já é um único XObject referenciado em todas as
+páginas — `fontes_sem_subset()` e o benchmark conferem isso.
+
+Capa e contracapa são otimizadas uma vez por processo (`pdf_estatico`); o
+resultado do slogan fica em cache, então o custo por render é pequeno.
+"""
+import os
+import zlib
+import hashlib
+from functools import lru_cache
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import (
+    ArrayObject, ByteStringObject, DecodedStreamObject, NameObject, NumberObject, StreamObject,
+)
+
+# ===== CONFIG =====
+PDF_OTIMIZAR = os.getenv("PDF_OTIMIZAR", "1") != "0"
+PDF_PALETA_CORES = int(os.getenv("PDF_PALETA_CORES", "0"))   # 0 = sem paleta (sem perdas)
+
+_CANAIS = {"/DeviceRGB": 3, "/DeviceGray": 1}
+
+
+def _canais(espaco_cor: Any) -> Optional[int]:
+    """Número de componentes de /DeviceRGB, /DeviceGray ou [/ICCBased <</N n>>]; None para o resto."""
+    espaco_cor = espaco_cor.get_object() if espaco_cor is not None else None
+    if isinstance(espaco_cor, str):
+        return _CANAIS.get(espaco_cor)
+    if isinstance(espaco_cor, list) and len(espaco_cor) == 2 and espaco_cor[0] == "/ICCBased":
+        n = espaco_cor[1].get_object().get("/N")
+        return int(n) if n in (1, 3) else None
+    return None
+
+
+def _filtros(stream) -> Tuple[str, ...]:
+    f = stream.get("/Filter")
+    if f is None:
+        return ()
+    f = f.get_object()
+    return tuple(str(x) for x in f) if isinstance(f, list) else (str(f),)
+
+
+@lru_cache(maxsize=64)
+def _recomprimir(dados: bytes, largura: int, altura: int, canais: int, cores: int) -> Tuple[bytes, Optional[bytes]]:
+    """(stream Flate, paleta RGB ou None) — a menor das opções sem paleta e com paleta."""
+    melhor, paleta = zlib.compress(dados, 9), None
+    if canais == 3 and cores > 0:
+        img = Image.frombytes("RGB", (largura, altura), dados)
+        q = img.quantize(colors=cores, dither=Image.Dither.NONE)
+        usadas = max(q.getdata()) + 1
+        indexada = zlib.compress(q.tobytes(), 9)
+        if len(indexada) + 3 * usadas < len(melhor):
+            melhor, paleta = indexada, bytes(q.getpalette()[:3 * usadas])
+    return melhor, paleta
+
+
+def _serializado(stream) -> int:
+    """Bytes do objeto como vai para o arquivo (dicionário + stream codificado)."""
+    buf = BytesIO()
+    stream.write_to_stream(buf, None)
+    return buf.tell()
+
+
+def _otimizar_imagem(stream):
+    """
+    Devolve a imagem recomprimida (um stream novo, que passa a responder pelo
+    mesmo objeto do reader) ou a própria `stream` se não der para ganhar nada.
+    """
+    if stream.get("/BitsPerComponent") != 8 or "/Decode" in stream or "/ImageMask" in stream:
+        return stream
+    filtros = _filtros(stream)
+    if any(f not in ("/FlateDecode", "/ASCII85Decode") for f in filtros):
+        return stream  # JPEG, JBIG2 etc. ficam como estão
+    canais = _canais(stream.get("/ColorSpace"))
+    ref = getattr(stream, "indirect_reference", None)
+    if canais is None or ref is None:
+        return stream
+
+    largura, altura = int(stream["/Width"]), int(stream["/Height"])
+    dados = stream.get_data()
+    if len(dados) != largura * altura * canais:
+        return stream
+
+    novo, paleta = _recomprimir(dados, largura, altura, canais, PDF_PALETA_CORES)
+
+    # o PyPDF2 não regrava um stream já codificado (set_data só existe no
+    # decodificado): o novo leva os bytes já em Flate e o /Filter correspondente
+    otimizada = DecodedStreamObject()
+    for k, v in stream.items():
+        if k not in ("/Length", "/Filter", "/DecodeParms"):
+            otimizada[NameObject(k)] = v
+    otimizada.set_data(novo)
+    otimizada[NameObject("/Filter")] = NameObject("/FlateDecode")
+    if paleta is not None:
+        otimizada[NameObject("/ColorSpace")] = ArrayObject([
+            NameObject("/Indexed"), NameObject("/DeviceRGB"),
+            NumberObject(len(paleta) // 3 - 1), ByteStringObject(paleta),
+        ])
+    # a original pode ter vindo com predictor (PNG) e ficar menor que o Flate puro
+    if _serializado(otimizada) >= _serializado(stream):
+        return stream
+    reader = ref.pdf
+    reader.resolved_objects.pop((ref.generation, ref.idnum), None)
+    return reader.cache_indirect_object(ref.generation, ref.idnum, otimizada)
+
+
+def _canonico(valor) -> str:
+    """
+    Parâmetro da imagem sem depender do reader: referências são resolvidas (o
+    repr de um IndirectObject leva o id() do reader) e streams (perfil ICC,
+    paleta) entram pelo digest dos bytes.
+    """
+    if hasattr(valor, "get_object"):
+        valor = valor.get_object()
+    if isinstance(valor, StreamObject):
+        dados = hashlib.sha256(valor.get_data()).hexdigest()
+        return f"stream({dados};{_canonico({k: v for k, v in valor.items() if k not in ('/Length', '/Filter', '/DecodeParms')})})"
+    if isinstance(valor, dict):
+        return "{" + ";".join(f"{k}={_canonico(valor[k])}" for k in sorted(valor.keys())) + "}"
+    if isinstance(valor, list):
+        return "[" + ",".join(_canonico(v) for v in valor) + "]"
+    return repr(valor)
+
+
+def _assinatura(stream, assinaturas: Dict[int, str]) -> str:
+    """Digest dos bytes + parâmetros da imagem (a /SMask entra pela assinatura dela)."""
+    h = hashlib.sha256(stream.get_data())
+    for k in sorted(stream.keys()):
+        if k in ("/Length", "/SMask", "/Filter", "/DecodeParms"):
+            continue
+        h.update(f"{k}={_canonico(stream.raw_get(k))};".encode())
+    smask = stream.get("/SMask")
+    if smask is not None:
+        h.update((assinaturas.get(smask.idnum) or _assinatura(smask.get_object(), assinaturas)).encode())
+    return h.hexdigest()
+
+
+def _otimizar_recursos(recursos, vistos: Dict[int, Any], por_assinatura: Dict[str, Any], assinaturas: Dict[int, str]):
+    recursos = recursos.get_object() if recursos is not None else None
+    if not recursos or "/XObject" not in recursos:
+        return
+    xobjects = recursos["/XObject"].get_object()
+    for nome in list(xobjects.keys()):
+        ref = xobjects.raw_get(nome)
+        idnum = getattr(ref, "idnum", None)
+        if idnum is None:
+            continue
+        if idnum in vistos:
+            xobjects[NameObject(nome)] = vistos[idnum]
+            continue
+
+        obj = ref.get_object()
+        subtipo = obj.get("/Subtype")
+        if subtipo == "/Form":
+            vistos[idnum] = ref
+            _otimizar_recursos(obj.get("/Resources"), vistos, por_assinatura, assinaturas)
+            continue
+        if subtipo != "/Image":
+            continue
+
+        assinatura = assinaturas.get(idnum)
+        if assinatura is None:
+            smask = obj.get("/SMask")
+            if smask is not None and smask.idnum not in assinaturas:
+                assinaturas[smask.idnum] = _assinatura(_otimizar_imagem(smask.get_object()), assinaturas)
+            obj = _otimizar_imagem(obj)
+            assinatura = _assinatura(obj, assinaturas)
+            assinaturas[idnum] = assinatura
+
+        # a primeira ocorrência de cada imagem fica; as cópias passam a apontar para ela
+        vistos[idnum] = por_assinatura.setdefault(assinatura, ref)
+        xobjects[NameObject(nome)] = vistos[idnum]
+
+
+def otimizar_leitor(
+    reader: PdfReader,
+    por_assinatura: Optional[Dict[str, Any]] = None,
+    conhecidas: Optional[Dict[int, str]] = None,
+) -> PdfReader:
+    """
+    Otimiza as imagens e deduplica os XObjects das páginas, no próprio reader (antes do add_page).
+
+    `por_assinatura` é o mapa assinatura -> referência; passe o mesmo dict para
+    todos os readers de um PdfWriter e as cópias entre documentos apontam para
+    a primeira (o PdfWriter clona referências de outro reader normalmente).
+    `conhecidas` são assinaturas por idnum de um PDF já otimizado
+    (`assinaturas_estatico`): essas imagens não são decodificadas de novo.
+    """
+    vistos: Dict[int, Any] = {}
+    por_assinatura = {} if por_assinatura is None else por_assinatura
+    assinaturas: Dict[int, str] = dict(conhecidas or {})
+    for pagina in reader.pages:
+        _otimizar_recursos(pagina.get("/Resources"), vistos, por_assinatura, assinaturas)
+    return reader
+
+
+@lru_cache(maxsize=None)
+def assinaturas_estatico(caminho: str) -> Dict[int, str]:
+    """Assinatura de cada imagem de `pdf_estatico(caminho)` por idnum, uma vez por processo."""
+    reader = PdfReader(BytesIO(pdf_estatico(caminho)))
+    vistos: Dict[int, Any] = {}
+    assinaturas: Dict[int, str] = {}
+    for pagina in reader.pages:
+        _otimizar_recursos(pagina.get("/Resources"), vistos, {}, assinaturas)
+    return assinaturas
+
+
+def comprimir_conteudo(pagina):
+    """Comprime o content stream só se ainda não tiver filtro (reparsear um stream já comprimido custa caro)."""
+    conteudo = pagina.get("/Contents")
+    if conteudo is None:
+        return
+    conteudo = conteudo.get_object()
+    streams = conteudo if isinstance(conteudo, list) else [conteudo]
+    if any("/Filter" not in s.get_object() for s in streams):
+        pagina.compress_content_streams()
+
+
+@lru_cache(maxsize=None)
+def pdf_estatico(caminho: str) -> bytes:
+    """Capa/contracapa otimizadas, uma vez por processo."""
+    reader = otimizar_leitor(PdfReader(caminho))
+    writer = PdfWriter()
+    for p in reader.pages:
+        writer.add_page(p)
+    for p in writer.pages:
+        comprimir_conteudo(p)
+    out = BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def fontes_sem_subset(reader: PdfReader) -> List[str]:
+    """BaseFont das fontes embutidas sem o prefixo de subset "XXXXXX+" (deveria vir vazio)."""
+    faltando = set()
+    for pagina in reader.pages:
+        recursos = pagina.get("/Resources")
+        fontes = recursos.get_object().get("/Font") if recursos is not None else None
+        for fonte in (fontes.get_object().values() if fontes else []):
+            fonte = fonte.get_object()
+            descendentes = [d.get_object() for d in fonte.get("/DescendantFonts", [])] or [fonte]
+            for d in descendentes:
+                descritor = d.get("/FontDescriptor")
+                if descritor is None:
+                    continue  # fontes padrão (Helvetica etc.) não são embutidas
+                descritor = descritor.get_object()
+                if not any(k in descritor for k in ("/FontFile", "/FontFile2", "/FontFile3")):
+                    continue
+                nome = str(d.get("/BaseFont", ""))
+                if len(nome) < 8 or nome[7] != "+" or not nome[1:7].isupper():
+                    faltando.add(nome)
+    return sorted(faltando)
+
+
+def tamanho_base64(n: int) -> int:
+    return 4 * ((n + 2) // 3)
@@ -0,0 +1,187 @@
+# pdf_cache.py
+"""
+PDFs pré-renderizados em segundo plano.
+
+O PDF depende só das semanas (módulo, tema e duração de cada aula), então cada
+artefato é identificado por um digest desse conteúdo + PDF_LAYOUT_VERSAO
+(aumente a versão ao mudar o layout de lib.gerar_pdf_bytes: os arquivos antigos
+deixam de ser usados e saem pela rotação).
+
+- `agendar_pdf()` é chamado quando um cronograma é salvo ou editado: o render vai
+  para um pool de processos separado. A fila tem limite (PDF_FILA_MAX); cheia, o
+  pedido é descartado e o PDF sai sob demanda.
+- `obter_pdf()` serve os bytes prontos do disco; se o render ainda está na fila,
+  espera por ele; se não existe, renderiza na hora e grava.
+"""
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from lib import gerar_pdf_bytes
+from concorrencia import descartar_pool, pool_processos
+from core import semanas_pdf
+
+# ===== CONFIG =====
+PDF_LAYOUT_VERSAO = "3"
+PDF_CACHE_DIR = Path(os.getenv("PDF_CACHE_DIR", "/tmp/cronograma_pdfs"))
+PDF_CACHE_MAX_ARQUIVOS = int(os.getenv("PDF_CACHE_MAX_ARQUIVOS", "5000"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))
+PDF_FILA_MAX = int(os.getenv("PDF_FILA_MAX", "64"))
+PDF_ESPERA_S = float(os.getenv("PDF_ESPERA_S", "30"))
+
+# De quantas em quantas gravações a rotação do diretório roda
+_ROTACIONAR_A_CADA = 50
+
+_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_em_andamento: Dict[str, Future] = {}
+_gravacoes = 0
+_stats = {"hits": 0, "misses": 0, "agendados": 0, "descartados": 0, "esperas": 0, "erros": 0}
+
+
+def chave_pdf(semanas: List[List[Dict[str, Any]]]) -> str:
+    # só os campos impressos (as aulas trazem também id, peso, ...); .get() porque
+    # uma aula adicionada à mão pelo /patch pode vir só com id ou module_name
+    conteudo = json.dumps(
+        [[(a.get("module_name"), a.get("lesson_theme"), a.get("duration_min")) for a in s] for s in semanas],
+        ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(f"v{PDF_LAYOUT_VERSAO}:{conteudo}".encode("utf-8")).hexdigest()
+
+
+def _caminho(chave: str) -> Path:
+    return PDF_CACHE_DIR / f"v{PDF_LAYOUT_VERSAO}_{chave}.pdf"
+
+
+def _gravar(destino: Path, dados: bytes):
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    tmp = destino.with_name(f"{destino.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(dados)
+    tmp.replace(destino)
+
+
+def _renderizar(semanas: List[List[Dict[str, Any]]], caminho: str) -> int:
+    """Roda no pool de processos: renderiza e grava de forma atômica. Devolve o tamanho."""
+    dados = gerar_pdf_bytes(semanas).getvalue()
+    _gravar(Path(caminho), dados)
+    return len(dados)
+
+
+def _obter_pool() -> ProcessPoolExecutor:
+    # criado sob demanda: nada de processos filhos no import (nem antes do fork do gunicorn)
+    global _pool
+    if _pool is None:
+        _pool = pool_processos(PDF_WORKERS, preload=["pdf_cache"])
+    return _pool
+
+
+def _contar(chave: str):
+    with _lock:
+        _stats[chave] += 1
+
+
+def _gravado():
+    global _gravacoes
+    with _lock:
+        _gravacoes += 1
+        rotacionar = _gravacoes % _ROTACIONAR_A_CADA == 0
+    if rotacionar:
+        _rotacionar()
+
+
+def _rotacionar():
+    try:
+        arquivos = sorted(PDF_CACHE_DIR.glob("*.pdf"), key=lambda p: p.stat().st_mtime)
+    except OSError:
+        return
+    for p in arquivos[:max(len(arquivos) - PDF_CACHE_MAX_ARQUIVOS, 0)]:
+        try:
+            p.unlink()
+        except OSError:
+            pass
+
+
+def _finalizar(chave: str, futuro: Future):
+    with _lock:
+        _em_andamento.pop(chave, None)
+    if futuro.exception() is not None:
+        _contar("erros")
+        print(f"⚠️ Falha ao pré-renderizar PDF {chave[:12]}: {futuro.exception()}")
+    else:
+        _gravado()
+
+
+def agendar_pdf(cronograma_json: Dict[str, Any]) -> Optional[str]:
+    """Põe o render na fila (se ainda não existir). Devolve a chave, ou None se descartado."""
+    global _pool
+    semanas = semanas_pdf(cronograma_json)
+    if semanas is None:
+        return None
+    chave = chave_pdf(semanas)
+    caminho = _caminho(chave)
+    if caminho.exists():
+        return chave
+
+    with _lock:
+        if chave in _em_andamento:
+            return chave
+        if len(_em_andamento) >= PDF_FILA_MAX:
+            _stats["descartados"] += 1
+            return None
+        try:
+            futuro = _obter_pool().submit(_renderizar, semanas, str(caminho))
+        except Exception as e:
+            # pool quebrado (ex.: worker morto): fecha e recria no próximo pedido
+            if _pool is not None:
+                descartar_pool(_pool)
+            _pool = None
+            _stats["erros"] += 1
+            print(f"⚠️ Pool de PDF indisponível: {e}")
+            return None
+        _em_andamento[chave] = futuro
+        _stats["agendados"] += 1
+
+    futuro.add_done_callback(lambda f: _finalizar(chave, f))
+    return chave
+
+
+def obter_pdf(cronograma_json: Dict[str, Any]) -> bytes:
+    semanas = semanas_pdf(cronograma_json)
+    if semanas is None:
+        raise ValueError("Cronograma inválido: esperado um objeto com 'weeks'.")
+    chave = chave_pdf(semanas)
+    caminho = _caminho(chave)
+
+    with _lock:
+        futuro = _em_andamento.get(chave)
+    if futuro is not None:
+        _contar("esperas")
+        try:
+            futuro.result(timeout=PDF_ESPERA_S)
+        except Exception:
+            pass  # timeout ou erro no pool: renderiza aqui mesmo
+
+    try:
+        dados = caminho.read_bytes()
+        _contar("hits")
+        return dados
+    except FileNotFoundError:
+        pass
+
+    _contar("misses")
+    dados = gerar_pdf_bytes(semanas).getvalue()
+    try:
+        _gravar(caminho, dados)
+        _gravado()
+    except OSError as e:
+        print(f"⚠️ Não foi possível gravar o PDF {chave[:12]} no cache: {e}")
+    return dados
+
+
+def metricas() -> Dict[str, Any]:
+    with _lock:
+        return dict(_stats, fila=len(_em_andamento), layout=PDF_LAYOUT_VERSAO, workers=PDF_WORKERS)
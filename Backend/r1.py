@@ -1,4 +1,14 @@
-from llm_utils import processar_resposta_aberta
+from llm_utils import processar_respostas_abertas
+
+# Perguntas abertas classificadas pelo LLM (campo no formulário, ou (campo, pergunta enviada ao LLM))
+PERGUNTAS_ABERTAS = [
+    "Quais exames de imagem sente mais dificuldade no momento?",
+    ("Quais temas você está vendo ou vai ver no primeiro ano de Residência? (ex: Pneumonia, AVC, Aneurisma, Abdome Agudo, Fraturas, física...)",
+     "Quais temas você está vendo ou vai ver no primeiro ano de Residência?"),
+]
+
+# Respostas que citam temas/exames: viram bônus nas aulas (indice_temas.py)
+PERGUNTAS_TEMAS = [PERGUNTAS_ABERTAS[0], PERGUNTAS_ABERTAS[1][0]]
 
 def atualizar_metricas(respostas_aluno, metricas):
 
@@ -44,19 +54,7 @@ def atualizar_metricas(respostas_aluno, metricas):
             elif subesp == "Oncologia":
                 metricas["subespecialidade_oncologia"] += 4
 
-    # Perguntas abertas com LLM
-    if "Quais exames de imagem sente mais dificuldade no momento?" in r:
-        metricas = processar_resposta_aberta(
-            "Quais exames de imagem sente mais dificuldade no momento?",
-            r["Quais exames de imagem sente mais dificuldade no momento?"],
-            metricas
-        )
-
-    if "Quais temas você está vendo ou vai ver no primeiro ano de Residência? (ex: Pneumonia, AVC, Aneurisma, Abdome Agudo, Fraturas, física...)" in r:
-        metricas = processar_resposta_aberta(
-            "Quais temas você está vendo ou vai ver no primeiro ano de Residência?",
-            r["Quais temas você está vendo ou vai ver no primeiro ano de Residência? (ex: Pneumonia, AVC, Aneurisma, Abdome Agudo, Fraturas, física...)"],
-            metricas
-        )
+    # Perguntas abertas com LLM (uma chamada só para todas)
+    metricas = processar_respostas_abertas(r, PERGUNTAS_ABERTAS, metricas)
 
     return metricas
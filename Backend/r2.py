@@ -1,4 +1,13 @@
-from llm_utils import processar_resposta_aberta
+from llm_utils import processar_respostas_abertas
+
+# Perguntas abertas classificadas pelo LLM (campo no formulário, ou (campo, pergunta enviada ao LLM))
+PERGUNTAS_ABERTAS = [
+    "Quais desses exames de imagem sente mais dificuldade no momento? Algo passou batido no R1?",
+    "Tem alguma subespecialidade que quer aprofundar mais ou revisar agora no R2?",
+]
+
+# Respostas que citam temas/exames: viram bônus nas aulas (indice_temas.py)
+PERGUNTAS_TEMAS = [PERGUNTAS_ABERTAS[0]]
 
 def atualizar_metricas(respostas_aluno, metricas):
     r = respostas_aluno["respostas"]
@@ -53,19 +62,7 @@ def atualizar_metricas(respostas_aluno, metricas):
             elif subesp == "Oncologia":
                 metricas["subespecialidade_oncologia"] += 4
 
-    # Perguntas abertas com LLM
-    if "Quais desses exames de imagem sente mais dificuldade no momento? Algo passou batido no R1?" in r:
-        metricas = processar_resposta_aberta(
-            "Quais desses exames de imagem sente mais dificuldade no momento? Algo passou batido no R1?",
-            r["Quais desses exames de imagem sente mais dificuldade no momento? Algo passou batido no R1?"],
-            metricas
-        )
-
-    if "Tem alguma subespecialidade que quer aprofundar mais ou revisar agora no R2?" in r:
-        metricas = processar_resposta_aberta(
-            "Tem alguma subespecialidade que quer aprofundar mais ou revisar agora no R2?",
-            r["Tem alguma subespecialidade que quer aprofundar mais ou revisar agora no R2?"],
-            metricas
-        )
+    # Perguntas abertas com LLM (uma chamada só para todas)
+    metricas = processar_respostas_abertas(r, PERGUNTAS_ABERTAS, metricas)
 
     return metricas
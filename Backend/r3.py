@@ -1,4 +1,13 @@
-from llm_utils import processar_resposta_aberta
+from llm_utils import processar_respostas_abertas
+
+# Perguntas abertas classificadas pelo LLM (campo no formulário, ou (campo, pergunta enviada ao LLM))
+PERGUNTAS_ABERTAS = [
+    "Já decidiu qual área quer seguir no R4/Fellow? se sim, qual?",
+    "Tem algum exame de imagem ou subespecialidade específica que você quer dominar ou revisar agora no R3? Ou algo que você sente que ficou pra trás do R1/R2?",
+]
+
+# Respostas que citam temas/exames: viram bônus nas aulas (indice_temas.py)
+PERGUNTAS_TEMAS = [PERGUNTAS_ABERTAS[1]]
 
 def atualizar_metricas(respostas_aluno, metricas):
     r = respostas_aluno["respostas"]
@@ -57,19 +66,7 @@ def atualizar_metricas(respostas_aluno, metricas):
             elif subesp == "Oncologia":
                 metricas["subespecialidade_oncologia"] += 4
 
-    # Perguntas abertas com LLM
-    if "Já decidiu qual área quer seguir no R4/Fellow? se sim, qual?" in r:
-        metricas = processar_resposta_aberta(
-            "Já decidiu qual área quer seguir no R4/Fellow? se sim, qual?",
-            r["Já decidiu qual área quer seguir no R4/Fellow? se sim, qual?"],
-            metricas
-        )
-
-    if "Tem algum exame de imagem ou subespecialidade específica que você quer dominar ou revisar agora no R3? Ou algo que você sente que ficou pra trás do R1/R2?" in r:
-        metricas = processar_resposta_aberta(
-            "Tem algum exame de imagem ou subespecialidade específica que você quer dominar ou revisar agora no R3? Ou algo que você sente que ficou pra trás do R1/R2?",
-            r["Tem algum exame de imagem ou subespecialidade específica que você quer dominar ou revisar agora no R3? Ou algo que você sente que ficou pra trás do R1/R2?"],
-            metricas
-        )
+    # Perguntas abertas com LLM (uma chamada só para todas)
+    metricas = processar_respostas_abertas(r, PERGUNTAS_ABERTAS, metricas)
 
     return metricas
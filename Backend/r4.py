@@ -1,4 +1,13 @@
-from llm_utils import processar_resposta_aberta
+from llm_utils import processar_respostas_abertas
+
+# Perguntas abertas classificadas pelo LLM (campo no formulário, ou (campo, pergunta enviada ao LLM))
+PERGUNTAS_ABERTAS = [
+    "Tem algum exame de imagem ou tema que gostaria de priorizar primeiro?",
+    "Há quanto tempo terminou a residência?",
+]
+
+# Respostas que citam temas/exames: viram bônus nas aulas (indice_temas.py)
+PERGUNTAS_TEMAS = [PERGUNTAS_ABERTAS[0]]
 
 def atualizar_metricas(respostas_aluno, metricas):
     r = respostas_aluno["respostas"]
@@ -61,20 +70,7 @@ def atualizar_metricas(respostas_aluno, metricas):
             elif subesp == "Cardiovascular":
                 metricas["subespecialidade_cardiovascular"] += 4
 
-
-    if "Tem algum exame de imagem ou tema que gostaria de priorizar primeiro?" in r:
-        metricas = processar_resposta_aberta(
-            "Tem algum exame de imagem ou tema que gostaria de priorizar primeiro?",
-            r["Tem algum exame de imagem ou tema que gostaria de priorizar primeiro?"],
-            metricas
-        )
-
-    # Perguntas abertas com LLM
-    if "Há quanto tempo terminou a residência?" in r:
-        metricas = processar_resposta_aberta(
-            "Há quanto tempo terminou a residência?",
-            r["Há quanto tempo terminou a residência?"],
-            metricas
-        )
+    # Perguntas abertas com LLM (uma chamada só para todas)
+    metricas = processar_respostas_abertas(r, PERGUNTAS_ABERTAS, metricas)
 
     return metricas
@@ -0,0 +1,183 @@
+# regenerar.py
+"""
+Regenera em lote os cronogramas salvos depois de uma mudança no catalogo.json.
+
+Lê a tabela `cronogramas` com cursor server-side, recalcula cada cronograma a
+partir das `respostas` salvas (em paralelo) e grava de volta com UPDATEs em lote.
+Linhas com `modifier` (editadas manualmente por um admin) são puladas.
+
+O progresso fica salvo em um arquivo de checkpoint (último id gravado), então
+uma execução interrompida pode ser retomada de onde parou.
+
+As respostas abertas são classificadas em modo estrito: com o LLM fora do ar
+(ou o disjuntor aberto) a linha conta como erro, não é gravada e o checkpoint
+para antes dela, para a próxima execução tentar de novo em vez de gravar um
+cronograma só com as respostas fechadas.
+
+Uso (a partir de Backend/):
+    python -m regenerar [--lote 200] [--workers 4] [--checkpoint regenerar.checkpoint] [--reiniciar]
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+from sqlalchemy import create_engine, text
+
+from core import run_cronograma, preclassificar_formularios
+from llm_utils import ClassificacaoIndisponivel, classificacao_estrita
+from armazenamento import carregar_json, serializar_cronograma
+
+
+def _formulario(row) -> Dict[str, Any]:
+    return {
+        "name": row["name"],
+        "email": row["email"],
+        "nivel": row["nivel"],
+        "respostas": carregar_json(row["respostas"]),
+    }
+
+
+def regenerar_linha(row) -> Tuple[Any, Optional[str], Optional[str], bool]:
+    """
+    Devolve (id, cronograma_json, erro, sem_llm) para uma linha de `cronogramas`;
+    `sem_llm` marca os erros de classificação, que valem uma nova tentativa.
+    """
+    try:
+        with classificacao_estrita():
+            resultado = run_cronograma(_formulario(row))
+        return row["id"], serializar_cronograma(resultado), None, False
+    except ClassificacaoIndisponivel as e:
+        return row["id"], None, f"LLM indisponível ({e})", True
+    except Exception as e:
+        return row["id"], None, str(e), False
+
+
+def _ler_checkpoint(path: Path) -> Optional[str]:
+    if path.exists():
+        valor = path.read_text(encoding="utf-8").strip()
+        return valor or None
+    return None
+
+
+def _gravar_checkpoint(path: Path, ultimo_id) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(str(ultimo_id), encoding="utf-8")
+    tmp.replace(path)
+
+
+def regenerar(
+    engine,
+    lote: int = 200,
+    workers: int = 4,
+    checkpoint: Optional[Path] = None,
+    desde_id: Optional[str] = None,
+) -> Dict[str, int]:
+    filtro = "WHERE modifier IS NULL"
+    params: Dict[str, Any] = {}
+    if desde_id is not None:
+        filtro += " AND id > :desde_id"
+        params["desde_id"] = desde_id
+
+    with engine.connect() as conn:
+        total = conn.execute(text(f"SELECT COUNT(*) FROM cronogramas {filtro}"), params).scalar()
+
+    stats = {"total": total, "processados": 0, "atualizados": 0, "erros": 0, "sem_llm": 0}
+    # depois da primeira linha sem LLM o checkpoint não anda mais
+    travado = False
+    inicio = time.perf_counter()
+    print(f"🔄 Regenerando {total} cronogramas (lote={lote}, workers={workers})")
+
+    update_query = text("""
+        UPDATE cronogramas
+        SET cronograma = CAST(:cronograma AS jsonb),
+            versao = versao + 1
+        WHERE id = :id AND modifier IS NULL
+    """)
+
+    with engine.connect() as leitura, ThreadPoolExecutor(max_workers=workers) as pool:
+        result = leitura.execution_options(stream_results=True, yield_per=lote).execute(
+            text(f"""
+                SELECT id, name, email, nivel, respostas
+                FROM cronogramas
+                {filtro}
+                ORDER BY id
+            """),
+            params,
+        )
+
+        for bloco in result.mappings().partitions(lote):
+            # respostas abertas do bloco inteiro em poucas chamadas ao LLM (ficam no cache)
+            forms = []
+            for row in bloco:
+                try:
+                    forms.append(_formulario(row))
+                except Exception:
+                    pass  # o erro aparece em regenerar_linha
+            preclassificar_formularios(forms, paralelo=workers)
+
+            novos = []
+            ultimo_ok = None if travado else bloco[-1]["id"]
+            anterior = None
+            for id_, cronograma, erro, sem_llm in pool.map(regenerar_linha, bloco):
+                if erro:
+                    stats["erros"] += 1
+                    print(f"❌ {id_}: {erro}")
+                    if sem_llm:
+                        stats["sem_llm"] += 1
+                        if not travado:
+                            travado, ultimo_ok = True, anterior
+                else:
+                    novos.append({"id": id_, "cronograma": cronograma})
+                anterior = id_
+
+            if novos:
+                with engine.begin() as escrita:
+                    r = escrita.execute(update_query, novos)
+                    stats["atualizados"] += max(r.rowcount, 0)
+
+            stats["processados"] += len(bloco)
+            if checkpoint is not None and ultimo_ok is not None:
+                _gravar_checkpoint(checkpoint, ultimo_ok)
+
+            decorrido = time.perf_counter() - inicio
+            taxa = stats["processados"] / decorrido if decorrido else 0.0
+            print(
+                f"  {stats['processados']}/{total} processados "
+                f"({stats['erros']} erros, {taxa:.1f} linhas/s)"
+            )
+
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenera os cronogramas salvos a partir das respostas.")
+    parser.add_argument("--lote", type=int, default=200, help="linhas por lote de leitura/UPDATE")
+    parser.add_argument("--workers", type=int, default=4, help="workers em paralelo")
+    parser.add_argument("--checkpoint", default="regenerar.checkpoint", help="arquivo de checkpoint")
+    parser.add_argument("--reiniciar", action="store_true", help="ignora o checkpoint e começa do início")
+    args = parser.parse_args(argv)
+
+    checkpoint = Path(args.checkpoint)
+    desde_id = None if args.reiniciar else _ler_checkpoint(checkpoint)
+    if desde_id:
+        print(f"↪️ Retomando a partir do id {desde_id}")
+
+    engine = create_engine(os.getenv("DB_URL"), pool_pre_ping=True)
+    stats = regenerar(engine, args.lote, args.workers, checkpoint, desde_id)
+
+    print(f"✅ Concluído: {stats}")
+    if stats["sem_llm"]:
+        print(f"⚠️ {stats['sem_llm']} linhas sem classificação do LLM: rode de novo para retomar do checkpoint")
+    elif stats["processados"] >= stats["total"] and checkpoint.exists():
+        checkpoint.unlink()
+    return 0 if stats["erros"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())